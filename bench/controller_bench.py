@@ -0,0 +1,183 @@
+"""Per-event cost of applying DS4 input events to the controller state.
+
+Replays the same event stream through the original if/elif dispatch (kept
+here for comparison) and through :class:`robot.controller.ControllerState`,
+raw and with the default calibration's response tables.
+Run from the repository root, optionally with an input log recorded with
+``launch.py --record-input`` to replay instead of the synthetic stream:
+
+    python -m bench.controller_bench [run.evlog]
+"""
+
+import sys
+import math
+import timeit
+
+from evdev import InputEvent, ecodes
+
+from robot.calibration import Calibration
+from robot.controller import ControllerState
+from robot.input_log import read_log
+
+
+class LegacyController:
+    """The attribute-per-field controller state with its original if/elif dispatch."""
+
+    cross = circle = triangle = square = 0
+    dpad_up = dpad_down = dpad_left = dpad_right = 0
+    l1 = r1 = l2 = r2 = 0
+    share = options = l3 = r3 = 0
+    left_stick_x = left_stick_y = right_stick_x = right_stick_y = 128
+    l2_analog = r2_analog = 0
+
+    def update_event(self, event):
+        if event.type == ecodes.EV_KEY:
+            if event.code == ecodes.BTN_SOUTH:
+                self.cross = event.value
+            elif event.code == ecodes.BTN_EAST:
+                self.circle = event.value
+            elif event.code == ecodes.BTN_NORTH:
+                self.triangle = event.value
+            elif event.code == ecodes.BTN_WEST:
+                self.square = event.value
+            elif event.code == ecodes.BTN_DPAD_UP:
+                self.dpad_up = event.value
+            elif event.code == ecodes.BTN_DPAD_DOWN:
+                self.dpad_down = event.value
+            elif event.code == ecodes.BTN_DPAD_LEFT:
+                self.dpad_left = event.value
+            elif event.code == ecodes.BTN_DPAD_RIGHT:
+                self.dpad_right = event.value
+            elif event.code == ecodes.BTN_TL:
+                self.l1 = event.value
+            elif event.code == ecodes.BTN_TR:
+                self.r1 = event.value
+            elif event.code == ecodes.BTN_TL2:
+                self.l2 = event.value
+            elif event.code == ecodes.BTN_TR2:
+                self.r2 = event.value
+            elif event.code == ecodes.BTN_SELECT:
+                self.share = event.value
+            elif event.code == ecodes.BTN_START:
+                self.options = event.value
+            elif event.code == ecodes.BTN_THUMBL:
+                self.l3 = event.value
+            elif event.code == ecodes.BTN_THUMBR:
+                self.r3 = event.value
+
+        elif event.type == ecodes.EV_ABS:
+            if event.code == ecodes.ABS_X:
+                self.left_stick_x = event.value
+            elif event.code == ecodes.ABS_Y:
+                self.left_stick_y = event.value
+            elif event.code == ecodes.ABS_RX:
+                self.right_stick_x = event.value
+            elif event.code == ecodes.ABS_RY:
+                self.right_stick_y = event.value
+            elif event.code == ecodes.ABS_Z:
+                self.l2_analog = event.value
+            elif event.code == ecodes.ABS_RZ:
+                self.r2_analog = event.value
+            elif event.code == ecodes.ABS_HAT0X:
+                if event.value == -1:
+                    self.dpad_left = 1
+                    self.dpad_right = 0
+                elif event.value == 1:
+                    self.dpad_right = 1
+                    self.dpad_left = 0
+                else:
+                    self.dpad_left = 0
+                    self.dpad_right = 0
+            elif event.code == ecodes.ABS_HAT0Y:
+                if event.value == -1:
+                    self.dpad_up = 1
+                    self.dpad_down = 0
+                elif event.value == 1:
+                    self.dpad_down = 1
+                    self.dpad_up = 0
+                else:
+                    self.dpad_up = 0
+                    self.dpad_down = 0
+
+    def snapshot(self):
+        return tuple(getattr(self, name) for name in ControllerState.FIELDS)
+
+
+def capture(reports: int = 2000) -> list:
+    """Event stream shaped like a DS4 being driven: both sticks sweeping, occasional buttons and hat presses."""
+    events = []
+    for n in range(reports):
+        sec, usec = divmod(n * 4000, 1_000_000)  # 250 Hz reports
+
+        def add(type, code, value):
+            events.append(InputEvent(sec, usec, type, code, value))
+
+        phase = n / 50
+        add(ecodes.EV_ABS, ecodes.ABS_X, int(128 + 100 * math.sin(phase)))
+        add(ecodes.EV_ABS, ecodes.ABS_Y, int(128 + 100 * math.cos(phase)))
+        add(ecodes.EV_ABS, ecodes.ABS_RX, int(128 + 60 * math.sin(phase / 3)))
+        if n % 4 == 0:
+            add(ecodes.EV_ABS, ecodes.ABS_RZ, n % 256)
+        if n % 40 == 0:
+            add(ecodes.EV_KEY, ecodes.BTN_SOUTH, (n // 40) % 2)
+        if n % 100 == 0:
+            add(ecodes.EV_ABS, ecodes.ABS_HAT0X, (n // 100) % 3 - 1)
+        add(ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
+
+    return events
+
+
+def every_control(rounds: int = 200) -> list:
+    """Event stream touching every button, axis and hat in turn, so deep if/elif branches are hit as often as shallow ones."""
+    events = []
+    for n in range(rounds):
+        for (type, code) in [*ControllerState.EVENTS, *ControllerState.HATS]:
+            value = n % 2 if type == ecodes.EV_KEY else n % 3 - 1 if code in (ecodes.ABS_HAT0X, ecodes.ABS_HAT0Y) else n % 256
+            events.append(InputEvent(0, n, type, code, value))
+            events.append(InputEvent(0, n, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    return events
+
+
+def report(candidates, number, count, unit="event", repeat=200):
+    """Best time of each ``(name, stmt)`` in ``candidates``, timed in turn so load on the machine hits them all alike."""
+    best = {name: math.inf for name, _ in candidates}
+    for _ in range(repeat):
+        for name, stmt in candidates:
+            best[name] = min(best[name], timeit.timeit(stmt, number=number) / number)
+
+    for name, time in best.items():
+        print(f"{name:>28}: {time / count * 1e9:8.1f} ns/{unit}")
+
+
+def replay(update, events):
+    for event in events:
+        update(event)
+
+
+def main(number: int = 1):
+    legacy = LegacyController()
+    state = ControllerState()
+    calibrated = ControllerState()
+    calibrated.calibrate(Calibration())
+
+    driving = ("recorded", list(read_log(sys.argv[1]))) if len(sys.argv) > 1 else ("driving", capture())
+
+    for stream, events in (driving, ("every control", every_control())):
+        replay(legacy.update_event, events)
+        replay(state.update_event, events)
+        assert legacy.snapshot() == tuple(state.snapshot())
+
+        print(stream)
+        report([("if/elif dispatch", lambda: replay(legacy.update_event, events)),
+                ("table dispatch", lambda: replay(state.update_event, events)),
+                ("calibrated", lambda: replay(calibrated.update_event, events))], number, len(events))
+
+    print("snapshot")
+
+    number *= 1000
+    report([("attributes", legacy.snapshot), ("state vector", state.snapshot)], number, 1, "snapshot")
+
+
+if __name__ == "__main__":
+    main()
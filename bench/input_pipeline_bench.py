@@ -0,0 +1,128 @@
+"""Latency of the input -> Motion pipeline, replayed from a recorded input log.
+
+Feeds the log through a Controller, a ManualMode-style subscriber calling
+Motion.move, and Motion's command loop writing to a loopback serial port
+that answers every frame, so no PS4 controller or Teensy is needed. Record a
+log on the robot with ``python launch.py --record-input run.evlog``, then run
+from the repository root:
+
+    python -m bench.input_pipeline_bench run.evlog --speed 0
+
+Without a log a synthetic driving stream is replayed.
+"""
+
+import time
+import asyncio
+import argparse
+
+from types import SimpleNamespace
+
+import flatbuffers
+
+from MotionProtocol import ODriveStatus
+
+from robot.controller import Controller
+from robot.devices import DeviceRegistry
+from robot.input_log import InputReplay
+from robot.metrics import Histogram
+from robot.motion import Motion
+from robot.scheduler import Scheduler
+
+
+def status_reply() -> bytes:
+    builder = flatbuffers.Builder(64)
+    ODriveStatus.ODriveStatusStart(builder)
+    ODriveStatus.ODriveStatusAddConnected0(builder, True)
+    builder.Finish(ODriveStatus.ODriveStatusEnd(builder))
+    payload = builder.Output()
+    return len(payload).to_bytes(4, "little") + bytes(payload)
+
+
+class LoopbackSerial:
+    """Answers every frame written with a status reply."""
+
+    def __init__(self) -> None:
+        self.reply = status_reply()
+        self.written = []  # write times
+        self._replies = asyncio.Queue()
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    async def write_async(self, frame):
+        self.written.append(time.monotonic())
+        self._replies.put_nowait(self.reply)
+
+    async def read_async(self, size):
+        return await self._replies.get()
+
+    def close(self): ...
+
+
+class LoopbackMotion(Motion):
+    SEND_ON_CHANGE = True
+
+    def _connect(self):
+        self.serial = LoopbackSerial()
+
+    def _on_reply(self, seq, payload, rtt):
+        self.status = self.decoder.decode(payload)
+
+
+async def pipeline(events, speed: float):
+    robot = SimpleNamespace(scheduler=Scheduler(), devices=DeviceRegistry(), enabled=True, mode=None)
+
+    async def set_enabled(enabled: bool):
+        robot.enabled = enabled
+
+    robot.set_enabled = set_enabled
+    robot.motion = motion = LoopbackMotion(robot)
+    controller = Controller(robot, InputReplay(events, speed))
+
+    to_move = Histogram()
+    motion_task = asyncio.create_task(motion.run())
+
+    async def mode():
+        updates = controller.subscribe()
+        async for state in updates:
+            motion.move(state.right_stick_y - 128, state.right_stick_x - 128,
+                        state.left_stick_y - 128, state.left_stick_x - 128,
+                        state.r2_analog, state.l2_analog,
+                        state.dpad_up, state.dpad_down, state.dpad_left, state.dpad_right,
+                        state.triangle, state.cross, state.square, state.circle)
+            to_move.record(motion.command.stamp - state.stamp)
+
+    mode_task = asyncio.create_task(mode())
+
+    started = time.monotonic()
+    await controller.events()
+    elapsed = time.monotonic() - started
+
+    await asyncio.sleep(2 * motion.keepalive)
+    mode_task.cancel()
+    motion_task.cancel()
+
+    print(f"replayed {len(events)} events in {elapsed:.2f} s, {len(motion.serial.written)} frames sent")
+    print(f"   report -> Motion.move: {to_move}")
+    print(f"     Motion.move -> frame: {motion.command_age}")
+    print(f"                      link: {motion.link_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", nargs="?", help="input log recorded with launch.py --record-input")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor, 0 for as fast as possible")
+    args = parser.parse_args()
+
+    if args.log:
+        events = InputReplay(args.log).events
+    else:
+        from bench.controller_bench import capture
+        events = capture()
+
+    asyncio.run(pipeline(events, args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Per-frame cost of the motion link codecs against the generated flatbuffers code.
+
+Run from the repository root:
+
+    python -m bench.protocol_bench
+"""
+
+import timeit
+
+import flatbuffers
+
+from MotionProtocol import ODriveStatus
+
+from robot.protocol import RemoteFrame, StatusDecoder
+
+# typical walking frame: enabled, mode, both sticks and a trigger deflected
+VALUES = (True, 6, -12, 87, 40, 3, -64, 0, False, False, False, False, False, True, False, False)
+
+
+def status_reply() -> bytes:
+    builder = flatbuffers.Builder(256)
+    ODriveStatus.ODriveStatusStart(builder)
+    for i in range(6):
+        getattr(ODriveStatus, f"ODriveStatusAddConnected{i}")(builder, True)
+    ODriveStatus.ODriveStatusAddError11(builder, 0x40)
+    builder.Finish(ODriveStatus.ODriveStatusEnd(builder))
+    return builder.Output()
+
+
+def generated_decode(buf):
+    status = ODriveStatus.ODriveStatus.GetRootAs(buf, 0)
+    connected = tuple(getattr(status, f"Connected{i}")() for i in range(6))
+    errors = tuple(getattr(status, f"Error{axis}{n}")() for axis in range(6) for n in range(2))
+    return connected, errors
+
+
+def report(name, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+    print(f"{name:>28}: {best * 1e6:8.2f} us/frame")
+
+
+def main(number: int = 20000):
+    frame = RemoteFrame()
+    frame.encode(*VALUES)  # compile the template outside the timed region
+    assert bytes(frame.encode(*VALUES)) == RemoteFrame.build(*VALUES)
+
+    report("encode flatbuffers.Builder", lambda: RemoteFrame.build(*VALUES), number)
+    report("encode RemoteFrame", lambda: frame.encode(*VALUES), number)
+
+    reply = status_reply()
+    decoder = StatusDecoder()
+    status = decoder.decode(reply)
+    assert (status.connected, status.errors) == generated_decode(reply)
+
+    report("decode generated accessors", lambda: generated_decode(reply), number)
+    report("decode StatusDecoder", lambda: decoder.decode(reply), number)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,32 @@
 import asyncio
+import argparse
 
-from robot.sparky import Sparky
+from robot.profiling import ImportProfiler
 
-async def main():
-    async with Sparky() as sparky:
+async def main(args, profiler=None):
+    from robot.sparky import Sparky
+
+    async with Sparky(args.replay_input, args.replay_speed, args.record_input, args.teleop_port, args.isolate,
+                      profiler, args.teleop_host) as sparky:
         await sparky.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record-input", metavar="LOG", help="record controller input to LOG")
+    parser.add_argument("--replay-input", metavar="LOG", help="replay a recorded input log instead of the controller")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay speed factor, 0 for as fast as possible")
+    parser.add_argument("--teleop-port", type=int, metavar="PORT", help="accept controller state over UDP on PORT")
+    parser.add_argument("--teleop-host", default="127.0.0.1", metavar="ADDRESS",
+                        help="listen for teleop on the interface with ADDRESS, e.g. the robot's address on the "
+                             "control network (default: %(default)s, this machine only)")
+    parser.add_argument("--isolate", action="append", default=[], metavar="MODE",
+                        help="run MODE in a separate process (gesture), may be repeated")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long every import took, as a tree, along with the startup report")
+    args = parser.parse_args()
+
+    # installed before the robot package is imported, so that shows up too
+    profiler = ImportProfiler.install() if args.profile_startup else None
+
+    asyncio.run(main(args, profiler))
@@ -1,9 +1,30 @@
-from .sparky import Sparky
-from .controller import Controller
-from .audio_manager import AudioManager
+import importlib
+
+# Imported on first access (PEP 562), so importing one part of the package,
+# e.g. robot.calibration or robot.teleop on a laptop, doesn't pull in Qt,
+# pygame and the serial stack with it.
+_LAZY = {
+    "Sparky": ".sparky",
+    "Controller": ".controller",
+    "AudioManager": ".audio_manager",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 # def setUp(self, *args, **kwargs):
 #     logger.info("Setting up AudioManager instance for tests.")
 #     from robot.audio_manager import AudioManager  # Updated import path
 #     self.audio_manager = AudioManager()
-
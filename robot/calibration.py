@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import asyncio
+import argparse
+import statistics
+
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+
+class AxisCalibration(NamedTuple):
+    """Measured travel of one stick or trigger axis and the response wanted from it.
+
+    ``low``, ``center`` and ``high`` are raw readings. An axis whose center is
+    at its low end (the triggers) is one-sided. ``deadzone`` is the fraction of
+    travel from center that reads as rest, and ``expo`` blends the response
+    from linear (0) to cubic (1) for finer control near center.
+    """
+
+    low: int = 0
+    center: int = 128
+    high: int = 255
+    deadzone: float = 0.0
+    expo: float = 0.0
+
+    @property
+    def one_sided(self) -> bool:
+        return self.center <= self.low
+
+    def _shape(self, n: float) -> float:
+        if n <= self.deadzone:
+            return 0.0
+
+        n = (n - self.deadzone) / (1.0 - self.deadzone)
+        return (1.0 - self.expo) * n + self.expo * n * n * n
+
+    def value(self, raw: int) -> int:
+        """Conditioned reading for ``raw``, on the controller's own 0..255 scale with the same center."""
+        if self.one_sided:
+            span = self.high - self.low
+            n = min(max((raw - self.low) / span, 0.0), 1.0) if span > 0 else 0.0
+            return round(255 * self._shape(n))
+
+        if raw >= self.center:
+            span = self.high - self.center
+            n = min((raw - self.center) / span, 1.0) if span > 0 else 0.0
+            return self.center_value + round(127 * self._shape(n))
+
+        span = self.center - self.low
+        n = min((self.center - raw) / span, 1.0) if span > 0 else 0.0
+        return self.center_value - round(128 * self._shape(n))
+
+    @property
+    def center_value(self) -> int:
+        return 0 if self.one_sided else 128
+
+    def table(self) -> bytes:
+        """Lookup table of :meth:`value` for every raw reading 0..255."""
+        return bytes(self.value(raw) for raw in range(256))
+
+
+class Calibration:
+    """Calibration of the controller's sticks and triggers, persisted as JSON.
+
+    Axes missing from the file keep the defaults: full travel, linear, with a
+    small deadzone on the sticks so that drift at rest reads as centred.
+    """
+
+    FILE = Path("calibration.json")
+
+    STICKS = ("left_stick_x", "left_stick_y", "right_stick_x", "right_stick_y")
+    TRIGGERS = ("l2_analog", "r2_analog")
+
+    STICK_DEADZONE = 0.06
+
+    def __init__(self, axes: dict[str, AxisCalibration] = None) -> None:
+        self.axes = self.defaults()
+        self.axes.update(axes or {})
+
+    @classmethod
+    def defaults(cls) -> dict[str, AxisCalibration]:
+        axes = {name: AxisCalibration(deadzone=cls.STICK_DEADZONE) for name in cls.STICKS}
+        axes.update({name: AxisCalibration(center=0) for name in cls.TRIGGERS})
+        return axes
+
+    @classmethod
+    def load(cls, path: Path = None) -> Calibration:
+        path = Path(path or cls.FILE)
+
+        try:
+            data = json.loads(path.read_text())
+            axes = {name: AxisCalibration(**data[name]) for name in cls.STICKS + cls.TRIGGERS if name in data}
+        except FileNotFoundError:
+            print(f"No controller calibration at {path}, using defaults (run python -m robot.calibration)")
+            return cls()
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Could not load controller calibration from {path}: {e}")
+            return cls()
+
+        return cls(axes)
+
+    def save(self, path: Path = None):
+        path = Path(path or self.FILE)
+        path.write_text(json.dumps({name: axis._asdict() for name, axis in self.axes.items()}, indent=4) + "\n")
+
+    def tables(self) -> dict[str, bytes]:
+        return {name: axis.table() for name, axis in self.axes.items()}
+
+
+# added to the drift measured at rest, as a fraction of travel
+DEADZONE_MARGIN = 0.02
+
+
+def calibrate_axis(rest: Sequence[int], sweep: Sequence[int], one_sided: bool = False,
+                   expo: float = 0.0) -> AxisCalibration:
+    """Calibration of one axis from readings taken at rest and while sweeping it through its full travel."""
+    readings = list(rest) + list(sweep)
+    low, high = min(readings), max(readings)
+
+    if one_sided:
+        span = max(high - low, 1)
+        deadzone = (max(rest) - low) / span + DEADZONE_MARGIN
+        return AxisCalibration(low, low, high, round(min(deadzone, 0.5), 3), expo)
+
+    center = round(statistics.median(rest))
+    half = max(min(center - low, high - center), 1)
+    drift = max(abs(value - center) for value in rest)
+    deadzone = drift / half + DEADZONE_MARGIN
+
+    return AxisCalibration(low, center, high, round(min(deadzone, 0.5), 3), expo)
+
+
+async def _sample(dev, codes: dict, seconds: float) -> dict[str, list[int]]:
+    from evdev import ecodes
+
+    readings = {name: [] for name in codes.values()}
+
+    try:
+        async with asyncio.timeout(seconds):
+            async for event in dev.async_read_loop():
+                if event.type == ecodes.EV_ABS and event.code in codes:
+                    readings[codes[event.code]].append(event.value)
+    except TimeoutError:
+        pass
+
+    return readings
+
+
+async def calibrate(path: Path, rest_time: float, sweep_time: float, expo: float):
+    from evdev import InputDevice, ecodes
+
+    from .controller import Controller, ControllerState
+
+    node = Controller.find_node()
+    if node is None:
+        print("Controller not found")
+        return
+
+    dev = InputDevice(f"/dev/input/{node.name}")
+    print(f"Calibrating {dev.name} at {dev.path}")
+
+    names = Calibration.STICKS + Calibration.TRIGGERS
+    codes = {code: name for (type, code), name in ControllerState.EVENTS.items()
+             if type == ecodes.EV_ABS and name in names}
+
+    # the current position of every axis, in case one doesn't move while sampling
+    current = {codes[code]: info.value for code, info in dev.capabilities(absinfo=True).get(ecodes.EV_ABS, [])
+               if code in codes}
+
+    input("Leave both sticks centred and the triggers released, then press Enter")
+    rest = await _sample(dev, codes, rest_time)
+
+    print(f"Now move both sticks around their full range and squeeze both triggers for {sweep_time:g} seconds")
+    sweep = await _sample(dev, codes, sweep_time)
+    dev.close()
+
+    calibration = Calibration.load(path) if Path(path).exists() else Calibration()
+    for name in names:
+        at_rest = rest[name] or [current.get(name, calibration.axes[name].center)]
+        axis = calibrate_axis(at_rest, sweep[name], name in Calibration.TRIGGERS, expo)
+        if axis.high - axis.low < 64:
+            print(f" - {name} barely moved, keeping its previous calibration")
+            continue
+
+        calibration.axes[name] = axis
+        print(f" - {name}: {axis}")
+
+    calibration.save(path)
+    print(f"Saved to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the controller's sticks and triggers")
+    parser.add_argument("--file", type=Path, default=Calibration.FILE, help="calibration file to write")
+    parser.add_argument("--rest-time", type=float, default=2.0, help="seconds to sample at rest")
+    parser.add_argument("--sweep-time", type=float, default=8.0, help="seconds to sample the full travel")
+    parser.add_argument("--expo", type=float, default=0.0, help="response curve, 0 linear to 1 cubic")
+    args = parser.parse_args()
+
+    asyncio.run(calibrate(args.file, args.rest_time, args.sweep_time, args.expo))
+
+
+if __name__ == "__main__":
+    main()
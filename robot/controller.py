@@ -1,83 +1,643 @@
 from __future__ import annotations
 
+import os
+import time
+import struct
 import asyncio
 
+from array import array
+from collections import deque
 from typing import TYPE_CHECKING
 
-import aiofiles
-
 from aiopath import AsyncPath
 from pathlib import Path
 
-from evdev import InputDevice, InputEvent, ecodes, list_devices
+from evdev import InputDevice, InputEvent, ecodes
+
+from .calibration import Calibration
+from .input_log import InputRecorder
 
 if TYPE_CHECKING:
     from .sparky import Sparky
+    from .input_log import InputReplay
+    from .scheduler import Rate
+    from .uevent import UeventMonitor
 
 class ControllerLED:
+    """Lightbar of the controller, driven through its sysfs ``brightness`` files.
+
+    The files are opened once and kept open, and only channels whose value
+    changed are written, with a single non-blocking ``pwrite`` each, so a
+    color change costs at most three syscalls on the loop and repeating a
+    color costs none.
+    """
+
+    CHANNELS = ("red", "green", "blue")
+
     def __init__(self, base_path: AsyncPath) -> None:
+        self.fds = [None, None, None]
+        self.color = [None, None, None]  # last value written to each channel
+        self.open(base_path)
+
+    @property
+    def available(self) -> bool:
+        return any(fd is not None for fd in self.fds)
+
+    def open(self, base_path: AsyncPath):
+        self.close()
 
         base_path = Path(base_path) # eugh
 
-        if base_path.exists():
-            for path in base_path.glob("*red*"):
-                self.red = path.joinpath('brightness')
+        if not base_path.exists():
+            print("Could not find LEDs")
+            return
+
+        for i, channel in enumerate(self.CHANNELS):
+            # the first LED of the channel that opens, any others are left alone
+            for path in sorted(base_path.glob(f"*{channel}*")):
+                try:
+                    self.fds[i] = os.open(path.joinpath("brightness"), os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+                    break
+                except OSError as e:
+                    print(f"Could not open {channel} LED: {e}")
+
+    def close(self):
+        for i, fd in enumerate(self.fds):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+            self.fds[i] = None
+            self.color[i] = None
+
+    def write(self, color: tuple):
+        for i, value in enumerate(color):
+            fd = self.fds[i]
+            if fd is None or self.color[i] == value:
+                continue
+
+            try:
+                os.pwrite(fd, str(value).encode(), 0)
+                self.color[i] = value
+
+            except OSError as e:
+                # controller gone, stop writing until the LEDs are opened again
+                print(f"Could not set LED: {e}")
+                self.close()
+                return
+
+    async def set_color(self, color: tuple):
+        self.write(color)
+
+
+class ControllerBattery:
+    """Battery level and charging status of the controller, from its ``power_supply`` node.
+
+    The node is resolved once. With a :class:`~robot.uevent.UeventMonitor`
+    attached, values are taken from the change events the kernel sends
+    whenever the driver reports a new battery state, so they are fresh without
+    touching sysfs; otherwise :meth:`read` rereads the two attributes.
+    """
+
+    POLL_INTERVAL = 60
+
+    def __init__(self, base_path: AsyncPath) -> None:
+        self.capacity = 0
+        self.status = "Unknown"
+        self.path = None
+        self._unsubscribe = None
+        self.open(base_path)
+
+    @property
+    def name(self) -> str | None:
+        return self.path.name if self.path else None
+
+    @property
+    def charging(self) -> bool:
+        return self.status == "Charging"
+
+    def open(self, base_path: AsyncPath):
+        self.path = None
+
+        power_supply = Path(base_path).joinpath("device/device/power_supply")
+        for path in sorted(power_supply.glob("*")) if power_supply.exists() else ():
+            if path.joinpath("capacity").exists():
+                self.path = path
+                break
+
+        if self.path is None:
+            print("Could not find controller battery")
+            return
+
+        self.read()
+
+    def read(self):
+        if self.path is None:
+            return
+
+        try:
+            self.capacity = int(self.path.joinpath("capacity").read_text())
+
+            status = self.path.joinpath("status")
+            if status.exists():
+                self.status = status.read_text().strip()
+
+        except (OSError, ValueError) as e:
+            print(f"Could not read controller battery: {e}")
+
+    def attach(self, uevents: UeventMonitor):
+        """Follow power_supply change events from ``uevents`` instead of polling."""
+        self.detach()
+        self._unsubscribe = uevents.subscribe(self._on_uevent, "power_supply")
+
+    def detach(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _on_uevent(self, event: dict):
+        name = event.get("POWER_SUPPLY_NAME") or event.get("DEVPATH", "").rpartition("/")[2]
+        if self.name is None or name != self.name:
+            return
+
+        capacity = event.get("POWER_SUPPLY_CAPACITY")
+        if capacity is not None:
+            try:
+                self.capacity = int(capacity)
+            except ValueError:
+                pass
+
+        status = event.get("POWER_SUPPLY_STATUS")
+        if status:
+            self.status = status
+
+
+class LEDAnimation:
+    """Plays a blink pattern on a :class:`ControllerLED`.
+
+    A pattern is a sequence of ``(color, seconds)`` steps that repeats until
+    another one is played; a new pattern starts from its first step at the end
+    of the current one. Steps are timed by a :class:`~robot.scheduler.Rate`,
+    so they stay on an absolute grid however long a write takes.
+    """
+
+    def __init__(self, led: ControllerLED, rate: Rate) -> None:
+        self.led = led
+        self.rate = rate
+        self.pattern = ()
+        self._step = 0
+
+    def play(self, pattern):
+        self.pattern = tuple(pattern)
+        self._step = 0
+
+    async def run(self):
+        while True:
+            pattern = self.pattern
+            if not pattern:
+                await self.rate.sleep()
+                continue
+
+            color, duration = pattern[self._step % len(pattern)]
+            self._step += 1
+
+            self.led.write(color)
+            await self.rate.sleep(duration)
+
+
+def _state_field(name: str) -> property:
+    index = ControllerState.FIELDS.index(name)
+
+    def get(self):
+        return self.state[index]
+
+    def set(self, value):
+        self.state[index] = value
+
+    return property(get, set, doc=f"``{name}`` slot of the state vector")
+
+
+class ControllerState:
+    """Button and axis state of a DS4, kept in one compact array.
+
+    ``update_event`` resolves each evdev event through a dispatch table, a list
+    indexed by type of lists indexed by code, straight to its slot in
+    ``state``, so applying an event costs two list indexes and one store
+    however many buttons there are. The D-pad hat axes are resolved through
+    a lookup table of their own.
+    ``snapshot`` copies the whole state in one go.
+
+    Once :meth:`calibrate` has been called, stick and trigger readings go
+    through their axis' 256-entry response table on the way in, so deadzone,
+    range and curve cost one more lookup per event and every consumer sees
+    conditioned values.
+
+    Every ``SYN_REPORT`` that follows a change publishes a
+    :class:`ControllerSnapshot` to the iterators handed out by :meth:`subscribe`.
+    """
+
+    FIELDS = (
+        # Button states
+        "cross",
+        "circle",
+        "triangle",
+        "square",
+        "dpad_up",
+        "dpad_down",
+        "dpad_left",
+        "dpad_right",
+        "l1",
+        "r1",
+        "l2",  # Digital press
+        "r2",  # Digital press
+        "share",
+        "options",
+        "l3",
+        "r3",
+
+        # Analog stick and trigger positions
+        "left_stick_x",
+        "left_stick_y",
+        "right_stick_x",
+        "right_stick_y",
+        "l2_analog",  # Analog trigger L2
+        "r2_analog",  # Analog trigger R2
+    )
+
+    DEFAULTS = {
+        "left_stick_x": 128,
+        "left_stick_y": 128,
+        "right_stick_x": 128,
+        "right_stick_y": 128,
+    }
+
+    # (type, code) -> field name
+    EVENTS = {
+        (ecodes.EV_KEY, ecodes.BTN_SOUTH): "cross",
+        (ecodes.EV_KEY, ecodes.BTN_EAST): "circle",
+        (ecodes.EV_KEY, ecodes.BTN_NORTH): "triangle",
+        (ecodes.EV_KEY, ecodes.BTN_WEST): "square",
+        (ecodes.EV_KEY, ecodes.BTN_DPAD_UP): "dpad_up",
+        (ecodes.EV_KEY, ecodes.BTN_DPAD_DOWN): "dpad_down",
+        (ecodes.EV_KEY, ecodes.BTN_DPAD_LEFT): "dpad_left",
+        (ecodes.EV_KEY, ecodes.BTN_DPAD_RIGHT): "dpad_right",
+        (ecodes.EV_KEY, ecodes.BTN_TL): "l1",
+        (ecodes.EV_KEY, ecodes.BTN_TR): "r1",
+        (ecodes.EV_KEY, ecodes.BTN_TL2): "l2",
+        (ecodes.EV_KEY, ecodes.BTN_TR2): "r2",
+        (ecodes.EV_KEY, ecodes.BTN_SELECT): "share",
+        (ecodes.EV_KEY, ecodes.BTN_START): "options",
+        (ecodes.EV_KEY, ecodes.BTN_THUMBL): "l3",  # left stick press
+        (ecodes.EV_KEY, ecodes.BTN_THUMBR): "r3",  # right stick press
+
+        (ecodes.EV_ABS, ecodes.ABS_X): "left_stick_x",
+        (ecodes.EV_ABS, ecodes.ABS_Y): "left_stick_y",
+        (ecodes.EV_ABS, ecodes.ABS_RX): "right_stick_x",
+        (ecodes.EV_ABS, ecodes.ABS_RY): "right_stick_y",
+        (ecodes.EV_ABS, ecodes.ABS_Z): "l2_analog",
+        (ecodes.EV_ABS, ecodes.ABS_RZ): "r2_analog",
+    }
+
+    # D-pad hat axes: (type, code) -> (negative field, positive field)
+    HATS = {
+        (ecodes.EV_ABS, ecodes.ABS_HAT0X): ("dpad_left", "dpad_right"),
+        (ecodes.EV_ABS, ecodes.ABS_HAT0Y): ("dpad_up", "dpad_down"),
+    }
+
+    # hat value -> (negative, positive)
+    HAT_VALUES = {-1: (1, 0), 0: (0, 0), 1: (0, 1)}
+
+    # number of codes per event type, to size the dispatch tables
+    CODE_COUNTS = {ecodes.EV_KEY: ecodes.KEY_CNT, ecodes.EV_ABS: ecodes.ABS_CNT}
+
+    def __init__(self) -> None:
+        self.state = array("h", (self.DEFAULTS.get(name, 0) for name in self.FIELDS))
+
+        # list indexed by type of lists indexed by code of the slot the value goes in, None for types and
+        # codes that aren't a plain field; plain indexes rather than dict lookups, they're cheaper per event
+        slot = self.FIELDS.index
+        self._dispatch = [None] * (ecodes.EV_MAX + 1)
+        for type, count in self.CODE_COUNTS.items():
+            self._dispatch[type] = [None] * count
+        for (type, code), name in self.EVENTS.items():
+            self._dispatch[type][code] = slot(name)
+
+        self._hats = {key: (slot(neg), slot(pos)) for key, (neg, pos) in self.HATS.items()}
+
+        # slot -> response table of its axis, None for raw values
+        self._tables = [None] * len(self.FIELDS)
+
+        self._dirty = False
+        self._subscriptions = []
+
+    def calibrate(self, calibration: Calibration | None):
+        """Condition the axes in ``calibration`` from the next event on, or pass raw values through with None."""
+        self._tables = [None] * len(self.FIELDS)
+        if calibration is not None:
+            for name, table in calibration.tables().items():
+                self._tables[self.FIELDS.index(name)] = table
+
+    def snapshot(self) -> array:
+        """Copy of the state vector, indexed like ``FIELDS``."""
+        return self.state[:]
+
+    def reset(self):
+        """Back to sticks centred and nothing pressed, published to subscribers."""
+        for i, name in enumerate(self.FIELDS):
+            self.state[i] = self.DEFAULTS.get(name, 0)
+
+        self.publish()
+
+    def subscribe(self, coalesce: float = 0.0, maxlen: int = 32) -> ControllerSubscription:
+        """Async iterator of state changes, delivered on the calling thread's running loop.
+
+        The current state is yielded first. With ``coalesce`` set, changes
+        arriving within that many seconds of each other are merged into the
+        newest one.
+        """
+        subscription = ControllerSubscription(self, asyncio.get_running_loop(), coalesce, maxlen)
+        subscription.push(ControllerSnapshot(self.snapshot(), time.monotonic()))
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ControllerSubscription):
+        try:
+            self._subscriptions.remove(subscription)
+        except ValueError:
+            pass
+
+    def publish(self):
+        """Hand the current state to every subscriber."""
+        self._dirty = False
+        if not self._subscriptions:
+            return
+
+        snapshot = ControllerSnapshot(self.snapshot(), time.monotonic())
+        for subscription in list(self._subscriptions):
+            subscription.push(snapshot)
+
+    def update_state(self, values):
+        """Set every field from ``values``, indexed like ``FIELDS``, and publish if anything changed.
+
+        For sources that deliver whole states instead of events. Axis values
+        are conditioned the same way as in :meth:`update_event`.
+        """
+        state, tables = self.state, self._tables
+        changed = False
+
+        for slot, value in enumerate(values):
+            response = tables[slot]
+            if response is not None:
+                value = response[value]
+
+            if state[slot] != value:
+                state[slot] = value
+                changed = True
+
+        if changed:
+            self.publish()
 
-            for path in base_path.glob("*green*"):
-                self.green = path.joinpath('brightness')
+    def update_event(self, event: InputEvent):
+        codes = self._dispatch[event.type]
+        if codes is None:
+            # EV_SYN, EV_MSC, ...
+            if self._dirty and event.type == ecodes.EV_SYN and event.code == ecodes.SYN_REPORT:
+                self.publish()
+            return
+
+        slot = codes[event.code]
+        if slot is not None:
+            response = self._tables[slot]
+            if response is None:
+                # evdev only reports values that changed
+                self.state[slot] = event.value
+                self._dirty = True
+                return
+
+            # jitter that conditions away (e.g. drift inside the deadzone) is not a change
+            value = response[event.value]
+            state = self.state
+            if state[slot] != value:
+                state[slot] = value
+                self._dirty = True
+            return
 
-            for path in base_path.glob("*blue*"):
-                self.blue = path.joinpath('brightness')
+        hat = self._hats.get((event.type, event.code))
+        if hat is not None:
+            self.state[hat[0]], self.state[hat[1]] = self.HAT_VALUES.get(event.value, (0, 0))
+            self._dirty = True
+
+        elif event.type == ecodes.EV_KEY:
+            print(f" - UNHANDLED EV_KEY: {event.code} {ecodes.KEY.get(event.code)}")
 
         else:
-            print("Could not find LEDs")
+            print(f" - UNHANDLED EV_ABS: {event.code} {ecodes.ABS.get(event.code)}")
 
-    async def _write_color(self, path, value):
-        async with aiofiles.open(path, mode='w') as f:
-            await f.write(str(value))
 
-    async def set_color(self, color: tuple):
-        await self._write_color(self.red, color[0])
-        await self._write_color(self.green, color[1])
-        await self._write_color(self.blue, color[2])
-
-
-class Controller:
-    # Button states
-    cross = 0
-    circle = 0
-    triangle = 0
-    square = 0
-    dpad_up = 0
-    dpad_down = 0
-    dpad_left = 0
-    dpad_right = 0
-    l1 = 0
-    r1 = 0
-    l2 = 0  # Digital press
-    r2 = 0  # Digital press
-    share = 0
-    options = 0
-    l3 = 0
-    r3 = 0
-
-    # Analog stick and trigger positions
-    left_stick_x = 128
-    left_stick_y = 128
-    right_stick_x = 128
-    right_stick_y = 128
-    l2_analog = 0  # Analog trigger L2
-    r2_analog = 0  # Analog trigger R2
-
-    battery = 0
-
-
-    def __init__(self, robot: Sparky) -> None:
+class ControllerSnapshot:
+    """Copy of the controller state taken when a report was published, with the same named fields.
+
+    ``stamp`` is the ``time.monotonic()`` the report was published at.
+    """
+
+    __slots__ = ("state", "stamp")
+
+    def __init__(self, state: array, stamp: float) -> None:
+        self.state = state
+        self.stamp = stamp
+
+
+class ControllerSubscription:
+    """Controller state changes as an async iterator bound to one event loop.
+
+    :meth:`push` may be called from any thread; the consumer is woken through
+    ``call_soon_threadsafe``, at most once per batch of pushes. Snapshots are
+    kept in a bounded queue, so a consumer that falls behind loses the oldest
+    ones rather than stalling the producer. If the consumer's loop stops the
+    subscription closes itself on the next push.
+    """
+
+    def __init__(self, source: ControllerState, loop: asyncio.AbstractEventLoop, coalesce: float = 0.0,
+                 maxlen: int = 32) -> None:
+        self.source = source
+        self.loop = loop
+        self.coalesce = coalesce
+        self.closed = False
+
+        self._queue = deque(maxlen=maxlen)
+        self._ready = asyncio.Event()
+        self._wake_pending = False
+
+    def push(self, snapshot: ControllerSnapshot):
+        if self.closed:
+            return
+
+        if not self.loop.is_running():
+            self.close()
+            return
+
+        self._queue.append(snapshot)
+        if not self._wake_pending:
+            self._wake_pending = True
+            try:
+                self.loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:  # loop closed
+                self.close()
+
+    def _wake(self):
+        self._wake_pending = False
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self.source.unsubscribe(self)
+
+        if self.loop.is_running():
+            try:
+                self.loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ControllerSnapshot:
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self.coalesce:
+            await asyncio.sleep(self.coalesce)
+            snapshot = self._queue[-1]
+            self._queue.clear()
+            return snapshot
+
+        return self._queue.popleft()
+
+
+for _name in ControllerState.FIELDS:
+    setattr(ControllerState, _name, _state_field(_name))
+    setattr(ControllerSnapshot, _name, _state_field(_name))
+del _name
+
+
+# capability bitmaps in sysfs are printed as space separated longs, most significant first
+_LONG_BITS = struct.calcsize("l") * 8
+
+
+def _has_capability(path: Path, code: int) -> bool:
+    bits = 0
+    for word in path.read_text().split():
+        bits = (bits << _LONG_BITS) | int(word, 16)
+
+    return bool(bits >> code & 1)
+
+
+class Controller(ControllerState):
+    """The PS4 controller, followed across disconnects.
+
+    :meth:`events` supervises the input device: when the controller drops
+    out the state goes back to neutral, the robot is disabled, and the
+    controller is bound again as soon as it reappears, with the LED and
+    battery reopened. A missing controller at boot is waited for the same way.
+    """
+
+    # how often to look for the controller without hotplug events, in seconds
+    RESCAN_INTERVAL = 0.5
+
+    SYSFS_INPUT = Path("/sys/class/input")
+
+    def __init__(self, robot: Sparky, dev: InputDevice | InputReplay = None, calibration: Calibration = None) -> None:
+        super().__init__()
+        self.calibrate(calibration or Calibration.load())
+
         self.robot = robot
+        self.recorder = None
+        self.reconnects = 0
+        self.dev = None
 
+        # sysfs node of the controller's event device, kept to be checked first when it reconnects
+        self.node = None
         self.dev_base_path = AsyncPath("/sys/class/input/js0/")
 
-        self.dev = self._find_controller_dev()
+        self.is_ready = asyncio.Event()
+
+        # anything with async_read_loop() and capabilities() will do, e.g. an InputReplay
+        dev = dev or self._find_controller_dev()
+
+        self.led = ControllerLED(self.dev_base_path.joinpath("device/device/leds/"))
+        self.power = ControllerBattery(self.dev_base_path)
+
+        if dev is None:
+            print("Controller not found, waiting for it to connect")
+        else:
+            self._bind(dev)
+
+    def _find_controller_dev(self) -> InputDevice | None:
+        node = self._find_controller_node()
+        if node is None:
+            return None
+
+        path = f"/dev/input/{node.name}"
+        try:
+            device = InputDevice(path)
+        except OSError as e:
+            # just appeared and not accessible yet, or already gone
+            print(f"Could not open {path}: {e}")
+            return None
+
+        print(f"PS4 controller found: {device.name} at {device.path}")
+
+        # the LEDs and battery hang off the same HID device as the event node
+        self.dev_base_path = AsyncPath(node)
+        return device
+
+    def _find_controller_node(self) -> Path | None:
+        node = self.find_node(self.node)
+        if node is not None:
+            self.node = node
+
+        return node
+
+    @classmethod
+    def find_node(cls, cached: Path = None) -> Path | None:
+        """Event node of the controller, found from sysfs without opening any device, checking ``cached`` first."""
+        if cached is not None and cls._is_controller(cached):
+            return cached
+
+        nodes = [node for node in cls.SYSFS_INPUT.glob("event*") if node.name[5:].isdigit()]
+        for node in sorted(nodes, key=lambda node: int(node.name[5:])):
+            if node != cached and cls._is_controller(node):
+                return node
+
+        return None
+
+    @staticmethod
+    def _is_controller(node: Path) -> bool:
+        device = node.joinpath("device")
+        try:
+            name = device.joinpath("name").read_text().strip()
+
+            if "Motion" in name or "Touchpad" in name:
+                return False  # the motion sensors and touchpad are sub devices of their own
+
+            if "Sony" not in name and "Wireless Controller" not in name:
+                return False
+
+            # the gamepad itself has the face buttons and sticks
+            return (_has_capability(device.joinpath("capabilities/key"), ecodes.BTN_SOUTH)
+                    and _has_capability(device.joinpath("capabilities/abs"), ecodes.ABS_X))
+
+        except (OSError, ValueError):
+            return False
+
+    def _bind(self, dev: InputDevice | InputReplay):
+        self.dev = dev
 
         for event_type, events in self.dev.capabilities(absinfo=True).items():
             for event in events:
@@ -86,109 +646,81 @@ class Controller:
 
                     self.update_event(InputEvent(sec=0, usec=0, type=ecodes.EV_ABS, code=event_code, value=absinfo.value))
 
-        self.led = ControllerLED(self.dev_base_path.joinpath("device/device/leds/"))
+        if self.reconnects:
+            self.led.open(self.dev_base_path.joinpath("device/device/leds/"))
+            self.power.open(self.dev_base_path)
 
-        self.is_ready = asyncio.Event()
+        self.is_ready.set()
 
-    def _find_controller_dev(self) -> InputDevice:
-        for device in [InputDevice(path) for path in list_devices()]:
-            # Print the name to see the device names
-            print(f"Checking device: {device.name} - {device.info} - {device.path}")
+    def _unbind(self):
+        self.is_ready.clear()
 
-            if "Motion" in device.name or "Touchpad" in device.name:
-                continue  # for some reason it links to sub devices like the touchpad, so stop that
+        try:
+            self.dev.close()
+        except Exception:
+            pass
 
-            # Check if this device is a PS4 controller by name
-            if "Sony" in device.name or "Wireless Controller" in device.name:
-                print(f"PS4 controller found: {device.name} at {device.path}")
-                return device
+        self.dev = None
+        self.led.close()
+        self.reset()
 
-        raise Exception("Controller not found.")
+    async def _wait_for_controller(self) -> InputDevice:
+        uevents = getattr(self.robot, "uevents", None)
 
-    def update_event(self, event: InputEvent):
-        # Update button states for EV_KEY events (buttons)
-        if event.type == ecodes.EV_KEY:
-            if event.code == ecodes.BTN_SOUTH:  # Cross
-                self.cross = event.value
-            elif event.code == ecodes.BTN_EAST:  # Circle
-                self.circle = event.value
-            elif event.code == ecodes.BTN_NORTH:  # Triangle
-                self.triangle = event.value
-            elif event.code == ecodes.BTN_WEST:  # Square
-                self.square = event.value
-            elif event.code == ecodes.BTN_DPAD_UP:
-                self.dpad_up = event.value
-            elif event.code == ecodes.BTN_DPAD_DOWN:
-                self.dpad_down = event.value
-            elif event.code == ecodes.BTN_DPAD_LEFT:
-                self.dpad_left = event.value
-            elif event.code == ecodes.BTN_DPAD_RIGHT:
-                self.dpad_right = event.value
-            elif event.code == ecodes.BTN_TL:  # L1
-                self.l1 = event.value
-            elif event.code == ecodes.BTN_TR:  # R1
-                self.r1 = event.value
-            elif event.code == ecodes.BTN_TL2:  # L2 digital
-                self.l2 = event.value
-            elif event.code == ecodes.BTN_TR2:  # R2 digital
-                self.r2 = event.value
-            elif event.code == ecodes.BTN_SELECT:  # Share
-                self.share = event.value
-            elif event.code == ecodes.BTN_START:  # Options
-                self.options = event.value
-            elif event.code == ecodes.BTN_THUMBL:  # L3 (left stick press)
-                self.l3 = event.value
-            elif event.code == ecodes.BTN_THUMBR:  # R3 (right stick press)
-                self.r3 = event.value
-            else:
-                print(f" - UNHANDLED EV_KEY: {event.code} {ecodes.KEY[event.code]}")
-
-        # Update analog stick and trigger positions for EV_ABS events
-        elif event.type == ecodes.EV_ABS:
-            if event.code == ecodes.ABS_X:  # Left stick X axis
-                self.left_stick_x = event.value
-            elif event.code == ecodes.ABS_Y:  # Left stick Y axis
-                self.left_stick_y = event.value
-            elif event.code == ecodes.ABS_RX:  # Right stick X axis
-                self.right_stick_x = event.value
-            elif event.code == ecodes.ABS_RY:  # Right stick Y axis
-                self.right_stick_y = event.value
-            elif event.code == ecodes.ABS_Z:  # L2 trigger analog
-                self.l2_analog = event.value
-            elif event.code == ecodes.ABS_RZ:  # R2 trigger analog
-                self.r2_analog = event.value
-            elif event.code == ecodes.ABS_HAT0X:  # D-pad X axis
-                if event.value == -1:
-                    self.dpad_left = 1
-                    self.dpad_right = 0
-                elif event.value == 1:
-                    self.dpad_right = 1
-                    self.dpad_left = 0
-                else:
-                    self.dpad_left = 0
-                    self.dpad_right = 0
-            elif event.code == ecodes.ABS_HAT0Y:  # D-pad Y axis
-                if event.value == -1:
-                    self.dpad_up = 1
-                    self.dpad_down = 0
-                elif event.value == 1:
-                    self.dpad_down = 1
-                    self.dpad_up = 0
-                else:
-                    self.dpad_up = 0
-                    self.dpad_down = 0
+        while True:
+            dev = self._find_controller_dev()
+            if dev is not None:
+                return dev
+
+            if uevents is not None and uevents.running:
+                # an input node appearing is the cue to look again, the timeout covers missed events
+                await uevents.wait_for(lambda event: event.get("ACTION") == "add", self.RESCAN_INTERVAL, "input")
             else:
-                print(f" - UNHANDLED EV_ABS: {event.code} {ecodes.ABS[event.code]}")
+                await asyncio.sleep(self.RESCAN_INTERVAL)
+
+    def record(self, path):
+        """Log every event from now on to ``path``, starting with the current state."""
+        self.stop_recording()
+        self.recorder = InputRecorder(path)
+        self.recorder.record_state((type, code, getattr(self, name)) for (type, code), name in self.EVENTS.items())
+        print(f"Recording controller input to {path}")
 
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.count} controller events to {self.recorder.path}")
+            self.recorder = None
 
     async def events(self):
         try:
-            async for event in self.dev.async_read_loop():
-                self.update_event(event)
+            while True:
+                try:
+                    if self.dev is None:
+                        dev = await self._wait_for_controller()
+                        self.reconnects += 1
+                        # can drop again while it's being bound, that's handled like any other disconnect
+                        self._bind(dev)
+                        print("Controller Connected")
+
+                    async for event in self.dev.async_read_loop():
+                        if self.recorder:
+                            self.recorder.record(event)
+
+                        self.update_event(event)
+
+                    # only a replay runs out of events, which lets go of everything like a disconnect does
+                    self.reset()
+
+                    if self.robot.enabled:
+                        await self.robot.set_enabled(False)
+                    return
+
+                except OSError:
+                    print("Controller Disconnected")
+                    self._unbind()
 
-        except OSError:
-            print("Controller Disconnected")
-            await self.robot.set_enabled(False)
+                    if self.robot.enabled:
+                        await self.robot.set_enabled(False)
 
         except asyncio.CancelledError:
             print("Cancelled")
@@ -196,26 +728,37 @@ class Controller:
         except Exception as e:
             print(e)
 
+    @property
+    def battery(self) -> int:
+        return self.power.capacity
+
+    @property
+    def charging(self) -> bool:
+        return self.power.charging
+
     async def polling(self):
+        # battery changes arrive as power_supply uevents, only poll without them
+        uevents = getattr(self.robot, "uevents", None)
+        if uevents is not None and uevents.running:
+            self.power.attach(uevents)
+            return
+
+        rate = self.robot.scheduler.rate("battery", 1 / ControllerBattery.POLL_INTERVAL)
+
         try:
             while True:
-                # battery percentage
-                async for path in self.dev_base_path.joinpath("device/device/power_supply/").glob("*/capacity"):
-                    async with aiofiles.open(path) as fp:
-                        self.battery = int(await fp.read())
-
-                await asyncio.sleep(60)
+                await rate.sleep()
+                self.power.read()
 
         except asyncio.CancelledError:
-            print("EEEEEEEEE")
             return
 
         except Exception as e:
             print(e)
 
-
-    def stop(self): ...
-        # self._stop.set()
+    def stop(self):
+        self.stop_recording()
+        self.power.detach()
 
     def __str__(self):
         return (f"Cross: {self.cross}, Circle: {self.circle}, Triangle: {self.triangle}, Square: {self.square}\n"
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import sys
+import asyncio
+
+from typing import TYPE_CHECKING, Callable
+
+from serial.tools import list_ports
+
+if TYPE_CHECKING:
+    from serial.tools.list_ports_common import ListPortInfo
+
+    from .uevent import UeventMonitor
+
+
+class DeviceRegistry:
+    """Serial devices attached to the robot, enumerated once and kept up to date by hotplug events.
+
+    Ports are cached by USB identity (VID, PID, serial number), which stays the
+    same when a board re-enumerates under a different ``/dev`` name, and lets
+    several boards from the same manufacturer be told apart. Once attached to a
+    :class:`~robot.uevent.UeventMonitor`, added and removed ports are picked up
+    from their sysfs entries one at a time, without scanning the bus again.
+    """
+
+    # manufacturer strings reported by the boards on the robot
+    MOTION = "Teensyduino"
+    LIDAR = "Silicon Labs"
+    FACE = "Espressif Systems"
+
+    ADDED = "add"
+    REMOVED = "remove"
+
+    def __init__(self) -> None:
+        self.ports: dict[tuple, ListPortInfo] = {}
+        self.scans = 0
+        self._subscribers = []
+        self._unsubscribe = None
+
+    @staticmethod
+    def identity(port: ListPortInfo) -> tuple:
+        # ports without a serial number fall back to their device path
+        return (port.vid, port.pid, port.serial_number or port.device)
+
+    def scan(self):
+        """Enumerate every serial port and publish the differences from the cache."""
+        self.scans += 1
+        found = {self.identity(port): port for port in list_ports.comports()}
+
+        for key in [key for key in self.ports if key not in found]:
+            self._publish(self.REMOVED, self.ports.pop(key))
+
+        for key, port in found.items():
+            known = self.ports.get(key)
+            self.ports[key] = port
+            if known is None or known.device != port.device:
+                self._publish(self.ADDED, port)
+
+    def attach(self, uevents: UeventMonitor):
+        """Follow tty hotplug events from ``uevents`` instead of rescanning."""
+        self.detach()
+        self._unsubscribe = uevents.subscribe(self._on_uevent, "tty")
+
+    def detach(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def find(self, manufacturer: str, serial_number: str = None) -> ListPortInfo | None:
+        """First cached port from ``manufacturer``, optionally pinned to one board by serial number."""
+        if not self.scans:
+            self.scan()
+
+        for port in self.ports.values():
+            if port.manufacturer != manufacturer:
+                continue
+
+            if serial_number is None or port.serial_number == serial_number:
+                return port
+
+        return None
+
+    def require(self, manufacturer: str, serial_number: str = None, name: str = None) -> str:
+        """Device path of the matching port, raising if it is not attached."""
+        port = self.find(manufacturer, serial_number)
+        if port is None:
+            raise Exception(f"Could not connect to {name or manufacturer}")
+
+        return port.device
+
+    def subscribe(self, callback: Callable[[str, ListPortInfo], None]) -> Callable[[], None]:
+        """Call ``callback(action, port)`` whenever a port is added or removed. Returns an unsubscribe function."""
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            try:
+                self._subscribers.remove(callback)
+            except ValueError:
+                pass
+
+        return unsubscribe
+
+    async def wait_for(self, manufacturer: str, timeout: float, serial_number: str = None) -> ListPortInfo | None:
+        """Wait up to ``timeout`` seconds for a matching port to be added, returning it or None."""
+        future = asyncio.get_running_loop().create_future()
+
+        def check(action, port):
+            if (not future.done() and action == self.ADDED and port.manufacturer == manufacturer
+                    and (serial_number is None or port.serial_number == serial_number)):
+                future.set_result(port)
+
+        unsubscribe = self.subscribe(check)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            unsubscribe()
+
+    def _on_uevent(self, event: dict):
+        name = event.get("DEVNAME")
+        if not name:
+            return
+
+        device = name if name.startswith("/dev/") else f"/dev/{name}"
+        action = event.get("ACTION")
+
+        if action == "remove":
+            for key, port in list(self.ports.items()):
+                if port.device == device:
+                    del self.ports[key]
+                    self._publish(self.REMOVED, port)
+
+        elif action == "add":
+            port = self._describe(device)
+            if port is None:
+                return
+
+            key = self.identity(port)
+            self.ports[key] = port
+            self._publish(self.ADDED, port)
+
+    @staticmethod
+    def _describe(device: str) -> ListPortInfo | None:
+        if not sys.platform.startswith("linux"):
+            return None
+
+        from serial.tools.list_ports_linux import SysFS
+
+        port = SysFS(device)
+        if port.subsystem in (None, "platform"):
+            return None
+
+        return port
+
+    def _publish(self, action: str, port: ListPortInfo):
+        for callback in list(self._subscribers):
+            try:
+                callback(action, port)
+            except Exception as e:
+                print(f"Device subscriber failed: {e}")
@@ -14,11 +14,14 @@ class Face:
 
     BAUD_RATE   = 115200
 
-    def __init__(self):
-        self.ser = serial.Serial(self._find_serial_dev(), self.BAUD_RATE, timeout=1)
+    def __init__(self, devices=None):
+        self.ser = serial.Serial(self._find_serial_dev(devices), self.BAUD_RATE, timeout=1)
         time.sleep(2)  # wait for ESP32 to reboot after serial connect
 
-    def _find_serial_dev(self):
+    def _find_serial_dev(self, devices=None):
+        if devices is not None:
+            return devices.require(devices.FACE, name="face controller")
+
         for port in list_ports.comports():
             if port.manufacturer == 'Espressif Systems':
                 return port.device
@@ -1,13 +1,16 @@
 # robot/gesture_engine.py
 
-import cv2
+from __future__ import annotations
+
 import time
 import logging
 from collections import deque
+from typing import TYPE_CHECKING
 
-import numpy as np
-from pycoral.utils import edgetpu
-from pycoral.adapters import common, classify
+# OpenCV, numpy and pycoral take a while to import, and only the process
+# that recognises gestures needs them: they're imported on first use.
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class Gesture:
@@ -37,6 +40,9 @@ class GestureEngine:
     ) -> None:
         self.logger = logging.getLogger(__name__)
 
+        from pycoral.utils import edgetpu
+        from pycoral.adapters import common
+
         # Load model
         self.interpreter = edgetpu.make_interpreter(model_path)
         self.interpreter.allocate_tensors()
@@ -47,15 +53,15 @@ class GestureEngine:
         # Load labels
         self.labels = self._load_labels(labels_path)
 
-        # Camera
-        self.cap = cv2.VideoCapture(camera_index)
-        if not self.cap.isOpened():
-            raise RuntimeError("GestureEngine: camera could not be opened")
-
         # History for majority vote
         self.history = deque(maxlen=history_len)
         self.last_gesture = None
 
+        # Camera
+        self.camera_index = camera_index
+        self.cap = None
+        self.open()
+
         self.score_threshold = score_threshold
 
         # Map label string -> Gesture enum
@@ -83,6 +89,9 @@ class GestureEngine:
             }
 
     def _preprocess(self, frame: np.ndarray) -> np.ndarray:
+        import cv2
+        import numpy as np
+
         # Resize to model input size, convert BGR->RGB
         w, h = self.input_size
         resized = cv2.resize(frame, (w, h))
@@ -122,6 +131,8 @@ class GestureEngine:
         self.interpreter.set_tensor(self.input_details[0]["index"], input_tensor)
         self.interpreter.invoke()
 
+        from pycoral.adapters import classify
+
         classes = classify.get_classes(
             self.interpreter, top_k=1, score_threshold=self.score_threshold
         )
@@ -161,6 +172,21 @@ class GestureEngine:
         )
         return gesture
 
+    def open(self) -> None:
+        """Open the camera, if it isn't already; the model stays loaded across close() and open()."""
+        if self.cap is not None:
+            return
+
+        import cv2
+
+        cap = cv2.VideoCapture(self.camera_index)
+        if not cap.isOpened():
+            raise RuntimeError("GestureEngine: camera could not be opened")
+
+        self.cap = cap
+        self.history.clear()
+        self.last_gesture = None
+
     def close(self) -> None:
         if self.cap is not None:
             self.cap.release()
@@ -172,3 +198,59 @@ class GestureEngine:
             self.close()
         except Exception:
             pass
+
+
+def gesture_command(gesture: int | None) -> tuple:
+    """
+    Sparky.move() values for a gesture, as a "virtual controller":
+    (rfb, rlr, lfb, llr, rt, lt, dpad_u, dpad_d, dpad_l, dpad_r,
+    triangle, cross, square, circle). No gesture means no movement.
+    """
+    # Default: no movement if no new gesture
+    rfb = rlr = lfb = llr = 0
+    rt = lt = 0
+    dpad_u = dpad_d = dpad_l = dpad_r = 0
+    triangle = cross = square = circle = 0
+
+    if gesture == Gesture.STOP:
+        # Stand still
+        pass  # everything already zero
+
+    elif gesture == Gesture.WALK_FORWARD:
+        # Right stick up: forward
+        rfb = 128  # same scale as manual: -128..127
+
+    elif gesture == Gesture.WALK_BACKWARD:
+        # Right stick down: backward
+        rfb = -128
+
+    elif gesture == Gesture.SIT:
+        # Triangle press
+        triangle = 1
+
+    elif gesture == Gesture.PUSH_DOWN:
+        # Cross press
+        cross = 1
+
+    return (rfb, rlr, lfb, llr, rt, lt, dpad_u, dpad_d, dpad_l, dpad_r, triangle, cross, square, circle)
+
+
+def gesture_worker(channel, stop, model_path: str, labels_path: str, camera_index: int, rate_hz: float) -> None:
+    """
+    Body of the isolated gesture mode's child process: recognise gestures
+    at up to ``rate_hz`` and send the resulting commands through the
+    CommandChannel until ``stop`` is set.
+    """
+    engine = GestureEngine(model_path=model_path, labels_path=labels_path, camera_index=camera_index)
+    period = 1.0 / rate_hz
+
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            channel.beat()
+
+            channel.send(gesture_command(engine.get_gesture()))
+
+            stop.wait(max(0.0, period - (time.monotonic() - started)))
+    finally:
+        engine.close()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import math
+import asyncio
+
+from array import array
+from pathlib import Path
+
+from evdev import InputDevice, ecodes
+
+from .metrics import RateMeter
+
+
+class RingBuffer:
+    """Fixed-size buffer of samples, each ``width`` floats, overwriting the oldest once full.
+
+    Storage is one preallocated ``array('d')``, so appending allocates nothing.
+    """
+
+    def __init__(self, capacity: int, width: int) -> None:
+        self.capacity = capacity
+        self.width = width
+        self.data = array("d", bytes(8 * capacity * width))
+        self.count = 0  # samples appended since creation
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, sample: array):
+        start = (self.count % self.capacity) * self.width
+        self.data[start:start + self.width] = sample
+        self.count += 1
+
+    def latest(self, n: int = 1) -> list[array]:
+        """Copies of the newest ``n`` samples, oldest first."""
+        n = min(n, len(self))
+        samples = []
+        for i in range(self.count - n, self.count):
+            start = (i % self.capacity) * self.width
+            samples.append(self.data[start:start + self.width])
+
+        return samples
+
+    def clear(self):
+        self.count = 0
+
+
+class ComplementaryFilter:
+    """Pitch and roll of the controller from its accelerometer and gyro.
+
+    The gyro rate is integrated for a smooth, fast response and pulled
+    towards the tilt of gravity measured by the accelerometer with time
+    constant ``tau``, which cancels the gyro's drift. Angles are in degrees,
+    zero with the controller lying flat: pitch is the right-handed rotation
+    about the controller's X axis (tilting it forwards or backwards) and roll
+    about its Z axis (tilting it sideways).
+    """
+
+    def __init__(self, tau: float = 0.5) -> None:
+        self.tau = tau
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.initialised = False
+
+    def reset(self):
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.initialised = False
+
+    def update(self, accel: tuple, gyro: tuple, dt: float) -> tuple[float, float]:
+        ax, ay, az = accel
+        gx, gy, gz = gyro
+
+        # lying flat gravity is along +Y
+        accel_pitch = math.degrees(math.atan2(-az, ay))
+        accel_roll = math.degrees(math.atan2(ax, ay))
+
+        if not self.initialised or dt <= 0:
+            self.pitch, self.roll = accel_pitch, accel_roll
+            self.initialised = True
+            return self.pitch, self.roll
+
+        alpha = self.tau / (self.tau + dt)
+        self.pitch = alpha * (self.pitch + gx * dt) + (1 - alpha) * accel_pitch
+        self.roll = alpha * (self.roll + gz * dt) + (1 - alpha) * accel_roll
+
+        return self.pitch, self.roll
+
+
+class MotionSensors:
+    """Accelerometer and gyro of the PS4 controller from its "Motion Sensors" evdev node.
+
+    The node reports at around 250 Hz. Instead of a coroutine per event the
+    file descriptor is registered with the loop, and every wakeup drains all
+    pending events in one ``read()``. Each complete report is converted to g
+    and deg/s using the axis resolutions, stored with its timestamp in a
+    preallocated :class:`RingBuffer` and fed to a :class:`ComplementaryFilter`.
+    ``orientation`` always holds the latest ``(pitch, roll)``.
+    """
+
+    RATE_HZ = 250
+
+    # ring buffer columns
+    COLUMNS = ("time", "ax", "ay", "az", "gx", "gy", "gz")
+
+    ACCEL = (ecodes.ABS_X, ecodes.ABS_Y, ecodes.ABS_Z)
+    GYRO = (ecodes.ABS_RX, ecodes.ABS_RY, ecodes.ABS_RZ)
+
+    # fallback resolutions of the DS4, units per g and per deg/s
+    ACCEL_RESOLUTION = 8192
+    GYRO_RESOLUTION = 1024
+
+    def __init__(self, dev: InputDevice, capacity: int = 512, tau: float = 0.5) -> None:
+        self.dev = dev
+        self.buffer = RingBuffer(capacity, len(self.COLUMNS))
+        self.filter = ComplementaryFilter(tau)
+        self.orientation = (0.0, 0.0)
+        self.rate = RateMeter()
+        self.reports = 0
+
+        self._loop = None
+
+        # evdev code -> (column in the pending sample, scale)
+        self._axes = {}
+        resolutions = dict(dev.capabilities(absinfo=True).get(ecodes.EV_ABS, []))
+        for column, code in enumerate(self.ACCEL + self.GYRO, start=1):
+            default = self.ACCEL_RESOLUTION if code in self.ACCEL else self.GYRO_RESOLUTION
+            info = resolutions.get(code)
+            self._axes[code] = (column, 1.0 / (info.resolution if info and info.resolution else default))
+
+        self._sample = array("d", bytes(8 * len(self.COLUMNS)))
+        self._sensor_time = None  # MSC_TIMESTAMP of the report being read, in microseconds
+        self._last_time = None
+        self._last_stamp = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        self._loop = loop or asyncio.get_event_loop()
+        self._loop.add_reader(self.dev.fd, self._on_readable)
+
+    def close(self):
+        if self._loop is not None:
+            try:
+                self._loop.remove_reader(self.dev.fd)
+            except Exception:
+                pass
+            self._loop = None
+
+        try:
+            self.dev.close()
+        except Exception:
+            pass
+
+    def _on_readable(self):
+        try:
+            events = list(self.dev.read())
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"Motion sensors disconnected: {e}")
+            self.close()
+            return
+
+        for event in events:
+            self.handle(event)
+
+    def handle(self, event):
+        if event.type == ecodes.EV_ABS:
+            axis = self._axes.get(event.code)
+            if axis is not None:
+                self._sample[axis[0]] = event.value * axis[1]
+
+        elif event.type == ecodes.EV_MSC and event.code == ecodes.MSC_TIMESTAMP:
+            self._sensor_time = event.value
+
+        elif event.type == ecodes.EV_SYN and event.code == ecodes.SYN_REPORT:
+            self._commit(event.sec + event.usec / 1e6)
+
+    def _commit(self, stamp: float):
+        sample = self._sample
+
+        # the sensor's own clock gives the spacing between reports, event times carry transport jitter
+        if self._sensor_time is not None and self._last_time is not None:
+            dt = ((self._sensor_time - self._last_time) % (1 << 32)) / 1e6
+        elif self._last_stamp is not None:
+            dt = stamp - self._last_stamp
+        else:
+            dt = 0.0
+
+        self._last_time = self._sensor_time
+        self._last_stamp = stamp
+        sample[0] = stamp
+
+        self.buffer.append(sample)
+        self.orientation = self.filter.update(sample[1:4], sample[4:7], dt)
+        self.rate.add(1, stamp)
+        self.reports += 1
+
+
+def find_motion_sensors(sysfs: Path, controller_node: Path = None) -> Path | None:
+    """Event node of a PS4 controller's motion sensors, preferring the one belonging to ``controller_node``."""
+    def parent(node: Path):
+        try:
+            return node.joinpath("device/device").resolve()
+        except OSError:
+            return None
+
+    wanted = parent(controller_node) if controller_node is not None else None
+    found = None
+
+    for node in sorted(sysfs.glob("event*")):
+        try:
+            name = node.joinpath("device/name").read_text().strip()
+        except OSError:
+            continue
+
+        if "Motion Sensors" not in name or ("Sony" not in name and "Wireless Controller" not in name):
+            continue
+
+        if wanted is None or parent(node) == wanted:
+            return node
+
+        found = found or node
+
+    return found
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+import struct
+import asyncio
+
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from evdev import InputEvent, ecodes
+
+
+class InputRecorder:
+    """Writes raw evdev events to a compact binary log.
+
+    The log is an 8 byte header followed by one 16 byte record per event:
+    ``sec`` and ``usec`` as uint32, ``type`` and ``code`` as uint16 and
+    ``value`` as int32, all little-endian. Writes go through the file's own
+    buffer, so recording costs one ``struct.pack`` per event on the loop.
+    """
+
+    MAGIC = b"SPKYEV\x00\x01"
+    RECORD = struct.Struct("<IIHHi")
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.count = 0
+
+        self._file = open(self.path, "wb")
+        self._file.write(self.MAGIC)
+
+    def record(self, event: InputEvent):
+        self._file.write(self.RECORD.pack(event.sec, event.usec, event.type, event.code, event.value))
+        self.count += 1
+
+    def record_state(self, events: Iterable[tuple[int, int, int]]):
+        """Write ``(type, code, value)`` tuples stamped with the current time, e.g. the starting axis positions."""
+        sec, usec = divmod(time.time_ns() // 1000, 1_000_000)
+        for type, code, value in events:
+            self.record(InputEvent(sec, usec, type, code, value))
+        self.record(InputEvent(sec, usec, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_log(path: str | Path) -> Iterator[InputEvent]:
+    """Events of a log written by :class:`InputRecorder`, in the order they were recorded."""
+    data = Path(path).read_bytes()
+
+    header = len(InputRecorder.MAGIC)
+    if data[:header] != InputRecorder.MAGIC:
+        raise ValueError(f"{path} is not an input log")
+
+    # a recording cut off mid-write loses only its last, partial record
+    end = header + (len(data) - header) // InputRecorder.RECORD.size * InputRecorder.RECORD.size
+
+    for sec, usec, type, code, value in InputRecorder.RECORD.iter_unpack(memoryview(data)[header:end]):
+        yield InputEvent(sec, usec, type, code, value)
+
+
+class InputReplay:
+    """Plays a recorded input log back in place of an ``evdev.InputDevice``.
+
+    Events are yielded by :meth:`async_read_loop` with their original spacing
+    divided by ``speed``; a ``speed`` of 0 replays as fast as possible,
+    yielding to the loop after every report so subscribers keep up.
+    """
+
+    name = "Input replay"
+
+    def __init__(self, source: str | Path | Iterable[InputEvent], speed: float = 1.0) -> None:
+        if isinstance(source, (str, Path)):
+            self.path = str(source)
+            self.events = list(read_log(source))
+        else:
+            self.path = "<replay>"
+            self.events = list(source)
+
+        self.speed = speed
+        self.info = None
+
+    def capabilities(self, absinfo: bool = True) -> dict:
+        # the starting state is part of the log
+        return {}
+
+    async def async_read_loop(self):
+        start = None
+
+        for event in self.events:
+            if self.speed:
+                stamp = event.sec + event.usec / 1e6
+                if start is None:
+                    start = (stamp, time.monotonic())
+
+                delay = (stamp - start[0]) / self.speed - (time.monotonic() - start[1])
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            yield event
+
+            if not self.speed and event.type == ecodes.EV_SYN:
+                await asyncio.sleep(0)
+
+    def close(self): ...
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import math
+
+
+class Filter:
+    """Base class for the per-axis setpoint filters used by :class:`~robot.motion.Motion`.
+
+    A filter follows a target that changes in steps (whenever a mode calls
+    ``move``) and produces a smooth setpoint every time :meth:`update` is called
+    by the motion loop.
+    """
+
+    # how close to the target, in axis units, counts as having arrived
+    EPSILON = 0.5
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self, value: float = 0.0):
+        self.value = float(value)
+        self.velocity = 0.0
+        self.target = float(value)
+
+    def settled(self) -> bool:
+        return abs(self.target - self.value) < self.EPSILON and abs(self.velocity) < self.EPSILON
+
+    def update(self, target: float, dt: float) -> float: ...
+
+
+class LinearRamp(Filter):
+    """Moves towards the target at no more than ``rate`` units per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        super().__init__()
+
+    def update(self, target: float, dt: float) -> float:
+        self.target = target
+        step = self.rate * dt
+        error = target - self.value
+
+        if abs(error) <= step:
+            self.value = float(target)
+        else:
+            self.value += math.copysign(step, error)
+
+        return self.value
+
+
+class CriticallyDamped(Filter):
+    """Second order response with no overshoot.
+
+    ``omega`` is the natural frequency in rad/s; the setpoint covers about 95%
+    of a step in ``4.7 / omega`` seconds. The closed form solution is used, so
+    the filter is stable at any ``dt``.
+    """
+
+    def __init__(self, omega: float) -> None:
+        self.omega = omega
+        super().__init__()
+
+    def update(self, target: float, dt: float) -> float:
+        self.target = target
+        omega = self.omega
+        error = self.value - target
+        decay = math.exp(-omega * dt)
+        drift = (self.velocity + omega * error) * dt
+
+        self.value = target + (error + drift) * decay
+        self.velocity = (self.velocity - omega * drift) * decay
+
+        return self.value
+
+
+class JerkLimited(Filter):
+    """Moves towards the target with bounded velocity, acceleration and jerk.
+
+    Velocity is planned so the axis can still brake to a stop at the target,
+    including the time it takes to ramp the acceleration up and down at
+    ``max_jerk``. This gives an S-shaped profile without overshoot.
+    """
+
+    def __init__(self, max_velocity: float, max_acceleration: float, max_jerk: float) -> None:
+        self.max_velocity = max_velocity
+        self.max_acceleration = max_acceleration
+        self.max_jerk = max_jerk
+        super().__init__()
+
+    def reset(self, value: float = 0.0):
+        super().reset(value)
+        self.acceleration = 0.0
+
+    def update(self, target: float, dt: float) -> float:
+        self.target = target
+        if dt <= 0:
+            return self.value
+
+        amax = self.max_acceleration
+        jmax = self.max_jerk
+
+        # where we end up once the current acceleration has been ramped out
+        ramp = abs(self.acceleration) / jmax
+        velocity = self.velocity + self.acceleration * ramp / 2
+        error = target - self.value - (self.velocity * ramp + self.acceleration * ramp * ramp / 3)
+
+        # fastest speed that can still brake to a stop within the remaining error
+        lag = amax * amax / jmax
+        braking = (math.sqrt(lag * lag + 8.0 * amax * abs(error)) - lag) / 2
+        desired_velocity = math.copysign(min(self.max_velocity, braking), error)
+
+        desired_acceleration = max(-amax, min(amax, (desired_velocity - velocity) / dt))
+
+        jerk_step = jmax * dt
+        previous_acceleration = self.acceleration
+        self.acceleration += max(-jerk_step, min(jerk_step, desired_acceleration - self.acceleration))
+
+        self.velocity = max(-self.max_velocity, min(self.max_velocity, self.velocity + self.acceleration * dt))
+        self.value += self.velocity * dt
+
+        if (abs(target - self.value) < self.EPSILON and abs(self.velocity) < amax * dt
+                and abs(previous_acceleration) <= jerk_step):
+            self.value = float(target)
+            self.velocity = 0.0
+            self.acceleration = 0.0
+
+        return self.value
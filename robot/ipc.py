@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import time
+import struct
+import multiprocessing
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Sequence
+
+
+def _shares_tracker(pid: int | None) -> bool:
+    """Whether this process shares process ``pid``'s resource tracker, by being it or its multiprocessing child."""
+    parent = multiprocessing.parent_process()
+    return pid == os.getpid() or (parent is not None and parent.pid == pid)
+
+
+class SeqlockSlot:
+    """One fixed-size record in shared memory, written by one process and read by others without locks.
+
+    The record is preceded by a sequence number that the writer makes odd
+    before changing the record and even again after. A reader that sees an
+    odd number, or a different number after reading than before, caught a
+    write in progress and reads again. Neither side ever waits on the other.
+    """
+
+    SEQ = struct.Struct("<Q")
+
+    def __init__(self, buffer: memoryview, offset: int, record: struct.Struct) -> None:
+        self.buffer = buffer
+        self.offset = offset
+        self.record = record
+
+    @classmethod
+    def size_of(cls, record: struct.Struct) -> int:
+        return cls.SEQ.size + record.size
+
+    def write(self, *values):
+        seq = self.SEQ.unpack_from(self.buffer, self.offset)[0]
+        self.SEQ.pack_into(self.buffer, self.offset, seq + 1)
+        self.record.pack_into(self.buffer, self.offset + self.SEQ.size, *values)
+        self.SEQ.pack_into(self.buffer, self.offset, seq + 2)
+
+    def read(self, retries: int = 1000) -> tuple | None:
+        """The record, None if it was never written (or kept changing for ``retries`` attempts)."""
+        for _ in range(retries):
+            before = self.SEQ.unpack_from(self.buffer, self.offset)[0]
+            if before & 1:
+                continue
+
+            values = self.record.unpack_from(self.buffer, self.offset + self.SEQ.size)
+            if self.SEQ.unpack_from(self.buffer, self.offset)[0] == before:
+                return values if before else None
+
+        return None
+
+
+class CommandChannel:
+    """Latest move command and heartbeat of a mode running in a child process.
+
+    The parent creates the channel and passes its :attr:`name` to the
+    child, which attaches to it, :meth:`send` s move commands and
+    :meth:`beat` s while it is alive. Only the newest command is kept: a
+    reader that falls behind skips straight to it, as with the controller.
+    Timestamps are ``time.monotonic()``, which is the same clock in every
+    process on Linux.
+    """
+
+    # command number, timestamp, the 14 Sparky.move values
+    COMMAND = struct.Struct("<Qd14h")
+    # beats, timestamp
+    HEARTBEAT = struct.Struct("<Qd")
+
+    def __init__(self, name: str = None, owner_pid: int = None) -> None:
+        """Create a channel, or attach to the one called ``name`` that process ``owner_pid`` created."""
+        size = SeqlockSlot.size_of(self.COMMAND) + SeqlockSlot.size_of(self.HEARTBEAT)
+
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+            self.owner_pid = os.getpid()
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+            self.owner_pid = owner_pid
+
+            # only the creator should unlink it. A process with a resource tracker of its own would unlink it on
+            # exit, so it's taken off there; the owner's tracker keeps it until close(), in case the owner crashes
+            if not _shares_tracker(owner_pid):
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.command = SeqlockSlot(self.shm.buf, 0, self.COMMAND)
+        self.heartbeat = SeqlockSlot(self.shm.buf, SeqlockSlot.size_of(self.COMMAND), self.HEARTBEAT)
+
+        self.sent = 0
+        self.beats = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def send(self, values: Sequence[int]):
+        self.sent += 1
+        self.command.write(self.sent, time.monotonic(), *values)
+
+    def receive(self) -> tuple[int, float, tuple] | None:
+        """``(number, timestamp, values)`` of the newest command, None before the first."""
+        record = self.command.read()
+        if record is None:
+            return None
+
+        return record[0], record[1], record[2:]
+
+    def beat(self):
+        self.beats += 1
+        self.heartbeat.write(self.beats, time.monotonic())
+
+    def last_beat(self) -> float | None:
+        """When the child last beat, None if it hasn't yet."""
+        record = self.heartbeat.read()
+        return record[1] if record else None
+
+    def close(self):
+        self.command = self.heartbeat = None
+        self.shm.close()
+
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -35,7 +35,11 @@ class LiDAR:
         self.angle_offset_deg = float(angle_offset_deg)
         self.invert_rotation = bool(invert_rotation)
 
-    def find_serial_dev(self):
+    def find_serial_dev(self, devices=None):
+        """Look the LiDAR up in a shared DeviceRegistry, or scan the ports if none is given."""
+        if devices is not None:
+            return devices.require(devices.LIDAR, name="LiDAR")
+
         for port in list_ports.comports():
             if port.manufacturer == 'Silicon Labs':
                 return port.device
@@ -46,7 +50,8 @@ class LiDAR:
         """Initialize LiDAR and prepare for scanning"""
         try:
             print("Connecting to LiDAR...")
-            self.lidar = RPLidar(None, self.port, timeout=3)
+            # opening the port blocks, keep it off the loop
+            self.lidar = await asyncio.to_thread(RPLidar, None, self.port, timeout=3)
         except Exception as e:
             raise RuntimeError(f"Failed to initialize LiDAR: {e}")
 
@@ -11,8 +11,7 @@ from PyQt6.QtWidgets import QWidget
 class LiDARRadarWidget(QWidget):
     def __init__(self, lidar=None, parent=None):
         super().__init__(parent)
-        self.lidar = lidar
-        self.max_distance = getattr(lidar, "max_distance", 2000)
+        self.attach(lidar)
         self.heat = {}  # (ix, iy) -> intensity
         self.grid_size = 120
         self.decay = 0.92
@@ -27,6 +26,11 @@ class LiDARRadarWidget(QWidget):
         self.timer.timeout.connect(self._poll_lidar)
         self.timer.start(33)  # ~30 FPS
 
+    def attach(self, lidar):
+        """Show ``lidar``, which may only become available after the window is up."""
+        self.lidar = lidar
+        self.max_distance = getattr(lidar, "max_distance", 2000)
+
     def _poll_lidar(self):
         # Decay old heat
         for cell in list(self.heat.keys()):
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import math
+
+from array import array
+from bisect import bisect_left
+
+
+class Histogram:
+    """Fixed-size histogram with logarithmically spaced buckets.
+
+    Memory and recording cost stay constant however many samples are
+    recorded; percentiles are resolved to the upper edge of their bucket,
+    which with the default 8 buckets per decade is within ~33% of the real
+    value.
+    """
+
+    def __init__(self, low: float = 1e-4, high: float = 10.0, per_decade: int = 8) -> None:
+        decades = math.log10(high / low)
+        count = int(math.ceil(decades * per_decade))
+        self.bounds = [low * 10 ** (i / per_decade) for i in range(count + 1)]
+        # one extra bucket for values above the last bound
+        self.counts = array("L", [0] * (len(self.bounds) + 1))
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the ``p``th percentile (0-100), or 0 with no samples."""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bounds[i] if i < len(self.bounds) else self.max, self.max)
+
+        return self.max
+
+    def __str__(self):
+        if not self.count:
+            return "no samples"
+
+        return (f"n: {self.count}, mean: {self.mean * 1e3:.2f} ms, p50: {self.percentile(50) * 1e3:.2f} ms, "
+                f"p99: {self.percentile(99) * 1e3:.2f} ms, max: {self.max * 1e3:.2f} ms")
+
+
+class RateMeter:
+    """Exponentially weighted events-per-second estimate over roughly ``tau`` seconds."""
+
+    def __init__(self, tau: float = 1.0) -> None:
+        self.tau = tau
+        self.total = 0
+        self._rate = 0.0
+        self._last = None
+
+    def add(self, amount: float, now: float):
+        self.total += amount
+        if self._last is not None:
+            self._rate *= math.exp(-(now - self._last) / self.tau)
+        self._rate += amount / self.tau
+        self._last = now
+
+    def rate(self, now: float) -> float:
+        if self._last is None:
+            return 0.0
+
+        return self._rate * math.exp(-(now - self._last) / self.tau)
@@ -1,19 +1,57 @@
 from __future__ import annotations
 
+import time
 import asyncio
+import pkgutil
+import importlib
+import multiprocessing
 
+from pathlib import Path
+from traceback import print_exc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
+from .face import Face
+from .ipc import CommandChannel
+
 if TYPE_CHECKING:
     from .sparky import Sparky
 
 class Mode:
+    """A behaviour of the robot, run as a task on the robot's main loop while it is enabled.
+
+    Subclasses put their control loop in :meth:`start`. :meth:`launch` starts
+    it and :meth:`shutdown` cancels it and waits at most ``STOP_TIMEOUT``
+    seconds for it to wind down, so commands are issued on the same loop and
+    thread as motion, with nothing to synchronise. Blocking work (camera
+    frames, inference) goes through :meth:`offload`, on a worker thread of
+    the mode's own, or a worker process when asked for.
+    """
+
     MODE_ID = -1
-    loop: asyncio.AbstractEventLoop
+    RATE_HZ = 10
+
+    # face expression and AudioManager mode sound played when the mode is enabled
+    FACE = Face.OVAL
+    SOUND = 0
+
+    # how long stopping waits for the mode to wind down, seconds
+    STOP_TIMEOUT = 1.0
 
     def __init__(self, robot: Sparky) -> None:
         self.robot = robot
         self.motion = robot.motion
+        self.rate = robot.scheduler.rate(self.__class__.__name__, self.RATE_HZ)
+
+        self.task = None
+
+        # created on first use, one worker each so offloaded calls run one at a time and in order
+        self._thread = None
+        self._process = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
 
     async def start(self): ...
 
@@ -24,17 +62,202 @@ class Mode:
         except asyncio.CancelledError:
             print(f"{self.__class__.__name__} cancelled")
 
-    def run(self):
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-
-        self.loop.create_task(self.start())
+        except Exception:
+            # the robot sees the task end and disables itself
+            print_exc()
 
-        self.loop.run_forever()
+    async def launch(self) -> asyncio.Task:
+        """Start the mode on the running loop, returning once it has taken its first step."""
+        # a fresh deadline, not the one left over from the last time the mode ran
+        self.rate.reset()
+        self.task = asyncio.get_running_loop().create_task(self._run(), name=self.__class__.__name__)
+        await asyncio.sleep(0)
+        return self.task
 
     def stop(self):
-        for task in asyncio.all_tasks(self.loop):
-            print(f"Cancelling Task: {task.get_coro()}")
-            task.cancel()
+        """Ask the mode to stop, without waiting for it."""
+        if self.task is not None:
+            self.task.cancel()
+
+    async def shutdown(self, timeout: float = None) -> bool:
+        """Stop the mode and wait for it to wind down, False if it didn't within ``timeout``."""
+        self.stop()
+        if self.task is None:
+            return True
+
+        timeout = self.STOP_TIMEOUT if timeout is None else timeout
+        done, _ = await asyncio.wait({self.task}, timeout=timeout)
+        if not done:
+            print(f"{self.__class__.__name__} did not stop within {timeout:g} s")
+            return False
+
+        return True
+
+    async def offload(self, func, *args, process: bool = False):
+        """Run blocking ``func(*args)`` off the loop and await its result.
+
+        With ``process`` it runs in a worker process, which needs ``func`` and
+        its arguments to be picklable. A call the mode was cancelled out of
+        still finishes on the worker and later calls queue behind it, so e.g.
+        releasing a camera never overlaps a frame still being read.
+        """
+        if process:
+            if self._process is None:
+                self._process = ProcessPoolExecutor(max_workers=1)
+            executor = self._process
+        else:
+            if self._thread is None:
+                self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+            executor = self._thread
+
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    def close(self):
+        """Release the offload workers, once the mode won't be started again."""
+        for executor in (self._thread, self._process):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        self._thread = self._process = None
+
+
+def _worker_main(worker, channel_name: str, owner_pid: int, stop, args: tuple):
+    channel = CommandChannel(channel_name, owner_pid)
+    try:
+        worker(channel, stop, *args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        channel.close()
+
+
+class ProcessMode(Mode):
+    """A mode whose work runs in a child process of its own, for CPU-heavy modes.
+
+    The child runs :meth:`worker`, which sends move commands and beats its
+    heart through a :class:`robot.ipc.CommandChannel` in shared memory. The
+    mode polls the channel at ``RATE_HZ`` and forwards every new command to
+    the robot, so inference load in the child never holds the GIL the UI
+    and motion loop need. If the child stops beating for
+    ``HEARTBEAT_TIMEOUT`` seconds (``STARTUP_TIMEOUT`` before its first
+    beat) or exits, the mode ends and the robot disables itself.
+    """
+
+    RATE_HZ = 50
+
+    HEARTBEAT_TIMEOUT = 0.5
+    STARTUP_TIMEOUT = 10.0
+
+    # how long the child gets to exit after being asked to, before it's killed, seconds
+    JOIN_TIMEOUT = 1.0
+    STOP_TIMEOUT = JOIN_TIMEOUT + 1.0
+
+    # a fresh interpreter rather than a fork of the process running Qt
+    CONTEXT = multiprocessing.get_context("spawn")
+
+    @staticmethod
+    def worker(channel: CommandChannel, stop, *args):
+        """Runs in the child until ``stop`` (a multiprocessing Event) is set. Must be a module-level function."""
+        ...
+
+    def worker_args(self) -> tuple:
+        """Picklable arguments passed on to :meth:`worker`."""
+        return ()
+
+    async def start(self):
+        channel = CommandChannel()
+        stop = self.CONTEXT.Event()
+        process = self.CONTEXT.Process(target=_worker_main,
+                                       args=(self.worker, channel.name, channel.owner_pid, stop, self.worker_args()),
+                                       name=self.__class__.__name__, daemon=True)
+
+        try:
+            process.start()
+            started = time.monotonic()
+            last = 0
+
+            while True:
+                await self.rate.sleep()
+
+                now = time.monotonic()
+                beat = channel.last_beat()
+                if beat is None and now - started > self.STARTUP_TIMEOUT:
+                    print(f"{self.__class__.__name__} worker did not start within {self.STARTUP_TIMEOUT:g} s")
+                    return
+
+                if beat is not None and now - beat > self.HEARTBEAT_TIMEOUT:
+                    print(f"{self.__class__.__name__} worker stalled, no heartbeat for {(now - beat) * 1e3:.0f} ms")
+                    return
+
+                if not process.is_alive():
+                    print(f"{self.__class__.__name__} worker exited with {process.exitcode}")
+                    return
+
+                command = channel.receive()
+                if command is not None and command[0] != last:
+                    last = command[0]
+                    await self.robot.move(*command[2])
+
+        finally:
+            stop.set()
+            if process.pid is not None:
+                await self.offload(process.join, self.JOIN_TIMEOUT)
+                if process.is_alive():
+                    process.kill()
+                    await self.offload(process.join)
+
+            channel.close()
+
+
+class ModeRegistry:
+    """Every mode in ``robot/modes``, imported and set up once, ready to be started.
+
+    :meth:`load` imports each mode module and keeps the instance its
+    ``setup()`` returns, so enabling a mode only has to start it. A mode
+    whose setup failed (e.g. its camera wasn't plugged in) is set up again
+    the next time it's asked for.
+    """
+
+    PACKAGE = "robot.modes"
+    PATH = Path(__file__).parent / "modes"
+
+    def __init__(self, robot: Sparky) -> None:
+        self.robot = robot
+        self.modes: dict[str, Mode] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.modes
+
+    @classmethod
+    def discover(cls) -> list[str]:
+        return sorted(module.name for module in pkgutil.iter_modules([str(cls.PATH)]))
+
+    async def load(self):
+        for name in self.discover():
+            await self.create(name)
+
+        print(f"Modes ready: {', '.join(self.modes)}")
+
+    async def create(self, name: str) -> Mode | None:
+        try:
+            module = importlib.import_module(f"{self.PACKAGE}.{name}")
+            setup = getattr(module, "setup", None)
+            if setup is None:
+                return None
+
+            self.modes[name] = await setup(self.robot)
+
+        except Exception as e:
+            print(f"Mode '{name}' could not be set up: {e}")
+            return None
+
+        return self.modes[name]
+
+    def close(self):
+        for mode in self.modes.values():
+            mode.stop()
+            mode.close()
 
-        self.loop.stop()
+    async def get(self, name: str) -> Mode | None:
+        """The warm instance of ``name``, set up now if that failed before."""
+        return self.modes.get(name) or await self.create(name)
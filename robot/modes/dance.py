@@ -4,11 +4,11 @@ from .manual import ManualMode
 
 from robot.face import Face
 
-face = Face()
-
 # filler since I implemented all buttons in ManualMode
-class DanceMode(ManualMode, Face):
+class DanceMode(ManualMode):
     MODE_ID = 5
+    FACE = Face.HAPPY
+    SOUND = 5  # danceMode
 
 async def setup(robot: Sparky):
     return DanceMode(robot)
\ No newline at end of file
@@ -3,8 +3,13 @@
 import asyncio
 
 from robot.sparky import Sparky
-from ..mode import Mode
-from robot.gesture_engine import GestureEngine, Gesture
+from ..mode import Mode, ProcessMode
+from robot.gesture_engine import GestureEngine, gesture_command, gesture_worker
+
+
+MODEL_PATH = "./ML/edgetpu_mobilenet_4.tflite"
+LABELS_PATH = "./ML/labels.txt"
+CAMERA_INDEX = 0
 
 
 class GestureMode(Mode):
@@ -21,97 +26,86 @@ class GestureMode(Mode):
     """
 
     MODE_ID = 7
+    SOUND = 4  # machineLearningMode
 
     def __init__(self, robot: Sparky) -> None:
         super().__init__(robot)
 
-        self.engine = GestureEngine(
-            model_path="./ML/edgetpu_mobilenet_4.tflite",
-            labels_path="./ML/labels.txt",
-            camera_index=0,
-        )
+        # built on the first run, on the offload worker: loading the model and
+        # opening the camera block, and import OpenCV and pycoral
+        self.engine = None
 
         # Last sent command
         self._last_cmd = None
 
+    def _open_engine(self):
+        if self.engine is None:
+            self.engine = GestureEngine(
+                model_path=MODEL_PATH,
+                labels_path=LABELS_PATH,
+                camera_index=CAMERA_INDEX,
+            )
+        else:
+            self.engine.open()
+
+    def _close_engine(self):
+        if self.engine is not None:
+            self.engine.close()
+
     async def start(self):
         """
-        Main loop for GestureMode. This is called by Mode.run()
-        and runs until stop() is called.
+        Main loop for GestureMode. This is run as a task by Mode.launch()
+        and runs until the mode is stopped.
         """
         try:
-            while True:
-                gesture = self.engine.get_gesture()
-
-                # Default: no movement if no new gesture
-                rfb = rlr = lfb = llr = 0
-                rt = lt = 0
-                dpad_u = dpad_d = dpad_l = dpad_r = 0
-                triangle = cross = square = circle = 0
+            # the engine is kept between runs, and the camera was released when it last stopped
+            await self.offload(self._open_engine)
 
-                if gesture is not None:
-                    # Map gesture -> "virtual controller" values
-                    if gesture == Gesture.STOP:
-                        # Stand still
-                        pass  # everything already zero
-
-                    elif gesture == Gesture.WALK_FORWARD:
-                        # Right stick up: forward
-                        rfb = 128  # same scale as manual: -128..127
-
-                    elif gesture == Gesture.WALK_BACKWARD:
-                        # Right stick down: backward
-                        rfb = -128
-
-                    elif gesture == Gesture.SIT:
-                        # Triangle press
-                        triangle = 1
-
-                    elif gesture == Gesture.PUSH_DOWN:
-                        # Cross press
-                        cross = 1
+            while True:
+                # capture and inference block, keep them off the loop motion runs on
+                gesture = await self.offload(self.engine.get_gesture)
 
                 # Send command to motion system
-                await self.robot.move(
-                    rfb,
-                    rlr,
-                    lfb,
-                    llr,
-                    rt,
-                    lt,
-                    dpad_u,
-                    dpad_d,
-                    dpad_l,
-                    dpad_r,
-                    triangle,
-                    cross,
-                    square,
-                    circle,
-                )
-
-                # This sleep controls how often we push commands to the Teensy.
-                # ManualMode uses 0.1s; we mirror that for now.
-                await asyncio.sleep(0.1)
+                await self.robot.move(*gesture_command(gesture))
+
+                # The mode rate controls how often we push commands to the Teensy.
+                # ManualMode uses 10 Hz; we mirror that for now.
+                await self.rate.sleep()
 
         except asyncio.CancelledError:
             # Normal shutdown path when mode is stopped
             pass
         except Exception as e:
             print(f"GestureMode error: {e}")
+        finally:
+            # on the same worker as get_gesture(), so the camera is only released once a frame in flight is done
+            try:
+                await self.offload(self._close_engine)
+            except Exception:
+                pass
 
-    def stop(self):
-        """
-        Called by Sparky.set_enabled(False) and Sparky.stop().
-        We ensure the camera is released.
-        """
-        try:
-            self.engine.close()
-        except Exception:
-            pass
 
-        # Let the base class handle cancelling the task etc.
-        super().stop()
+class IsolatedGestureMode(ProcessMode):
+    """
+    GestureMode with capture and inference in a child process, so they
+    don't compete with the UI and motion loop for the GIL. The child owns
+    the camera and the TPU; commands come back through shared memory.
+    """
+
+    MODE_ID = GestureMode.MODE_ID
+    SOUND = GestureMode.SOUND
+
+    # the child's recognition rate, the mode itself polls for commands at ProcessMode.RATE_HZ
+    GESTURE_HZ = GestureMode.RATE_HZ
+
+    worker = staticmethod(gesture_worker)
+
+    def worker_args(self) -> tuple:
+        return (MODEL_PATH, LABELS_PATH, CAMERA_INDEX, self.GESTURE_HZ)
 
 
 async def setup(robot: Sparky):
+    if "gesture" in robot.isolated_modes:
+        return IsolatedGestureMode(robot)
+
     return GestureMode(robot)
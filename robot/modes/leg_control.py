@@ -5,6 +5,7 @@ from .manual import ManualMode
 # filler since I implemented all buttons in ManualMode
 class LEGCONTROL(ManualMode):
     MODE_ID = 2
+    SOUND = 2  # legControlMode
 
 
 async def setup(robot: Sparky):
@@ -3,7 +3,8 @@ from robot.sparky import Sparky
 from .manual import ManualMode
 # filler since I implemented all buttons in ManualMode
 class LegTestingMode(ManualMode):
-    MODE_ID = 3 
+    MODE_ID = 3
+    SOUND = 3  # gyroMode (closest match)
 
 async def setup(robot: Sparky):
     return LegTestingMode(robot)
\ No newline at end of file
@@ -1,6 +1,5 @@
-import asyncio
-
 from robot.sparky import Sparky
+from robot.face import Face
 
 from ..mode import Mode
 
@@ -8,37 +7,42 @@ from ..mode import Mode
 # effectively just walk mode
 class ManualMode(Mode):
     MODE_ID = 6
+    FACE = Face.OVAL
+    SOUND = 0  # walkMode
 
     def __init__(self, robot: Sparky) -> None:
         super().__init__(robot)
 
 
     async def start(self):
-        while True:
-            print(self.robot.controller)
+        # every controller report is forwarded as soon as it arrives, instead of sampling at the mode rate
+        updates = self.robot.controller.subscribe()
 
-            rfb = self.robot.controller.right_stick_y - 128
-            rlr = self.robot.controller.right_stick_x - 128
+        try:
+            async for controller in updates:
+                rfb = controller.right_stick_y - 128
+                rlr = controller.right_stick_x - 128
 
-            lfb = self.robot.controller.left_stick_y - 128
-            llr = self.robot.controller.left_stick_x - 128
+                lfb = controller.left_stick_y - 128
+                llr = controller.left_stick_x - 128
 
-            lt = self.robot.controller.l2_analog
-            rt = self.robot.controller.r2_analog
+                lt = controller.l2_analog
+                rt = controller.r2_analog
 
-            dpad_u = self.robot.controller.dpad_up
-            dpad_d = self.robot.controller.dpad_down
-            dpad_l = self.robot.controller.dpad_left
-            dpad_r = self.robot.controller.dpad_right
+                dpad_u = controller.dpad_up
+                dpad_d = controller.dpad_down
+                dpad_l = controller.dpad_left
+                dpad_r = controller.dpad_right
 
-            triangle = self.robot.controller.triangle
-            cross = self.robot.controller.cross
-            square = self.robot.controller.square
-            circle = self.robot.controller.circle
+                triangle = controller.triangle
+                cross = controller.cross
+                square = controller.square
+                circle = controller.circle
 
-            await self.robot.move(rfb, rlr, lfb, llr, rt, lt, dpad_u, dpad_d, dpad_l, dpad_r, triangle, cross, square, circle)
+                await self.robot.move(rfb, rlr, lfb, llr, rt, lt, dpad_u, dpad_d, dpad_l, dpad_r, triangle, cross, square, circle)
 
-            await asyncio.sleep(0.1)
+        finally:
+            updates.close()
 
 
 async def setup(robot: Sparky):
@@ -1,10 +1,13 @@
 from robot.sparky import Sparky
+from robot.face import Face
 
 from .manual import ManualMode
 
 # filler since I implemented all buttons in ManualMode
 class PushUpMode(ManualMode):
     MODE_ID = 4
+    FACE = Face.RAGE
+    SOUND = 1  # pushUpsMode
 #waff
 
 async def setup(robot: Sparky):
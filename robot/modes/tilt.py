@@ -0,0 +1,91 @@
+import math
+import asyncio
+
+from evdev import InputDevice
+
+from robot.sparky import Sparky
+
+from ..mode import Mode
+from ..controller import Controller
+from ..imu import MotionSensors, find_motion_sensors
+
+
+# walk mode, steered by tilting the controller instead of with the right stick
+class TiltMode(Mode):
+    MODE_ID = 6
+    SOUND = 0  # walkMode, steered by tilting the controller
+
+    # the 250 Hz sensor stream is drained in batches by a reader on the loop;
+    # the mode only samples the latest orientation, well above the motion rate
+    RATE_HZ = 50
+
+    # degrees of tilt ignored around level, and the tilt that gives full speed
+    DEADZONE = 4
+    MAX_TILT = 30
+
+    # how long to wait before looking for the motion sensors again, in seconds
+    RETRY_INTERVAL = 1.0
+
+    def __init__(self, robot: Sparky) -> None:
+        super().__init__(robot)
+        self.imu = None
+
+    @classmethod
+    def axis(cls, angle: float) -> int:
+        """Stick value (-127..127) for a tilt of ``angle`` degrees."""
+        magnitude = abs(angle) - cls.DEADZONE
+        if magnitude <= 0:
+            return 0
+
+        value = round(127 * min(1.0, magnitude / (cls.MAX_TILT - cls.DEADZONE)))
+        return int(math.copysign(value, angle))
+
+    def _open_imu(self) -> bool:
+        node = find_motion_sensors(Controller.SYSFS_INPUT, getattr(self.robot.controller, "node", None))
+        if node is None:
+            print("Controller motion sensors not found")
+            return False
+
+        try:
+            dev = InputDevice(f"/dev/input/{node.name}")
+        except OSError as e:
+            print(f"Could not open controller motion sensors: {e}")
+            return False
+
+        self.imu = MotionSensors(dev)
+        self.imu.start(asyncio.get_running_loop())
+        print(f"Motion sensors found: {dev.name} at {dev.path}")
+        return True
+
+    async def start(self):
+        try:
+            while True:
+                if (self.imu is None or not self.imu.running) and not self._open_imu():
+                    await self.robot.move(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+                    await asyncio.sleep(self.RETRY_INTERVAL)
+                    continue
+
+                pitch, roll = self.imu.orientation
+                controller = self.robot.controller
+
+                # tilting forward walks forward, like pushing the right stick up
+                rfb = -self.axis(pitch)
+                rlr = self.axis(roll)
+
+                await self.robot.move(
+                    rfb, rlr,
+                    controller.left_stick_y - 128, controller.left_stick_x - 128,
+                    controller.r2_analog, controller.l2_analog,
+                    controller.dpad_up, controller.dpad_down, controller.dpad_left, controller.dpad_right,
+                    controller.triangle, controller.cross, controller.square, controller.circle,
+                )
+
+                await self.rate.sleep()
+
+        finally:
+            if self.imu:
+                self.imu.close()
+
+
+async def setup(robot: Sparky):
+    return TiltMode(robot)
@@ -1,187 +1,343 @@
 from __future__ import annotations
 
+import time
 import asyncio
 
-from typing import TYPE_CHECKING, Self, Coroutine
+from typing import TYPE_CHECKING, NamedTuple, Self, Coroutine
+from itertools import count
 
 import aioserial
 
-import struct
+from .protocol import RemoteFrame, StatusDecoder
+from .transport import LinkStats, MotionTransport
+from .interpolation import CriticallyDamped, Filter
+from .devices import DeviceRegistry
+from .metrics import Histogram
 
-from serial.tools import list_ports
+if TYPE_CHECKING:
+    from .sparky import Sparky
 
-from odrive.enums import AxisError
+class Command(NamedTuple):
+    """One complete command from a mode, published to Motion as a single object.
 
-import flatbuffers
+    ``seq`` increases with every command and ``stamp`` is the
+    ``time.monotonic()`` it was issued at.
+    """
 
-from MotionProtocol import Message, MessageType, Remote, ODriveStatus
+    rfb: int = 0 # Right Forward-Backward
+    rlr: int = 0 # Right Left-Right
+    lfb: int = 0 # Left Forward-Backward
+    llr: int = 0 # Left Left-Right
 
-if TYPE_CHECKING:
-    from .sparky import Sparky
+    rt: int = 0 # Right Trigger
+    lt: int = 0 # Left Trigger
 
-class Motion:
-    rfb = 0 # Right Forward-Backward
-    rlr = 0 # Right Left-Right
-    lfb = 0 # Left Forward-Backward
-    llr = 0 # Left Left-Right
+    dpad_u: bool = False
+    dpad_d: bool = False
+    dpad_l: bool = False
+    dpad_r: bool = False
 
-    rt = 0 # Right Trigger
-    lt = 0 # Left Trigger
+    triangle: bool = False
+    cross: bool = False
+    square: bool = False
+    circle: bool = False
 
-    dpad_u = False
-    dpad_d = False
-    dpad_l = False
-    dpad_r = False
+    seq: int = 0
+    stamp: float = 0.0
 
-    triangle = False
-    cross = False
-    square = False
-    circle = False
+
+def _command_field(name: str) -> property:
+    index = Command._fields.index(name)
+    return property(lambda self: self.command[index], doc=f"``{name}`` of the current command")
+
+
+class Motion:
+    rfb = _command_field("rfb")
+    rlr = _command_field("rlr")
+    lfb = _command_field("lfb")
+    llr = _command_field("llr")
+
+    rt = _command_field("rt")
+    lt = _command_field("lt")
+
+    dpad_u = _command_field("dpad_u")
+    dpad_d = _command_field("dpad_d")
+    dpad_l = _command_field("dpad_l")
+    dpad_r = _command_field("dpad_r")
+
+    triangle = _command_field("triangle")
+    cross = _command_field("cross")
+    square = _command_field("square")
+    circle = _command_field("circle")
+
+    # a few ticks per mode update (modes run at 10 Hz), for the filters to interpolate over
+    RATE_HZ = 50
+
+    # natural frequency of the CriticallyDamped filter put on every analog axis, rad/s,
+    # so a step from a mode is covered in about 0.15 s; None sends the axes as they are
+    FILTER_OMEGA = 30.0
+
+    # reconnect backoff used when no hotplug event shows up, in seconds
+    RECONNECT_MIN = 0.05
+    RECONNECT_MAX = 10
+
+    # pin to one board when several Teensys are attached
+    SERIAL_NUMBER = None
+
+    # send frames as soon as the command changes instead of once per tick,
+    # refreshing an unchanged command every KEEPALIVE seconds
+    SEND_ON_CHANGE = False
+    KEEPALIVE = 0.1
+
+    # (min, max) of each analog axis in the Remote message
+    AXIS_LIMITS = {
+        "rfb": (-128, 127),
+        "rlr": (-128, 127),
+        "lfb": (-128, 127),
+        "llr": (-128, 127),
+        "rt": (0, 255),
+        "lt": (0, 255),
+    }
 
     def __init__(self, robot: Sparky) -> None:
         self.robot = robot
+        self.rate = robot.scheduler.rate("motion", self.RATE_HZ)
+
+        # replaced as a whole, never modified, so the motion loop always reads
+        # a consistent command whichever thread the mode runs on
+        self._seq = count(1)
+        self.command = Command(stamp=time.monotonic())
+        self.command_age = Histogram()  # age of the command in every frame sent
+        self.send_on_change = self.SEND_ON_CHANGE
+        self.keepalive = self.KEEPALIVE
+
+        # axis name -> robot.interpolation.Filter, unfiltered axes pass straight through
+        self.filters = {}
+        if self.FILTER_OMEGA:
+            for axis in self.AXIS_LIMITS:
+                self.set_filter(axis, CriticallyDamped(self.FILTER_OMEGA))
+
         self.status = None
+        self.status_time = None
+        self.reconnects = 0
+        self.reconnect_time = None  # seconds the last reconnect took
+        self.serial = None
+        self.serial_number = self.SERIAL_NUMBER
+        self.transport = None
+        self.link_stats = LinkStats()
         self.connected = False
+        self.frame = RemoteFrame()
+        self.decoder = StatusDecoder()
+
+        self._loop = None
+        self._changed = asyncio.Event()
 
         self._connect()
 
 
     def _connect(self):
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            except Exception:
+                pass
+
         self.serial = aioserial.AioSerial(port=self._find_serial_dev(), baudrate=115200, timeout=1)
 
     async def reconnect(self):
+        """Reconnect to the motion controller, retrying as soon as a serial device is plugged in.
+
+        The device registry reports the Teensy reappearing as soon as it is
+        plugged in; exponential backoff between RECONNECT_MIN and RECONNECT_MAX
+        covers missed events. Without hotplug events the registry is rescanned
+        before every retry.
+        """
+        started = time.monotonic()
+        delay = self.RECONNECT_MIN
+        devices = self.robot.devices
+        uevents = getattr(self.robot, "uevents", None)
+        hotplug = uevents is not None and uevents.running
+
         while True:
             try:
                 self._connect()
-                print("Connected.")
-                return
+                break
 
             except Exception as e:
                 print(e)
 
-            await asyncio.sleep(10)
+            if hotplug:
+                port = await devices.wait_for(DeviceRegistry.MOTION, delay, self.serial_number)
+            else:
+                port = None
+                await asyncio.sleep(delay)
+                devices.scan()
 
+            if port is None:
+                delay = min(delay * 2, self.RECONNECT_MAX)
 
-    def _find_serial_dev(self):
-        for port in list_ports.comports():
-            if port.manufacturer == 'Teensyduino':
-                return port.device
+        self.reconnects += 1
+        self.reconnect_time = time.monotonic() - started
+        print(f"Connected after {self.reconnect_time * 1000:.0f} ms")
 
-        raise Exception("Could not connect to motion controller")
+
+    def _find_serial_dev(self):
+        return self.robot.devices.require(DeviceRegistry.MOTION, self.serial_number, "motion controller")
 
     def move(self, rfb, rlr, lfb, llr, rt, lt, dpad_u, dpad_d, dpad_l, dpad_r, triangle, cross, square, circle):
         # TODO: implement some sort of timeout if this isnt called often enough
 
-        self.rfb = rfb
-        self.rlr = rlr
-        self.lfb = lfb
-        self.llr = llr
-        self.rt = rt
-        self.lt = lt
+        self.command = Command(
+            rfb, rlr, lfb, llr, rt, lt,
+            dpad_u, dpad_d, dpad_l, dpad_r,
+            triangle, cross, square, circle,
+            next(self._seq), time.monotonic(),
+        )
 
-        self.dpad_u = dpad_u
-        self.dpad_d = dpad_d
-        self.dpad_l = dpad_l
-        self.dpad_r = dpad_r
+        if self.send_on_change:
+            self.notify()
 
-        self.triangle = triangle
-        self.cross = cross
-        self.square = square
-        self.circle = circle
+    def set_filter(self, axis: str, filter: Filter | None):
+        """Smooth an analog axis with ``filter`` at the motion loop rate, or pass it through with ``None``."""
+        if axis not in self.AXIS_LIMITS:
+            raise ValueError(f"Unknown axis '{axis}'")
+
+        if filter is None:
+            self.filters.pop(axis, None)
+        else:
+            filter.reset(getattr(self, axis))
+            self.filters[axis] = filter
+
+    def filters_settled(self) -> bool:
+        return all(f.settled() for f in self.filters.values())
+
+    def notify(self):
+        """Wake the command loop so a new command goes out without waiting for the next tick.
+
+        Safe to call from any thread.
+        """
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._changed.set)
 
     def stop(self):
-        self.rfb = 0
-        self.rlr = 0
-        self.lfb = 0
-        self.llr = 0
-        self.rt = 0
-        self.lt = 0
-
-        self.dpad_u = False
-        self.dpad_d = False
-        self.dpad_l = False
-        self.dpad_r = False
-
-        self.triangle = False
-        self.cross = False
-        self.square = False
-        self.circle = False
+        self.command = Command(seq=next(self._seq), stamp=time.monotonic())
+
+        if self.send_on_change:
+            self.notify()
+
+    def _on_reply(self, seq, payload, rtt):
+        if not payload:
+            self.connected = False
+            print("Motion controller did not respond")
+            return
 
-    async def run(self):
         try:
-            while True:
-                builder = flatbuffers.Builder(1024)
+            status = self.decoder.decode(payload)
+            self.status = status
+            self.status_time = time.monotonic()
+            self.connected = status.any_connected()
+            print("Connected: " + ", ".join(f"{i + 1}: {c}" for i, c in enumerate(status.connected)))
+            print("Errors:\n" + "\n".join(
+                f"    {i}0: {status.errors[2 * i]}, {i}1: {status.errors[2 * i + 1]}" for i in range(6)
+            ))
+        except Exception as e:
+            self.link_stats.parse_failures += 1
+            print(f"ugh {e}", payload)
 
-                Remote.Start(builder)
+    def _on_timeout(self, seq):
+        self.connected = False
+        print(f"Motion controller did not respond to frame {seq}")
+
+    def _axis(self, command: Command, axis: str, dt: float):
+        value = getattr(command, axis)
+
+        filter = self.filters.get(axis)
+        if filter is None:
+            return value
+
+        low, high = self.AXIS_LIMITS[axis]
+        return min(high, max(low, round(filter.update(value, dt))))
+
+    def _frame_values(self, command: Command, dt: float) -> tuple:
+        axis = self._axis
+
+        return (
+            self.robot.enabled,
+            self.robot.mode.MODE_ID if self.robot.mode else 0,
+            axis(command, "rlr", dt),
+            axis(command, "rfb", dt),
+            axis(command, "rt", dt),
+            axis(command, "llr", dt),
+            axis(command, "lfb", dt),
+            axis(command, "lt", dt),
+            command.dpad_u,
+            command.dpad_d,
+            command.dpad_l,
+            command.dpad_r,
+            command.triangle,
+            command.cross,
+            command.square,
+            command.circle,
+        )
+
+    async def _command_loop(self):
+        self._loop = asyncio.get_running_loop()
+
+        # a fresh deadline, not the one left over from before a reconnect
+        self.rate.reset()
+
+        last_values = None
+        last_sent = 0.0
+        last_tick = time.monotonic() - self.rate.period
+        ticking = True
 
-                Remote.RemoteAddEnabled(builder, self.robot.enabled)
-                Remote.RemoteAddMode(builder, self.robot.mode.MODE_ID if self.robot.mode else 0)
+        while True:
+            # cleared before sampling so a change made while sending still wakes us
+            self._changed.clear()
 
-                Remote.RemoteAddRlr(builder, self.rlr)
-                Remote.RemoteAddRfb(builder, self.rfb)
-                Remote.RemoteAddRt(builder, self.rt)
-                Remote.RemoteAddLlr(builder, self.llr)
-                Remote.RemoteAddLfb(builder, self.lfb)
-                Remote.RemoteAddLt(builder, self.lt)
+            # one snapshot per frame, however often the mode publishes
+            command = self.command
 
-                Remote.RemoteAddDpadU(builder, self.dpad_u)
-                Remote.RemoteAddDpadD(builder, self.dpad_d)
-                Remote.RemoteAddDpadL(builder, self.dpad_l)
-                Remote.RemoteAddDpadR(builder, self.dpad_r)
+            now = time.monotonic()
+            # after idling on change notifications, filters resume from a single tick
+            values = self._frame_values(command, min(now - last_tick, 2 * self.rate.period))
+            last_tick = now
 
-                Remote.RemoteAddTriangle(builder, self.triangle)
-                Remote.RemoteAddCross(builder, self.cross)
-                Remote.RemoteAddSquare(builder, self.square)
-                Remote.RemoteAddCircle(builder, self.circle)
+            if not self.send_on_change or values != last_values or now - last_sent >= self.keepalive:
+                self.transport.send(self.frame.encode(*values))
+                self.command_age.record(now - command.stamp)
+                last_values = values
+                last_sent = now
 
-                remote = Remote.End(builder)
+            if not self.send_on_change or not self.filters_settled():
+                # filters need a steady tick to interpolate between mode updates
+                if not ticking:
+                    self.rate.reset()
+                    ticking = True
 
-                Message.Start(builder)
-                Message.AddType(builder, MessageType.MessageType.REMOTE)
-                Message.AddRemote(builder, remote)
-                msg = Message.End(builder)
+                await self.rate.sleep()
 
-                builder.Finish(msg)
+            else:
+                ticking = False
+                try:
+                    await asyncio.wait_for(self._changed.wait(), last_sent + self.keepalive - time.monotonic())
+                except asyncio.TimeoutError:
+                    pass
 
-                buf = builder.Output()
+    async def run(self):
+        try:
+            while True:
+                self.transport = MotionTransport(self.serial, self._on_reply, self._on_timeout, stats=self.link_stats)
 
                 try:
-                    await self.serial.write_async(buf)
-                    size_bytes = await self.serial.read_async(4)
-                    if len(size_bytes) == 4:
-                        (size,) = struct.unpack('<I', size_bytes)
-                        ret = await self.serial.read_async(size)
-                    else:
-                        ret = None
-                except aioserial.SerialException:
+                    async with asyncio.TaskGroup() as tg:
+                        tg.create_task(self.transport.run())
+                        tg.create_task(self._command_loop())
+
+                except* aioserial.SerialException:
                     print("Motion serial failure, trying again")
                     await self.reconnect()
-                    continue
-
-                if ret:
-                    try:
-                        status = ODriveStatus.ODriveStatus.GetRootAsODriveStatus(ret, 0)
-                        self.status = status
-                        self.connected = any(
-                            (
-                                status.Connected0(),
-                                status.Connected1(),
-                                status.Connected2(),
-                                status.Connected3(),
-                                status.Connected4(),
-                                status.Connected5(),
-                            )
-                        )
-                        print(f"Connected: 1: {status.Connected0()}, 2: {status.Connected1()}, 3: {status.Connected2()}, 4: {status.Connected3()}, 5: {status.Connected4()}, 6: {status.Connected5()}")
-                        print(f"Errors:\n    00: {status.Error00()}, 01: {status.Error01()}\n    10: {status.Error10()}, 11: {status.Error11()}\n    20: {status.Error20()}, 21: {status.Error21()}\n    30: {status.Error30()}, 31: {status.Error31()}\n    40: {status.Error40()}, 41: {status.Error41()}\n    50: {status.Error50()}, 51: {status.Error51()}")
-                    except Exception as e:
-                        print(f"ugh {e}", print(ret))
-                        pass
-                else:
-                    self.connected = False
-                    print("Motion controller did not respond")
-
-                await asyncio.sleep(0.1)
 
         except asyncio.CancelledError:
             print(f"{repr(self)} task cancelled")
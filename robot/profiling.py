@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sys
+import time
+import threading
+
+from importlib.abc import MetaPathFinder
+
+
+class ImportNode:
+    """One module's import, with the imports it triggered as children."""
+
+    __slots__ = ("name", "thread", "started", "duration", "children")
+
+    def __init__(self, name: str, thread: str) -> None:
+        self.name = name
+        self.thread = thread
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.children: list[ImportNode] = []
+
+    @property
+    def own(self) -> float:
+        """Time spent in this module itself, without its children."""
+        return self.duration - sum(child.duration for child in self.children)
+
+
+class _TimedLoader:
+    """Wraps a module's loader to time creating and executing the module."""
+
+    def __init__(self, loader, profiler: ImportProfiler, name: str) -> None:
+        self.loader = loader
+        self.profiler = profiler
+        self.name = name
+        self.node = None
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        # extension modules (cv2, numpy's core) do most of their work here
+        self.node = self.profiler._enter(self.name)
+        try:
+            create = getattr(self.loader, "create_module", None)
+            return create(spec) if create else None
+        except BaseException:
+            self.profiler._exit(self.node)
+            raise
+
+    def exec_module(self, module):
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._exit(self.node)
+
+            # the module keeps its real loader, for anything that looks it up later
+            if module.__spec__ is not None and module.__spec__.loader is self:
+                module.__spec__.loader = self.loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self.loader
+
+
+class ImportProfiler(MetaPathFinder):
+    """Times every module imported while it's installed, as a tree of which import pulled in which.
+
+    Like ``python -X importtime``, but it can be switched on from the
+    command line of a running program and its report is printed next to
+    the startup report. Imports on worker threads (e.g. a startup step's
+    lazy imports) get trees of their own.
+    """
+
+    def __init__(self) -> None:
+        self.roots: list[ImportNode] = []
+        self._local = threading.local()
+
+    @classmethod
+    def install(cls) -> ImportProfiler:
+        profiler = cls()
+        sys.meta_path.insert(0, profiler)
+        return profiler
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        # ask the finders after us, without coming back here for whatever they import themselves
+        if getattr(self._local, "finding", False):
+            return None
+
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                find = getattr(finder, "find_spec", None)
+                if finder is self or find is None:
+                    continue
+
+                spec = find(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        # namespace packages have nothing to execute
+        if spec.loader is not None:
+            spec.loader = _TimedLoader(spec.loader, self, name)
+
+        return spec
+
+    def _enter(self, name: str) -> ImportNode:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        node = ImportNode(name, threading.current_thread().name)
+        (stack[-1].children if stack else self.roots).append(node)
+        stack.append(node)
+        return node
+
+    def _exit(self, node: ImportNode):
+        node.duration = time.perf_counter() - node.started
+
+        stack = self._local.stack
+        while stack:
+            if stack.pop() is node:
+                break
+
+    @property
+    def total(self) -> float:
+        return sum(node.duration for node in self.roots)
+
+    def report(self, threshold: float = 0.001) -> str:
+        """The import tree, leaving out imports that took less than ``threshold`` seconds."""
+        lines = [f"Imports took {self.total * 1e3:.0f} ms (total / own)"]
+
+        def add(node: ImportNode, depth: int):
+            if node.duration < threshold:
+                return
+
+            name = "  " * depth + node.name
+            if depth == 0 and node.thread != "MainThread":
+                name += f" [{node.thread}]"
+
+            lines.append(f"  {name:<56} {node.duration * 1e3:7.1f} ms {node.own * 1e3:7.1f} ms")
+            for child in node.children:
+                add(child, depth + 1)
+
+        for root in self.roots:
+            add(root, 0)
+
+        return "\n".join(lines)
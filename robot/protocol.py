@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import struct
+
+from operator import itemgetter
+
+import flatbuffers
+
+from MotionProtocol import Message, MessageType, Remote
+
+
+class RemoteFrame:
+    """Precompiled encoder for the Remote message sent to the motion controller.
+
+    The flatbuffers builder omits every field that equals its default, so the
+    layout of a frame only depends on which fields are non-zero. The first time
+    a combination of present fields is seen, a frame is built once with the
+    generated ``Remote``/``Message`` modules and kept as a template together
+    with the offsets of its field slots. Every later frame with the same
+    combination is produced by patching the scalar slots of that template in
+    place with a single ``struct.pack_into`` call.
+
+    The output is byte-for-byte identical to the generated modules.
+    """
+
+    # (name, flatbuffers add function, struct format) in slot order
+    FIELDS = (
+        ("enabled", Remote.RemoteAddEnabled, "?"),
+        ("mode", Remote.RemoteAddMode, "b"),
+        ("rlr", Remote.RemoteAddRlr, "b"),
+        ("rfb", Remote.RemoteAddRfb, "b"),
+        ("rt", Remote.RemoteAddRt, "B"),
+        ("llr", Remote.RemoteAddLlr, "b"),
+        ("lfb", Remote.RemoteAddLfb, "b"),
+        ("lt", Remote.RemoteAddLt, "B"),
+        ("dpad_u", Remote.RemoteAddDpadU, "?"),
+        ("dpad_d", Remote.RemoteAddDpadD, "?"),
+        ("dpad_l", Remote.RemoteAddDpadL, "?"),
+        ("dpad_r", Remote.RemoteAddDpadR, "?"),
+        ("triangle", Remote.RemoteAddTriangle, "?"),
+        ("cross", Remote.RemoteAddCross, "?"),
+        ("square", Remote.RemoteAddSquare, "?"),
+        ("circle", Remote.RemoteAddCircle, "?"),
+    )
+
+    def __init__(self) -> None:
+        # presence mask -> (buffer, struct, base offset, field order)
+        self._templates = {}
+
+    def encode(self, *values) -> bytearray:
+        """Encode one frame from the 16 Remote values given in slot order.
+
+        The returned buffer belongs to the encoder and is overwritten by the
+        next call with the same set of non-zero fields, so it must be written
+        out (or copied) before encoding again.
+        """
+        mask = 0
+        bit = 1
+        for value in values:
+            if value:
+                mask |= bit
+            bit <<= 1
+
+        template = self._templates.get(mask)
+        if template is None:
+            template = self._templates[mask] = self._compile(mask)
+
+        buf, packer, base, order = template
+        if order:
+            packer.pack_into(buf, base, *[values[i] for i in order])
+
+        return buf
+
+    @classmethod
+    def build(cls, *values) -> bytes:
+        """Reference encoding through the generated flatbuffers modules."""
+        builder = flatbuffers.Builder(1024)
+
+        Remote.Start(builder)
+        for (_, add, _), value in zip(cls.FIELDS, values):
+            add(builder, value)
+        remote = Remote.End(builder)
+
+        Message.Start(builder)
+        Message.AddType(builder, MessageType.MessageType.REMOTE)
+        Message.AddRemote(builder, remote)
+        msg = Message.End(builder)
+
+        builder.Finish(msg)
+
+        return builder.Output()
+
+    def _compile(self, mask: int):
+        present = [i for i in range(len(self.FIELDS)) if mask & (1 << i)]
+
+        # any non-default value works, the slots get patched on every encode
+        buf = bytearray(self.build(*(1 if mask & (1 << i) else 0 for i in range(len(self.FIELDS)))))
+
+        remote = Message.Message.GetRootAs(buf, 0).Remote()
+        if remote is None:
+            raise ValueError("Remote table missing from template frame")
+
+        tab = remote._tab
+        offsets = {i: tab.Pos + tab.Offset(4 + 2 * i) for i in present}
+
+        order = sorted(present, key=offsets.__getitem__)
+        if not order:
+            return buf, None, 0, ()
+
+        base = offsets[order[0]]
+        fmt = "<"
+        cursor = base
+        for i in order:
+            fmt += "x" * (offsets[i] - cursor) + self.FIELDS[i][2]
+            cursor = offsets[i] + 1
+
+        return buf, struct.Struct(fmt), base, tuple(order)
+
+
+class MotorStatus:
+    """Decoded ``ODriveStatus`` reply.
+
+    ``connected`` holds the six ODrive connection flags and ``errors`` the
+    twelve axis error codes in schema order (00, 01, 10, 11, ... 51).
+    """
+
+    __slots__ = ("connected", "errors")
+
+    def __init__(self, connected: tuple, errors: tuple) -> None:
+        self.connected = connected
+        self.errors = errors
+
+    def any_connected(self) -> bool:
+        return any(self.connected)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(connected={self.connected}, errors={self.errors})"
+
+
+class StatusDecoder:
+    """Bulk decoder for ``ODriveStatus`` replies.
+
+    The vtable of each buffer is read once, and the layout it describes is
+    compiled into a ``struct.Struct`` that unpacks every present field in a
+    single ``unpack_from`` call. Compiled layouts are cached by vtable contents,
+    so steady state decoding costs a dict lookup, one unpack and one
+    ``itemgetter`` to put the fields back in schema order with defaults filled
+    in for absent ones.
+    """
+
+    CONNECTED = 6
+    ERRORS = 12
+
+    # struct format and default of every field in slot order
+    FORMATS = ("?",) * CONNECTED + ("i",) * ERRORS
+    DEFAULTS = (False,) * CONNECTED + (0,) * ERRORS
+
+    _vtable_header = struct.Struct("<HH")
+    _root = struct.Struct("<I")
+    _soffset = struct.Struct("<i")
+
+    def __init__(self) -> None:
+        # vtable bytes -> (struct, getter)
+        self._layouts = {}
+
+    def decode(self, buf) -> MotorStatus:
+        (table,) = self._root.unpack_from(buf, 0)
+        (soffset,) = self._soffset.unpack_from(buf, table)
+        vtable = table - soffset
+        vtable_size, _ = self._vtable_header.unpack_from(buf, vtable)
+
+        key = bytes(buf[vtable:vtable + vtable_size])
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = self._compile(key)
+
+        unpacker, getter = layout
+        values = getter(unpacker.unpack_from(buf, table) + self.DEFAULTS)
+
+        return MotorStatus(values[:self.CONNECTED], values[self.CONNECTED:])
+
+    def _compile(self, vtable: bytes):
+        count = len(self.FORMATS)
+        entries = min(count, (len(vtable) - 4) // 2)
+        offsets = struct.unpack_from(f"<{entries}H", vtable, 4) + (0,) * (count - entries)
+
+        present = sorted((i for i in range(count) if offsets[i]), key=offsets.__getitem__)
+
+        fmt = "<"
+        cursor = 0
+        for i in present:
+            if offsets[i] < cursor:
+                raise ValueError("Overlapping fields in ODriveStatus vtable")
+
+            fmt += "x" * (offsets[i] - cursor) + self.FORMATS[i]
+            cursor = offsets[i] + struct.calcsize("<" + self.FORMATS[i])
+
+        # index of each field in unpacked values + DEFAULTS
+        position = {field: n for n, field in enumerate(present)}
+        indices = [position.get(i, len(present) + i) for i in range(count)]
+
+        return struct.Struct(fmt), itemgetter(*indices)
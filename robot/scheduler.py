@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import time
+import math
+import asyncio
+import inspect
+
+from typing import Callable
+
+
+class LoopStats:
+    """Timing statistics of one periodic loop.
+
+    Jitter is how late each wakeup was relative to its deadline.
+    """
+
+    __slots__ = ("ticks", "overruns", "skipped", "jitter_max", "_jitter_sum", "_jitter_sq")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitter_max = 0.0
+        self._jitter_sum = 0.0
+        self._jitter_sq = 0.0
+
+    def record(self, jitter: float):
+        self.ticks += 1
+        self._jitter_sum += jitter
+        self._jitter_sq += jitter * jitter
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+
+    @property
+    def jitter_mean(self) -> float:
+        return self._jitter_sum / self.ticks if self.ticks else 0.0
+
+    @property
+    def jitter_rms(self) -> float:
+        return math.sqrt(self._jitter_sq / self.ticks) if self.ticks else 0.0
+
+    def __str__(self):
+        return (f"ticks: {self.ticks}, overruns: {self.overruns}, skipped: {self.skipped}, "
+                f"jitter mean: {self.jitter_mean * 1e3:.2f} ms, rms: {self.jitter_rms * 1e3:.2f} ms, "
+                f"max: {self.jitter_max * 1e3:.2f} ms")
+
+
+class Rate:
+    """Paces a loop against absolute monotonic deadlines.
+
+    Call :meth:`sleep` at the end of every iteration instead of
+    ``asyncio.sleep(period)``. The time spent doing the work is absorbed into
+    the period, so the loop runs at the requested rate without drifting.
+
+    When an iteration overruns its deadline, the ``SKIP`` policy drops the
+    missed ticks and realigns to the next deadline on the original grid, while
+    ``CATCH_UP`` returns immediately until the missed ticks have been run, up to
+    ``max_catch_up`` of them.
+    """
+
+    SKIP = "skip"
+    CATCH_UP = "catch_up"
+
+    def __init__(
+        self,
+        hz: float,
+        name: str = None,
+        policy: str = SKIP,
+        max_catch_up: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.period = 1.0 / hz
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.stats = LoopStats()
+        self.deadline = None
+
+    @property
+    def hz(self) -> float:
+        return 1.0 / self.period
+
+    def reset(self):
+        """Start a new deadline grid on the next :meth:`sleep`."""
+        self.deadline = None
+
+    async def sleep(self, period: float = None):
+        """Sleep until the next deadline, ``period`` seconds after the last one."""
+        if period is None:
+            period = self.period
+
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+
+        self.deadline += period
+
+        if now > self.deadline:
+            self.stats.overruns += 1
+            missed = int((now - self.deadline) // period) + 1
+
+            if self.policy == self.CATCH_UP and missed <= self.max_catch_up:
+                self.stats.record(now - self.deadline)
+                await asyncio.sleep(0)
+                return
+
+            self.deadline += missed * period
+            self.stats.skipped += missed
+
+        await asyncio.sleep(self.deadline - now)
+        self.stats.record(max(0.0, self.clock() - self.deadline))
+
+    async def run(self, callback: Callable):
+        """Call ``callback`` (plain or async) once per period, forever."""
+        while True:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+            await self.sleep()
+
+
+class Scheduler:
+    """Registry of the robot's periodic loops, so their timing can be inspected in one place."""
+
+    def __init__(self) -> None:
+        self.loops: dict[str, Rate] = {}
+
+    def rate(self, name: str, hz: float, policy: str = Rate.SKIP, **kwargs) -> Rate:
+        """Create a :class:`Rate`, replacing any earlier loop of the same name."""
+        rate = Rate(hz, name=name, policy=policy, **kwargs)
+        self.loops[name] = rate
+        return rate
+
+    def stats(self) -> dict[str, LoopStats]:
+        return {name: rate.stats for name, rate in self.loops.items()}
+
+    def report(self) -> str:
+        return "\n".join(f"{name} @ {rate.hz:g} Hz: {rate.stats}" for name, rate in self.loops.items())
@@ -1,37 +1,82 @@
+from __future__ import annotations
+
+import time
 import asyncio
+import threading
 import traceback
-import importlib.util
 
 from traceback import print_exc
-from concurrent.futures import ThreadPoolExecutor
-
+from typing import TYPE_CHECKING
 
-from .ui import MainWindow
-from .mode import Mode
+from .mode import Mode, ModeRegistry
 from .motion import Motion
-from .controller import Controller
+from .controller import Controller, LEDAnimation
 from .face import Face
-from .audio_manager import AudioManager
+from .scheduler import Scheduler
+from .uevent import UeventMonitor
+from .devices import DeviceRegistry
+from .input_log import InputReplay
+from .teleop import TeleopReceiver
+from .metrics import Histogram
+from .startup import Startup
+
+# Qt and pygame are imported when the window and the sounds are set up
+if TYPE_CHECKING:
+    from .ui import MainWindow
+    from .audio_manager import AudioManager
+    from .profiling import ImportProfiler
 
 
 class Sparky:
     enabled: bool = False
     mode: Mode = None
     selected_mode_name: str
+    ui: MainWindow = None
     face: Face = None
-
-    def __init__(self) -> None:
-        self._executor = ThreadPoolExecutor(max_workers=3)
+    audio_manager: AudioManager = None
+    motion: Motion = None
+    controller: Controller = None
+    led_animation: LEDAnimation = None
+
+    # lightbar blink patterns, (color, seconds) steps
+    HEARTBEAT_ENABLED = (((0, 0, 0), 0.1), ((50, 0, 0), 0.4))
+    HEARTBEAT_DISABLED = (((0, 0, 0), 0.1), ((0, 50, 0), 1.9))
+
+    # longest acceptable time from enable to the mode's first command, seconds
+    ENABLE_LATENCY_BUDGET = 0.1
+
+    def __init__(self, input_replay: str = None, replay_speed: float = 1.0, input_record: str = None,
+                 teleop_port: int = None, isolated_modes=(), profiler: ImportProfiler = None,
+                 teleop_host: str = TeleopReceiver.HOST) -> None:
+        # drive from a recorded input log instead of the PS4 controller, and/or record the controller
+        self.input_replay = input_replay
+        self.replay_speed = replay_speed
+        self.input_record = input_record
+
+        # also accept controller state over UDP on this port, on the interface with this address
+        self.teleop_port = teleop_port
+        self.teleop_host = teleop_host
+        self.teleop = None
+
+        # modes to run in a child process of their own, where they support it
+        self.isolated_modes = set(isolated_modes)
+
+        # reports the imports of startup along with its own timings, see launch.py --profile-startup
+        self.profiler = profiler
+
+        self.scheduler = Scheduler()
+        self.uevents = UeventMonitor()
+        self.devices = DeviceRegistry()
         self.lidar = None
-        self.mode_to_face = {
-            "manual": Face.OVAL,
-            "pushup": Face.RAGE,
-            "dance": Face.HAPPY,
-            "leg_testing": Face.OVAL,
-            "gesture": Face.OVAL,
-            "leg_control": Face.OVAL,
-        }
-        self.audio_manager = AudioManager()
+        self.modes = ModeRegistry(self)
+        self.startup = Startup()
+
+        # set once startup is done and motion is up, the window is live before that
+        self.ready = False
+
+        # time from enabling a mode to its first command reaching motion, seconds
+        self.enable_latency = Histogram()
+        self._enabled_at = None
 
     async def __aenter__(self):
         return self
@@ -41,148 +86,205 @@ class Sparky:
 
     async def set_enabled(self, en: bool):
         if en:
+            if not self.ready:
+                print(f"Can't start mode '{self.selected_mode_name}', the robot isn't ready")
+                return
+
             try:
                 print(f"Starting mode '{self.selected_mode_name}'")
 
-                mode_audio_map = {
-                    "manual": 0,        # walkMode
-                    "pushup": 1,        # pushUpsMode  
-                    "leg_control": 2,   # legControlMode
-                    "leg_testing": 3,   # gyroMode (closest match)
-                    "gesture": 4,       # machineLearningMode (ML/gesture)
-                    "dance": 5          # danceMode
-                }
-
-                # Play mode change sound
-                mode_number = mode_audio_map.get(self.selected_mode_name, 0)
-                self.audio_manager.play_mode_sounds(mode_number)
-                # dynamically load the mode at runtime
-                name = importlib.util.resolve_name(f"robot.modes.{self.selected_mode_name}", None)
-                spec = importlib.util.find_spec(name)
-                lib = importlib.util.module_from_spec(spec)
-
-                spec.loader.exec_module(lib)
-                setup = getattr(lib, 'setup')
-                self.mode = await setup(self)
-
-                # start the mode subroutine
-                self._executor.submit(self.mode.run)
+                # modes are set up ahead of time, only starting one is left to do here
+                mode = await self.modes.get(self.selected_mode_name)
+                if mode is None:
+                    return
+
+                # still winding down from the last time it was disabled
+                if mode.running and not await mode.shutdown():
+                    return
 
+                self.mode = mode
                 self.enabled = en
+                self._enabled_at = time.monotonic()
 
-                # Update face by selected mode
+                # start the mode subroutine, on this loop
+                task = await self.mode.launch()
+                task.add_done_callback(self._on_mode_done)
+
+                self.motion.notify()
+                self._play_heartbeat()
+
+                # Play mode change sound and update face by selected mode, after the mode is on its way
+                if self.audio_manager:
+                    self.audio_manager.play_mode_sounds(mode.SOUND)
                 if self.face:
-                    cmd = self.mode_to_face.get(self.selected_mode_name, Face.OVAL)
-                    self.face.send_command(cmd)
+                    self.face.send_command(mode.FACE)
 
             except Exception as e:
                 print_exc()
 
         else:
-            self.audio_manager.play_sound("pause")
-            self.motion.stop()
-            self.mode.stop()
-            self.mode = None
+            mode, self.mode = self.mode, None
+            self._enabled_at = None
             self.enabled = en
 
+            if self.audio_manager:
+                self.audio_manager.play_sound("pause")
+            if self.motion:
+                self.motion.stop()
+            self._play_heartbeat()
+
             # Robot disabled expression
             if self.face:
                 self.face.send_command(Face.OFF)
 
+            if mode:
+                await mode.shutdown()
 
-    async def heartbeat(self):
-        next_change_in = 0
-        led_on = True
-
-        while True:
-            if led_on:
-                color = (0, 0, 0)
-                next_change_in = 0.1
-
-            else:
-                if self.enabled:
-                    color = (50, 0, 0)
-                    next_change_in = 0.4
+    def _on_mode_done(self, task: asyncio.Task):
+        # a mode that ends while it's still the enabled one crashed or gave up, stop the robot
+        if self.enabled and self.mode is not None and self.mode.task is task:
+            print(f"Mode '{self.selected_mode_name}' ended, disabling")
+            asyncio.get_running_loop().create_task(self.set_enabled(False))
 
-                else:
-                    color = (0, 50 ,0)
-                    next_change_in = 1.9
 
-            led_on = not led_on
+    async def heartbeat(self):
+        self.led_animation = LEDAnimation(self.controller.led, self.scheduler.rate("heartbeat", 10))
+        self._play_heartbeat()
+        await self.led_animation.run()
 
-            await self.controller.led.set_color(color)
-            await asyncio.sleep(next_change_in)
+    def _play_heartbeat(self):
+        if self.led_animation:
+            self.led_animation.play(self.HEARTBEAT_ENABLED if self.enabled else self.HEARTBEAT_DISABLED)
 
 
     async def move(self, *args, **kwargs):
         self.motion.move(*args, **kwargs)
 
-    async def run(self):
-        # Initialize LiDAR if available (optional hardware)
-        try:
-            from .lidar import LiDAR
-
-            self.lidar = LiDAR(
-                port=None,
-                max_distance=2000,
-                test_output=False,
-                invert_rotation=True,
-            )
-
-            if self.lidar.port is None:
-                self.lidar.port = self.lidar.find_serial_dev()
-
-            await self.lidar.connect()
-            self.lidar.start(loop=None)
-            print("LiDAR initialized")
-        except Exception as e:
-            print(f"LiDAR init skipped: {e}")
-            self.lidar = None
+        if self._enabled_at is not None:
+            self._record_enable_latency()
 
-        self.ui = MainWindow.start(self)
-        self.loop = self.ui.loop
-        asyncio.set_event_loop(self.loop)
+    def _record_enable_latency(self):
+        latency = time.monotonic() - self._enabled_at
+        self._enabled_at = None
+        self.enable_latency.record(latency)
+
+        over = " (over budget)" if latency > self.ENABLE_LATENCY_BUDGET else ""
+        print(f"Mode '{self.selected_mode_name}' first command {latency * 1e3:.1f} ms after enable{over}")
+
+    def _start_devices(self):
+        # One enumeration of the serial ports for every subsystem, hotplug keeps it current afterwards
+        self.devices.scan()
+        if self.uevents.start(self.loop):
+            self.devices.attach(self.uevents)
+
+    def _start_audio(self):
+        from .audio_manager import AudioManager
 
-        # Play startup sound
+        # decodes every sound up front
+        self.audio_manager = AudioManager()
         self.audio_manager.play_sound("startup1")
 
-        self.controller = Controller(self)
+    async def _start_lidar(self):
+        from .lidar import LiDAR
+
+        lidar = LiDAR(
+            port=None,
+            max_distance=2000,
+            test_output=False,
+            invert_rotation=True,
+        )
+        lidar.port = lidar.find_serial_dev(self.devices)
+
+        await lidar.connect()
+        await asyncio.to_thread(lidar.start)
+
+        self.lidar = lidar
+        if view := getattr(self.ui, "lidarView", None):
+            view.attach(lidar)
+        print("LiDAR initialized")
+
+    def _start_face(self):
+        # the ESP32 reboots when its port is opened
+        self.face = Face(self.devices)
+
+    def _start_controller(self):
+        replay = InputReplay(self.input_replay, self.replay_speed) if self.input_replay else None
+        self.controller = Controller(self, replay)
+        if self.input_record:
+            self.controller.record(self.input_record)
+
         self.loop.create_task(self.controller.events())
         self.loop.create_task(self.controller.polling())
+        self.loop.create_task(self.heartbeat())
+
+        if self.teleop_port:
+            self.teleop = TeleopReceiver(self.controller)
+            self.loop.create_task(self.teleop.start(self.teleop_host, self.teleop_port))
 
+    def _start_motion(self):
         self.motion = Motion(self)
         self.loop.create_task(self.motion.run())
 
-        # Initialize face once
-        try:
-            self.face = Face()
-        except Exception as e:
-            print(f"Face init failed: {e}")
-            self.face = None
+    async def start(self):
+        """Bring every subsystem up, reporting how long each took."""
+        # independent subsystems come up side by side, the slow serial devices on threads
+        self.startup.add("devices", self._start_devices)
+        self.startup.add("audio", self._start_audio, blocking=True)
+        self.startup.add("lidar", self._start_lidar, after=("devices",))
+        self.startup.add("face", self._start_face, after=("devices",), blocking=True)
+        self.startup.add("controller", self._start_controller)
+        # the registry scans on demand, motion doesn't wait on (or fail with) the devices step
+        self.startup.add("motion", self._start_motion)
+        # import and set up every mode now, instead of on each enable
+        self.startup.add("modes", self.modes.load, after=("motion", "controller"))
 
-        self.loop.create_task(self.heartbeat())
+        await self.startup.run()
+
+        # modes are only enabled once they're all set up and have something to drive
+        self.ready = self.motion is not None
+
+        if self.profiler:
+            self.profiler.uninstall()
+            print(self.profiler.report())
+
+    async def run(self):
+        from .ui import MainWindow
+
+        # the window is up straight away, the hardware joins it as it comes up
+        self.ui = MainWindow.start(self)
+        self.loop = self.ui.loop
+        asyncio.set_event_loop(self.loop)
+
+        self.loop.create_task(self.start())
         self.ui.loop.run_forever()
 
     def stop(self):
         print(f"{self.__class__.__name__} stopping")
 
-        self.motion.stop()
+        if self.motion:
+            self.motion.stop()
+
+        self.modes.close()
 
-        if self.mode:
-            self.mode.stop()
+        if self.controller:
+            self.controller.stop()
+
+        if self.teleop:
+            print(f"Teleop {self.teleop.stats()}")
+            self.teleop.close()
 
         for task in asyncio.all_tasks(self.loop):
             print(f"Cancelling Task: {task.get_coro()}")
             task.cancel()
 
         self.loop.stop()
+        self.uevents.close()
 
         if self.lidar:
-            self._executor.submit(asyncio.run, self.lidar.stop())
-
-        # set controller back to blue, weird annoying way
-        self._executor.submit(asyncio.run, self.controller.led.set_color((0, 0, 50)))
+            threading.Thread(target=asyncio.run, args=(self.lidar.stop(),)).start()
 
-        self._executor.shutdown()
+        # set controller back to blue
+        if self.controller:
+            self.controller.led.write((0, 0, 50))
 
         print("stopped")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import inspect
+
+from typing import Callable
+
+
+class Step:
+    """One subsystem to bring up, see :meth:`Startup.add`."""
+
+    __slots__ = ("name", "func", "after", "blocking", "task", "started", "finished", "error", "skipped")
+
+    def __init__(self, name: str, func: Callable, after: tuple, blocking: bool) -> None:
+        self.name = name
+        self.func = func
+        self.after = after
+        self.blocking = blocking
+
+        self.task = None
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.skipped = False
+
+    @property
+    def ok(self) -> bool:
+        return self.finished is not None and self.error is None and not self.skipped
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started if self.finished is not None and self.started is not None else 0.0
+
+
+class Startup:
+    """Brings the robot's subsystems up, each as soon as the ones it depends on are.
+
+    Steps with nothing in common run at the same time, so startup takes
+    about as long as its slowest chain of dependent steps instead of the
+    sum of them all. Blocking steps (serial ports that reset the device on
+    open, decoding sounds) run on worker threads to keep the loop, and the
+    UI on it, responsive. A step that fails is printed and skipped along
+    with everything that depends on it; the rest carry on, as every
+    subsystem but motion is optional hardware.
+    """
+
+    def __init__(self) -> None:
+        self.steps: dict[str, Step] = {}
+        self.started = None
+        self.finished = None
+
+    def add(self, name: str, func: Callable, after: tuple[str, ...] = (), blocking: bool = False):
+        """Run ``func()`` once every step in ``after`` has succeeded.
+
+        ``func`` may be a coroutine function; with ``blocking`` it's a plain
+        function run on a worker thread. Dependencies have to be added first,
+        which also rules out cycles.
+        """
+        if name in self.steps:
+            raise ValueError(f"Startup step '{name}' added twice")
+
+        for dependency in after:
+            if dependency not in self.steps:
+                raise ValueError(f"Startup step '{name}' depends on unknown step '{dependency}'")
+
+        self.steps[name] = Step(name, func, tuple(after), blocking)
+
+    async def run(self) -> bool:
+        """Run every step, True if they all succeeded."""
+        loop = asyncio.get_running_loop()
+        self.started = time.monotonic()
+
+        for step in self.steps.values():
+            step.task = loop.create_task(self._run_step(step), name=f"startup {step.name}")
+
+        await asyncio.gather(*(step.task for step in self.steps.values()))
+        self.finished = time.monotonic()
+
+        print(self.report())
+        return all(step.ok for step in self.steps.values())
+
+    async def _run_step(self, step: Step):
+        for dependency in step.after:
+            await self.steps[dependency].task
+
+        if not all(self.steps[dependency].ok for dependency in step.after):
+            step.skipped = True
+            step.started = step.finished = time.monotonic()
+            return
+
+        step.started = time.monotonic()
+        try:
+            if step.blocking:
+                await asyncio.to_thread(step.func)
+            else:
+                result = step.func()
+                if inspect.isawaitable(result):
+                    await result
+
+        except Exception as e:
+            step.error = e
+            print(f"Startup step '{step.name}' failed: {e}")
+
+        finally:
+            step.finished = time.monotonic()
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started if self.finished is not None else 0.0
+
+    def report(self) -> str:
+        """Per-step start offset and init time, in the order the steps started."""
+        lines = [f"Startup took {self.duration * 1e3:.0f} ms"]
+
+        for step in sorted(self.steps.values(), key=lambda s: s.started or 0.0):
+            if step.skipped:
+                status = "skipped"
+            elif step.error is not None:
+                status = f"failed: {step.error}"
+            else:
+                status = "ok"
+
+            offset = (step.started - self.started) * 1e3 if step.started is not None else 0.0
+            lines.append(f"  {step.name:<12} +{offset:6.0f} ms {step.duration * 1e3:7.1f} ms  {status}")
+
+        return "\n".join(lines)
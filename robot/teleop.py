@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import time
+import socket
+import struct
+import asyncio
+import argparse
+
+from itertools import count
+from collections import deque
+from typing import Sequence
+
+from .controller import ControllerState
+from .metrics import Histogram
+
+
+class TeleopPacket:
+    """Compact binary controller state sent over UDP.
+
+    24 bytes: magic, sequence number, the sender's monotonic clock in
+    microseconds, the six analog axes as raw 0..255 readings, and the
+    sixteen buttons as a bitfield, all in ``ControllerState.FIELDS`` order.
+    """
+
+    MAGIC = b"SPTL"
+    STRUCT = struct.Struct("<4sIQ6BH")
+    SIZE = STRUCT.size
+
+    BUTTONS = 16  # leading entries of FIELDS that are buttons, the rest are axes
+
+    @classmethod
+    def pack(cls, seq: int, stamp: float, values: Sequence[int]) -> bytes:
+        buttons = 0
+        for i in range(cls.BUTTONS):
+            if values[i]:
+                buttons |= 1 << i
+
+        return cls.STRUCT.pack(cls.MAGIC, seq & 0xFFFFFFFF, round(stamp * 1e6), *values[cls.BUTTONS:], buttons)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> tuple[int, float, list[int]] | None:
+        """``(seq, stamp, values)`` of a packet, None if it isn't one."""
+        if len(data) != cls.SIZE:
+            return None
+
+        magic, seq, stamp, *axes, buttons = cls.STRUCT.unpack(data)
+        if magic != cls.MAGIC:
+            return None
+
+        values = [(buttons >> i) & 1 for i in range(cls.BUTTONS)]
+        values.extend(axes)
+        return seq, stamp / 1e6, values
+
+
+class TeleopReceiver(asyncio.DatagramProtocol):
+    """Drives a :class:`ControllerState`, normally the robot's controller, from teleop packets.
+
+    Every packet is played out ``jitter`` seconds after the earliest it could
+    have arrived, judged by the lowest transit time among recent packets, so
+    uneven network delay turns into a small fixed one. Packets that arrive
+    after their turn are played at once if nothing newer has been, packets
+    older than the last one played (reordered or duplicated) are dropped,
+    and so is anything more than ``max_delay`` late. Without a packet for
+    ``timeout`` seconds the state goes back to neutral.
+
+    The first sender to be heard from has the robot until its packets stop
+    for ``timeout`` seconds; packets from anyone else are dropped until then,
+    so a second sender can't take over mid-drive.
+    """
+
+    PORT = 5005
+
+    # only reachable from the robot itself unless an interface is given, see launch.py --teleop-host
+    HOST = "127.0.0.1"
+
+    # packets the lowest transit time is taken over
+    TRANSIT_WINDOW = 64
+
+    def __init__(self, target: ControllerState, jitter: float = 0.02, max_delay: float = 0.1,
+                 timeout: float = 0.25) -> None:
+        self.target = target
+        self.jitter = jitter
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        self.transport = None
+        self.loop = None
+        self.peer = None
+
+        self.last_seq = None  # last sequence number played out
+
+        self.received = 0
+        self.played = 0
+        self.late = 0
+        self.stale = 0
+        self.reordered = 0
+        self.malformed = 0
+        self.rejected = 0  # from someone other than the peer in control
+        self.delay = Histogram()  # arrival to play out, seconds
+
+        self._transits = deque(maxlen=self.TRANSIT_WINDOW)
+        self._watchdog = None
+
+        # play-out timers of the packets in the jitter buffer, by arrival number
+        self._buffered: dict[int, asyncio.TimerHandle] = {}
+        self._arrivals = count()
+
+    @property
+    def running(self) -> bool:
+        return self.transport is not None
+
+    @property
+    def pending(self) -> int:
+        """Packets waiting in the jitter buffer."""
+        return len(self._buffered)
+
+    async def start(self, host: str = HOST, port: int = PORT):
+        self.loop = asyncio.get_running_loop()
+        self.transport, _ = await self.loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        print(f"Teleop listening on {self.address}")
+
+    @property
+    def address(self) -> tuple:
+        return self.transport.get_extra_info("sockname") if self.transport else None
+
+    def close(self):
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+        # nothing still in the jitter buffer is played once closed
+        for handle in self._buffered.values():
+            handle.cancel()
+        self._buffered.clear()
+
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.loop = self.loop or asyncio.get_running_loop()
+
+    def datagram_received(self, data: bytes, addr):
+        packet = TeleopPacket.unpack(data)
+        if packet is None:
+            self.malformed += 1
+            return
+
+        if self.peer is not None and self.peer != addr:
+            self.rejected += 1
+            return
+
+        now = self.loop.time()
+        seq, stamp, values = packet
+        self.received += 1
+
+        if self.peer is None:
+            print(f"Teleop from {addr[0]}:{addr[1]}")
+            self.peer = addr
+            self.last_seq = None
+            self._transits.clear()
+
+        if self.last_seq is not None and not 0 < (seq - self.last_seq) % (1 << 32) < (1 << 31):
+            self.reordered += 1
+            return
+
+        # the sender's clock is unrelated to ours, only differences in transit time mean anything
+        transit = now - stamp
+        self._transits.append(transit)
+        lateness = transit - min(self._transits)
+
+        if lateness > self.max_delay:
+            self.stale += 1
+            return
+
+        self._feed_watchdog()
+
+        wait = self.jitter - lateness
+        if wait <= 0:
+            self.late += 1
+            self._play(seq, values, now)
+        else:
+            arrival = next(self._arrivals)
+            self._buffered[arrival] = self.loop.call_later(wait, self._release, arrival, seq, values, now)
+
+    def _release(self, arrival: int, seq: int, values: list, arrived: float):
+        self._buffered.pop(arrival, None)
+        if self.transport is None:
+            return
+
+        # a late packet played straight away may have overtaken this one
+        if self.last_seq is not None and not 0 < (seq - self.last_seq) % (1 << 32) < (1 << 31):
+            self.reordered += 1
+            return
+
+        self._play(seq, values, arrived)
+
+    def _play(self, seq: int, values: list, arrived: float):
+        self.last_seq = seq
+        self.played += 1
+        self.delay.record(self.loop.time() - arrived)
+        self.target.update_state(values)
+
+    def _feed_watchdog(self):
+        if self._watchdog:
+            self._watchdog.cancel()
+
+        self._watchdog = self.loop.call_later(self.timeout, self._lost)
+
+    def _lost(self):
+        self._watchdog = None
+        print(f"Teleop lost, no packets for {self.timeout:g} s")
+
+        # anyone may take over now
+        self.peer = None
+        self.target.reset()
+
+    def stats(self) -> str:
+        return (f"received {self.received}, played {self.played}, late {self.late}, stale {self.stale}, "
+                f"reordered {self.reordered}, malformed {self.malformed}, rejected {self.rejected}, delay {self.delay}")
+
+
+class TeleopSender:
+    """Sends the state of a local :class:`ControllerState` to a :class:`TeleopReceiver`.
+
+    A packet goes out on every change and at least every ``interval`` seconds,
+    which keeps the robot's link watchdog fed while the sticks are still.
+    """
+
+    def __init__(self, host: str, port: int = TeleopReceiver.PORT, interval: float = 0.05) -> None:
+        self.address = (host, port)
+        self.interval = interval
+        self.seq = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def send(self, values: Sequence[int]):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+
+        try:
+            self.sock.sendto(TeleopPacket.pack(self.seq, time.monotonic(), values), self.address)
+        except BlockingIOError:
+            pass  # a full socket buffer only means this state is skipped, the next one supersedes it
+
+    async def run(self, source: ControllerState):
+        updates = source.subscribe()
+        values = source.snapshot()
+
+        try:
+            while True:
+                try:
+                    values = (await asyncio.wait_for(updates.__anext__(), self.interval)).state
+                except asyncio.TimeoutError:
+                    pass
+
+                self.send(values)
+        finally:
+            updates.close()
+
+    def close(self):
+        self.sock.close()
+
+
+async def send_controller(host: str, port: int, interval: float):
+    from evdev import InputDevice
+
+    from .controller import Controller
+
+    node = Controller.find_node()
+    if node is None:
+        print("Controller not found")
+        return
+
+    dev = InputDevice(f"/dev/input/{node.name}")
+    print(f"Sending {dev.name} to {host}:{port}")
+
+    # raw readings, the robot conditions them with its own calibration
+    state = ControllerState()
+    sender = TeleopSender(host, port, interval)
+    task = asyncio.create_task(sender.run(state))
+
+    try:
+        async for event in dev.async_read_loop():
+            state.update_event(event)
+    finally:
+        task.cancel()
+        sender.close()
+        dev.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the robot over the network with a local PS4 controller")
+    parser.add_argument("host", help="address of the robot")
+    parser.add_argument("--port", type=int, default=TeleopReceiver.PORT)
+    parser.add_argument("--interval", type=float, default=0.05, help="longest time between packets, seconds")
+    args = parser.parse_args()
+
+    asyncio.run(send_controller(args.host, args.port, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import time
+import struct
+import asyncio
+
+from collections import deque
+from typing import Callable
+
+from .metrics import Histogram, RateMeter
+
+
+class FrameParser:
+    """Streaming parser for the length-prefixed replies of the motion controller.
+
+    Each reply is a little-endian ``uint32`` size followed by that many bytes of
+    payload. Data can be fed in arbitrary chunks; complete payloads are returned
+    as soon as their last byte arrives and partial ones are kept until the rest
+    shows up.
+    """
+
+    HEADER = struct.Struct("<I")
+
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self.resyncs = 0
+        self._buf = bytearray()
+
+    @property
+    def pending(self) -> int:
+        """Bytes of an incomplete reply waiting for the rest to arrive."""
+        return len(self._buf)
+
+    def feed(self, data: bytes) -> list[bytes]:
+        buf = self._buf
+        buf += data
+
+        frames = []
+        start = 0
+        header = self.HEADER.size
+        while len(buf) - start >= header:
+            (size,) = self.HEADER.unpack_from(buf, start)
+
+            if size > self.max_size:
+                # not a plausible header, slide forward a byte and try again
+                self.resyncs += 1
+                start += 1
+                continue
+
+            end = start + header + size
+            if end > len(buf):
+                break
+
+            frames.append(bytes(buf[start + header:end]))
+            start = end
+
+        if start:
+            del buf[:start]
+
+        return frames
+
+    def reset(self):
+        self._buf.clear()
+
+
+class LinkStats:
+    """Health of the link to the motion controller.
+
+    ``rtt`` holds the time from writing a frame to parsing its reply. Short
+    reads are serial reads that timed out partway through a reply, whose
+    partial bytes are discarded, and parse failures count replies that had to be resynchronised or failed to decode.
+    """
+
+    def __init__(self) -> None:
+        self.rtt = Histogram()
+        self.frames_sent = 0
+        self.replies = 0
+        self.timeouts = 0
+        self.short_reads = 0
+        self.parse_failures = 0
+        self.tx = RateMeter()
+        self.rx = RateMeter()
+
+    def __str__(self):
+        now = time.monotonic()
+        return (f"sent: {self.frames_sent}, replies: {self.replies}, timeouts: {self.timeouts}, "
+                f"short reads: {self.short_reads}, parse failures: {self.parse_failures}, "
+                f"tx: {self.tx.rate(now):.0f} B/s, rx: {self.rx.rate(now):.0f} B/s, rtt: {self.rtt}")
+
+
+class MotionTransport:
+    """Full-duplex link to the motion controller.
+
+    A writer task sends the most recent frame handed to :meth:`send` and a
+    reader task parses replies as they stream in, so a slow or missing reply
+    never holds up the next command. Only the newest frame matters: if several
+    are queued while a write is in progress, the older ones are dropped.
+
+    Every frame written gets a sequence number. The controller answers frames
+    in order without echoing anything back, so replies are matched to the
+    oldest outstanding sequence number. Frames that go unanswered for longer
+    than ``reply_timeout``, or that fall out of the ``max_in_flight`` window,
+    are reported through ``on_timeout``.
+    """
+
+    def __init__(
+        self,
+        serial,
+        on_reply: Callable[[int | None, bytes, float | None], None],
+        on_timeout: Callable[[int], None] | None = None,
+        reply_timeout: float = 1.0,
+        max_in_flight: int = 8,
+        stats: LinkStats = None,
+    ) -> None:
+        self.serial = serial
+        self.on_reply = on_reply
+        self.on_timeout = on_timeout
+        self.reply_timeout = reply_timeout
+        self.max_in_flight = max_in_flight
+
+        self.parser = FrameParser()
+        self.stats = stats or LinkStats()
+        self.seq = 0
+
+        self._frame = None
+        self._ready = asyncio.Event()
+        self._in_flight = deque()  # (seq, sent_at)
+
+    def send(self, frame) -> None:
+        """Queue a frame for the writer, replacing any frame not yet written."""
+        self._frame = bytes(frame)
+        self._ready.set()
+
+    async def run(self):
+        """Run the writer and reader until one of them fails."""
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self._writer())
+            tg.create_task(self._reader())
+
+    async def _writer(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+
+            frame = self._frame
+            now = time.monotonic()
+
+            self._expire(now)
+            while len(self._in_flight) >= self.max_in_flight:
+                self._timeout(self._in_flight.popleft()[0])
+
+            self.seq += 1
+            self._in_flight.append((self.seq, now))
+
+            await self.serial.write_async(frame)
+
+            self.stats.frames_sent += 1
+            self.stats.tx.add(len(frame), now)
+
+    async def _reader(self):
+        while True:
+            data = await self.serial.read_async(max(1, self.serial.in_waiting))
+            now = time.monotonic()
+
+            stats = self.stats
+
+            if data:
+                stats.rx.add(len(data), now)
+
+                resyncs = self.parser.resyncs
+                payloads = self.parser.feed(data)
+                if self.parser.resyncs != resyncs:
+                    stats.parse_failures += 1
+
+                for payload in payloads:
+                    stats.replies += 1
+                    if self._in_flight:
+                        seq, sent_at = self._in_flight.popleft()
+                        stats.rtt.record(now - sent_at)
+                        self.on_reply(seq, payload, now - sent_at)
+                    else:
+                        # reply to a frame already given up on
+                        self.on_reply(None, payload, None)
+
+            elif self.parser.pending:
+                # the rest of that reply isn't coming, don't let the next one be read as its continuation
+                stats.short_reads += 1
+                self.parser.reset()
+
+            self._expire(now)
+
+    def _expire(self, now: float):
+        while self._in_flight and now - self._in_flight[0][1] > self.reply_timeout:
+            self._timeout(self._in_flight.popleft()[0])
+
+    def _timeout(self, seq: int):
+        self.stats.timeouts += 1
+        if self.on_timeout:
+            self.on_timeout(seq)
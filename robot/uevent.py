@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import socket
+import asyncio
+
+from typing import Callable
+
+
+class UeventMonitor:
+    """Kernel device events (add, remove, change) delivered on the asyncio loop.
+
+    Listens on the kernel's netlink uevent socket, so hotplug of USB serial
+    adapters, input devices and power supply changes are seen as they happen
+    without polling or extra dependencies. Each event is passed to subscribers
+    as a dict of its properties (``ACTION``, ``SUBSYSTEM``, ``DEVNAME``, ...).
+
+    If the socket cannot be opened (not Linux, sandboxed), :meth:`start`
+    returns False and callers are expected to fall back to polling.
+    """
+
+    NETLINK_KOBJECT_UEVENT = 15
+    KERNEL_GROUP = 1
+
+    def __init__(self) -> None:
+        self._sock = None
+        self._loop = None
+        self._subscribers = []  # (subsystem, callback)
+
+    @property
+    def running(self) -> bool:
+        return self._sock is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop = None, sock: socket.socket = None) -> bool:
+        if self._sock is not None:
+            return True
+
+        if sock is None:
+            try:
+                sock = socket.socket(
+                    socket.AF_NETLINK,
+                    socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                    self.NETLINK_KOBJECT_UEVENT,
+                )
+                sock.bind((0, self.KERNEL_GROUP))
+
+            except (AttributeError, OSError) as e:
+                print(f"Hotplug events unavailable: {e}")
+                return False
+
+        sock.setblocking(False)
+
+        self._loop = loop or asyncio.get_event_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        self._sock = sock
+        return True
+
+    def close(self):
+        if self._sock is None:
+            return
+
+        try:
+            self._loop.remove_reader(self._sock.fileno())
+        except Exception:
+            pass
+
+        self._sock.close()
+        self._sock = None
+
+    def subscribe(self, callback: Callable[[dict], None], subsystem: str = None) -> Callable[[], None]:
+        """Call ``callback`` for every event, or only those of ``subsystem``. Returns an unsubscribe function."""
+        entry = (subsystem, callback)
+        self._subscribers.append(entry)
+
+        def unsubscribe():
+            try:
+                self._subscribers.remove(entry)
+            except ValueError:
+                pass
+
+        return unsubscribe
+
+    async def wait_for(self, predicate: Callable[[dict], bool], timeout: float, subsystem: str = None) -> dict | None:
+        """Wait up to ``timeout`` seconds for an event matching ``predicate``, returning it or None."""
+        future = asyncio.get_running_loop().create_future()
+
+        def check(event):
+            if not future.done() and predicate(event):
+                future.set_result(event)
+
+        unsubscribe = self.subscribe(check, subsystem)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            unsubscribe()
+
+    @staticmethod
+    def parse(data: bytes) -> dict | None:
+        """Parse one kernel uevent message; anything else (udev broadcasts) gives None."""
+        if data.startswith(b"libudev"):
+            return None
+
+        fields = data.split(b"\0")
+        if b"@" not in fields[0]:
+            return None
+
+        event = {}
+        for field in fields[1:]:
+            key, sep, value = field.partition(b"=")
+            if sep:
+                event[key.decode(errors="replace")] = value.decode(errors="replace")
+
+        return event if "ACTION" in event else None
+
+    def _on_readable(self):
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(16384)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"Hotplug monitor failed: {e}")
+                self.close()
+                return
+
+            event = self.parse(data)
+            if event is None:
+                continue
+
+            subsystem = event.get("SUBSYSTEM")
+            for wanted, callback in list(self._subscribers):
+                if wanted is None or wanted == subsystem:
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        print(f"Hotplug subscriber failed: {e}")
@@ -146,7 +146,8 @@ class MainWindow(QMainWindow):
             battery = max(0, min(100, battery))
             self.batteryBar.setRange(0, 100)
             self.batteryBar.setValue(battery)
-            self.batteryBar.setFormat(f"{battery}%")
+            charging = bool(getattr(controller, "charging", False))
+            self.batteryBar.setFormat(f"{battery}% (charging)" if charging else f"{battery}%")
 
         if self.infoLabel is not None:
             motion = getattr(self.robot, "motion", None)
@@ -156,10 +157,7 @@ class MainWindow(QMainWindow):
                 status = getattr(motion, "status", None)
                 if status is not None:
                     try:
-                        connected = any(
-                            bool(getattr(status, f"Connected{i}")())
-                            for i in range(6)
-                        )
+                        connected = status.any_connected()
                     except Exception:
                         connected = None
 
@@ -168,6 +166,12 @@ class MainWindow(QMainWindow):
             else:
                 text = "Motion: Connected" if connected else "Motion: Disconnected"
 
+            link = getattr(motion, "link_stats", None)
+            if link is not None and link.frames_sent:
+                rtt = link.rtt
+                text += (f" | RTT p50 {rtt.percentile(50) * 1e3:.1f} ms, p99 {rtt.percentile(99) * 1e3:.1f} ms"
+                         f" | lost {link.timeouts}/{link.frames_sent}")
+
             self.infoLabel.setText(text)
 
     def set_mode_buttons_disabled(self, disabled: bool):
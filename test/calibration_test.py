@@ -0,0 +1,158 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from evdev import InputEvent, ecodes
+
+from robot.calibration import AxisCalibration, Calibration, calibrate_axis
+from robot.controller import ControllerState
+
+
+class TestAxisCalibration(unittest.TestCase):
+    def test_full_travel_is_identity(self):
+        self.assertEqual(list(AxisCalibration().table()), list(range(256)))
+        self.assertEqual(list(AxisCalibration(center=0).table()), list(range(256)))
+
+    def test_deadzone(self):
+        axis = AxisCalibration(deadzone=0.1)
+
+        for raw in range(116, 141):
+            self.assertEqual(axis.value(raw), 128)
+
+        self.assertEqual(axis.value(0), 0)
+        self.assertEqual(axis.value(255), 255)
+        self.assertGreater(axis.value(142), 128)
+
+    def test_range_and_center(self):
+        # off-center, and never reaching the ends of the scale
+        axis = AxisCalibration(low=20, center=120, high=230)
+
+        self.assertEqual(axis.value(120), 128)
+        self.assertEqual(axis.value(20), 0)
+        self.assertEqual(axis.value(5), 0)
+        self.assertEqual(axis.value(230), 255)
+        self.assertEqual(axis.value(250), 255)
+        self.assertEqual(axis.value(175), 128 + round(127 * 0.5))
+
+    def test_expo(self):
+        linear = AxisCalibration()
+        curved = AxisCalibration(expo=1.0)
+
+        self.assertLess(curved.value(160), linear.value(160))
+        self.assertGreater(curved.value(96), linear.value(96))
+        self.assertEqual(curved.value(255), 255)
+        self.assertEqual(curved.value(0), 0)
+
+    def test_trigger(self):
+        axis = AxisCalibration(low=10, center=10, high=250, deadzone=0.05)
+
+        self.assertTrue(axis.one_sided)
+        self.assertEqual(axis.value(0), 0)
+        self.assertEqual(axis.value(20), 0)
+        self.assertEqual(axis.value(250), 255)
+
+
+class TestCalibration(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.dir.name, "calibration.json")
+        self.addCleanup(self.dir.cleanup)
+
+    def test_defaults(self):
+        calibration = Calibration()
+
+        self.assertEqual(set(calibration.axes), set(Calibration.STICKS + Calibration.TRIGGERS))
+        self.assertEqual(calibration.axes["left_stick_x"].deadzone, Calibration.STICK_DEADZONE)
+        self.assertTrue(calibration.axes["r2_analog"].one_sided)
+
+    def test_save_and_load(self):
+        calibration = Calibration({"right_stick_y": AxisCalibration(12, 131, 244, 0.08, 0.3)})
+        calibration.save(self.path)
+
+        loaded = Calibration.load(self.path)
+
+        self.assertEqual(loaded.axes, calibration.axes)
+
+    def test_partial_file(self):
+        self.path.write_text(json.dumps({"l2_analog": {"low": 3, "center": 3, "high": 250}}))
+
+        loaded = Calibration.load(self.path)
+
+        self.assertEqual(loaded.axes["l2_analog"], AxisCalibration(3, 3, 250))
+        self.assertEqual(loaded.axes["left_stick_x"], Calibration.defaults()["left_stick_x"])
+
+    @patch("builtins.print")
+    def test_missing_or_broken_file(self, mock_print):
+        self.assertEqual(Calibration.load(self.path).axes, Calibration.defaults())
+
+        self.path.write_text("{not json")
+        self.assertEqual(Calibration.load(self.path).axes, Calibration.defaults())
+
+
+class TestCalibrateAxis(unittest.TestCase):
+    def test_stick(self):
+        rest = [126, 127, 128, 127, 131, 127]
+        sweep = [60, 2, 40, 200, 252, 130]
+
+        axis = calibrate_axis(rest, sweep, expo=0.2)
+
+        self.assertEqual((axis.low, axis.center, axis.high, axis.expo), (2, 127, 252, 0.2))
+        # worst drift, 4 of 125, plus the margin
+        self.assertAlmostEqual(axis.deadzone, round(4 / 125 + 0.02, 3))
+
+        # the drift seen at rest conditions away completely
+        for raw in rest:
+            self.assertEqual(axis.value(raw), 128)
+
+    def test_trigger(self):
+        axis = calibrate_axis([0, 1, 0], [0, 80, 255], one_sided=True)
+
+        self.assertEqual((axis.low, axis.center, axis.high), (0, 0, 255))
+        self.assertEqual(axis.value(1), 0)
+
+
+class TestConditioning(unittest.IsolatedAsyncioTestCase):
+    def event(self, code, value):
+        return InputEvent(0, 0, ecodes.EV_ABS, code, value)
+
+    def test_raw_until_calibrated(self):
+        state = ControllerState()
+
+        state.update_event(self.event(ecodes.ABS_RY, 131))
+        self.assertEqual(state.right_stick_y, 131)
+
+        state.calibrate(Calibration())
+        state.update_event(self.event(ecodes.ABS_RY, 131))
+        self.assertEqual(state.right_stick_y, 128)
+
+        state.calibrate(None)
+        state.update_event(self.event(ecodes.ABS_RY, 131))
+        self.assertEqual(state.right_stick_y, 131)
+
+    def test_uses_axis_table(self):
+        calibration = Calibration({"l2_analog": AxisCalibration(10, 10, 200)})
+        state = ControllerState()
+        state.calibrate(calibration)
+
+        state.update_event(self.event(ecodes.ABS_Z, 105))
+
+        self.assertEqual(state.l2_analog, calibration.axes["l2_analog"].value(105))
+
+    async def test_drift_not_published(self):
+        state = ControllerState()
+        state.calibrate(Calibration())
+        updates = state.subscribe()
+        await updates.__anext__()
+
+        for value in (127, 130, 126, 129):
+            state.update_event(self.event(ecodes.ABS_X, value))
+            state.update_event(InputEvent(0, 0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+        self.assertEqual(len(updates._queue), 0)
+        updates.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from robot.controller import Controller, ControllerBattery
+from robot.input_log import InputReplay
+from robot.scheduler import Scheduler
+from robot.uevent import UeventMonitor
+
+NAME = "sony_controller_battery_a4:ae:12:34:56:78"
+
+
+def battery_event(name=NAME, **properties):
+    event = {
+        "ACTION": "change",
+        "SUBSYSTEM": "power_supply",
+        "DEVPATH": f"/devices/virtual/misc/uhid/0005:054C:09CC.0001/power_supply/{name}",
+        "POWER_SUPPLY_NAME": name,
+    }
+    event.update({f"POWER_SUPPLY_{key}": value for key, value in properties.items()})
+    return event
+
+
+class TestControllerBattery(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.dir.name)
+
+        self.supply = self.base_path.joinpath("device/device/power_supply", NAME)
+        self.supply.mkdir(parents=True)
+        self.supply.joinpath("capacity").write_text("55\n")
+        self.supply.joinpath("status").write_text("Discharging\n")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_read_on_open(self):
+        battery = ControllerBattery(self.base_path)
+
+        self.assertEqual(battery.name, NAME)
+        self.assertEqual(battery.capacity, 55)
+        self.assertEqual(battery.status, "Discharging")
+        self.assertFalse(battery.charging)
+
+    def test_path_resolved_once(self):
+        battery = ControllerBattery(self.base_path)
+        self.supply.joinpath("capacity").write_text("40\n")
+
+        with patch.object(Path, "glob") as glob:
+            battery.read()
+
+        glob.assert_not_called()
+        self.assertEqual(battery.capacity, 40)
+
+    def test_uevents(self):
+        battery = ControllerBattery(self.base_path)
+        uevents = UeventMonitor()
+        battery.attach(uevents)
+
+        for wanted, callback in uevents._subscribers:
+            self.assertEqual(wanted, "power_supply")
+            callback(battery_event(CAPACITY="100", STATUS="Charging"))
+
+        self.assertEqual(battery.capacity, 100)
+        self.assertTrue(battery.charging)
+
+        battery.detach()
+        self.assertEqual(uevents._subscribers, [])
+
+    def test_other_supplies_ignored(self):
+        battery = ControllerBattery(self.base_path)
+
+        battery._on_uevent(battery_event(name="BAT0", CAPACITY="3", STATUS="Charging"))
+
+        self.assertEqual(battery.capacity, 55)
+        self.assertEqual(battery.status, "Discharging")
+
+    @patch("builtins.print")
+    def test_missing(self, mock_print):
+        battery = ControllerBattery(self.base_path.joinpath("missing"))
+
+        self.assertIsNone(battery.name)
+        self.assertEqual(battery.capacity, 0)
+
+        battery.read()
+        battery._on_uevent(battery_event(CAPACITY="100"))
+        self.assertEqual(battery.capacity, 0)
+
+
+class TestControllerPolling(unittest.IsolatedAsyncioTestCase):
+    def make_controller(self, uevents_running):
+        robot = MagicMock()
+        robot.uevents.running = uevents_running
+        robot.scheduler = Scheduler()
+
+        controller = Controller(robot, InputReplay([]))
+        controller.power = MagicMock()
+        return controller
+
+    async def test_attaches_to_uevents(self):
+        controller = self.make_controller(True)
+
+        await controller.polling()
+
+        controller.power.attach.assert_called_once_with(controller.robot.uevents)
+        controller.power.read.assert_not_called()
+
+    async def test_polls_without_uevents(self):
+        controller = self.make_controller(False)
+        sleeps = []
+
+        async def sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) > 2:
+                raise Exception("done")
+
+        with patch("robot.scheduler.asyncio.sleep", sleep), patch("builtins.print"):
+            await controller.polling()
+
+        self.assertEqual(controller.power.read.call_count, 2)
+        self.assertEqual(controller.robot.scheduler.loops["battery"].period, ControllerBattery.POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from evdev import ecodes
+
+from robot.controller import Controller, _LONG_BITS, _has_capability
+
+
+def bitmap(*codes) -> str:
+    """Capability bitmap as the kernel prints it: longs, most significant first, leading zero words dropped."""
+    bits = 0
+    for code in codes:
+        bits |= 1 << code
+
+    words = []
+    while bits:
+        words.append(f"{bits & ((1 << _LONG_BITS) - 1):x}")
+        bits >>= _LONG_BITS
+
+    return " ".join(reversed(words)) or "0"
+
+
+GAMEPAD_KEYS = (ecodes.BTN_SOUTH, ecodes.BTN_EAST, ecodes.BTN_NORTH, ecodes.BTN_WEST, ecodes.BTN_TL, ecodes.BTN_THUMBR)
+GAMEPAD_ABS = (ecodes.ABS_X, ecodes.ABS_Y, ecodes.ABS_Z, ecodes.ABS_RX, ecodes.ABS_RY, ecodes.ABS_RZ, ecodes.ABS_HAT0X)
+
+
+class TestControllerDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.sysfs = Path(self.dir.name)
+
+        self.add_node("event0", "gpio-keys", keys=(ecodes.KEY_POWER,))
+        self.add_node("event2", "Sony Interactive Entertainment Wireless Controller Touchpad",
+                      keys=(ecodes.BTN_LEFT, ecodes.BTN_TOUCH), abs=(ecodes.ABS_X, ecodes.ABS_MT_SLOT))
+        self.add_node("event3", "Sony Interactive Entertainment Wireless Controller Motion Sensors",
+                      abs=(ecodes.ABS_X, ecodes.ABS_RX))
+        self.add_node("event11", "Sony Interactive Entertainment Wireless Controller",
+                      keys=GAMEPAD_KEYS, abs=GAMEPAD_ABS)
+        self.add_node("event12", "Wireless Controller Headset Jack", keys=(ecodes.KEY_PLAYPAUSE,))
+
+        patcher = patch.object(Controller, "SYSFS_INPUT", self.sysfs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+
+        print_patcher = patch("builtins.print")
+        print_patcher.start()
+        self.addCleanup(print_patcher.stop)
+
+    def add_node(self, event, name, keys=(), abs=()):
+        device = self.sysfs.joinpath(event, "device")
+        device.joinpath("capabilities").mkdir(parents=True)
+        device.joinpath("name").write_text(name + "\n")
+        device.joinpath("capabilities/key").write_text(bitmap(*keys) + "\n")
+        device.joinpath("capabilities/abs").write_text(bitmap(*abs) + "\n")
+
+    def make_controller(self):
+        with patch("robot.controller.InputDevice") as input_device:
+            input_device.return_value.capabilities.return_value = {}
+            controller = Controller(MagicMock())
+
+        return controller, input_device
+
+    def test_opens_only_the_gamepad(self):
+        controller, input_device = self.make_controller()
+
+        input_device.assert_called_once_with("/dev/input/event11")
+        self.assertEqual(controller.node, self.sysfs.joinpath("event11"))
+
+    def test_led_and_battery_paths_from_node(self):
+        leds = self.sysfs.joinpath("event11/device/device/leds")
+        for channel in ("red", "green", "blue"):
+            leds.joinpath(f"0005:054C:09CC.0001:{channel}").mkdir(parents=True)
+            leds.joinpath(f"0005:054C:09CC.0001:{channel}/brightness").write_text("0")
+
+        supply = self.sysfs.joinpath("event11/device/device/power_supply/sony_controller_battery_a4:ae:12:34:56:78")
+        supply.mkdir(parents=True)
+        supply.joinpath("capacity").write_text("75\n")
+
+        controller, _ = self.make_controller()
+
+        self.assertTrue(controller.led.available)
+        self.assertEqual(controller.battery, 75)
+        controller.led.close()
+
+    def test_nothing_matches(self):
+        self.sysfs.joinpath("event11/device/name").write_text("USB Keyboard\n")
+
+        controller, input_device = self.make_controller()
+
+        input_device.assert_not_called()
+        self.assertIsNone(controller.dev)
+        self.assertIsNone(controller.node)
+
+    def test_cached_node_checked_first(self):
+        controller, _ = self.make_controller()
+
+        with patch.object(Controller, "_is_controller", wraps=Controller._is_controller) as is_controller:
+            self.assertEqual(controller._find_controller_node(), self.sysfs.joinpath("event11"))
+
+        is_controller.assert_called_once_with(self.sysfs.joinpath("event11"))
+
+    def test_rescans_when_node_moves(self):
+        controller, _ = self.make_controller()
+
+        # reconnected under a different event number
+        self.sysfs.joinpath("event11/device/name").write_text("gpio-keys\n")
+        self.add_node("event4", "Wireless Controller", keys=GAMEPAD_KEYS, abs=GAMEPAD_ABS)
+
+        self.assertEqual(controller._find_controller_node(), self.sysfs.joinpath("event4"))
+        self.assertEqual(controller.node, self.sysfs.joinpath("event4"))
+
+    def test_has_capability(self):
+        path = self.sysfs.joinpath("caps")
+
+        path.write_text(bitmap(ecodes.BTN_SOUTH, ecodes.KEY_A))
+        self.assertTrue(_has_capability(path, ecodes.BTN_SOUTH))
+        self.assertTrue(_has_capability(path, ecodes.KEY_A))
+        self.assertFalse(_has_capability(path, ecodes.BTN_EAST))
+
+        path.write_text("0\n")
+        self.assertFalse(_has_capability(path, ecodes.BTN_SOUTH))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import time
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from evdev import AbsInfo, InputEvent, ecodes
+
+from robot.calibration import Calibration
+from robot.controller import Controller
+
+
+class FakeDevice:
+    """Input device that yields ``events`` and then disconnects, ends like a replay, or with ``hold`` stays connected."""
+
+    def __init__(self, events, disconnect=True, hold=False) -> None:
+        self.events = events
+        self.disconnect = disconnect
+        self.hold = hold
+        self.closed = False
+        self.drained = asyncio.Event()
+
+    def capabilities(self, absinfo=True):
+        return {ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(128, 0, 255, 0, 0, 0))]}
+
+    async def async_read_loop(self):
+        for event in self.events:
+            yield event
+            await asyncio.sleep(0)
+
+        self.drained.set()
+        if self.hold:
+            await asyncio.Event().wait()
+
+        if self.disconnect:
+            raise OSError(19, "No such device")
+
+    def close(self):
+        self.closed = True
+
+
+def report(type, code, value):
+    return [InputEvent(0, 0, type, code, value), InputEvent(0, 0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0)]
+
+
+def make_robot(enabled=False, uevents_running=False):
+    robot = MagicMock()
+    robot.enabled = enabled
+    robot.set_enabled = AsyncMock()
+    robot.uevents.running = uevents_running
+    robot.uevents.wait_for = AsyncMock(return_value=None)
+    return robot
+
+
+@patch("builtins.print")
+class TestControllerHotplug(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # empty /sys/class/input
+        self.dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(Controller, "SYSFS_INPUT", Path(self.dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+
+    async def test_missing_at_boot(self, mock_print):
+        with patch("robot.controller.InputDevice") as input_device:
+            controller = Controller(make_robot())
+
+        self.assertIsNone(controller.dev)
+        self.assertFalse(controller.is_ready.is_set())
+        input_device.assert_not_called()
+
+    async def run_until_drained(self, controller: Controller, device: FakeDevice, timeout: float = 1.0):
+        """Run the controller until it has read all of ``device``'s events, then stop it."""
+        task = asyncio.create_task(controller.events())
+        try:
+            await asyncio.wait_for(device.drained.wait(), timeout)
+        finally:
+            task.cancel()
+            await task
+
+    async def test_bound_once_it_appears(self, mock_print):
+        second = FakeDevice(report(ecodes.EV_KEY, ecodes.BTN_SOUTH, 1), hold=True)
+
+        controller = Controller(make_robot())
+
+        controller.RESCAN_INTERVAL = 0.01
+        with patch.object(controller, "_find_controller_dev", side_effect=[None, None, second]):
+            await self.run_until_drained(controller, second)
+
+        self.assertIs(controller.dev, second)
+        self.assertEqual(controller.cross, 1)
+        self.assertEqual(controller.reconnects, 1)
+
+    async def test_rebind_after_disconnect(self, mock_print):
+        robot = make_robot(enabled=True)
+        first = FakeDevice(report(ecodes.EV_ABS, ecodes.ABS_Y, 3))
+        second = FakeDevice(report(ecodes.EV_ABS, ecodes.ABS_RX, 40), hold=True)
+
+        controller = Controller(robot, first)
+        controller.led = MagicMock()
+        controller.power = MagicMock()
+
+        states = []
+        updates = controller.subscribe()
+
+        async def consume():
+            async for state in updates:
+                states.append(state.left_stick_y)
+
+        consumer = asyncio.create_task(consume())
+
+        started = time.monotonic()
+        with patch.object(controller, "_find_controller_dev", side_effect=[None, second]):
+            await self.run_until_drained(controller, second, 2)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+
+        await asyncio.sleep(0)
+        consumer.cancel()
+
+        # the stick reading from before the drop does not survive it
+        self.assertEqual(states, [128, 3, 128, 128])
+        self.assertEqual(controller.right_stick_x, Calibration().axes["right_stick_x"].value(40))
+
+        self.assertTrue(first.closed)
+        robot.set_enabled.assert_awaited_once_with(False)
+        controller.led.close.assert_called_once()
+        controller.led.open.assert_called_once()
+        controller.power.open.assert_called_once()
+        self.assertTrue(controller.is_ready.is_set())
+
+    async def test_drop_during_rebind(self, mock_print):
+        robot = make_robot(enabled=True)
+        first = FakeDevice(report(ecodes.EV_ABS, ecodes.ABS_Y, 3))
+        second = FakeDevice([])
+        second.capabilities = MagicMock(side_effect=OSError(19, "No such device"))
+        third = FakeDevice(report(ecodes.EV_KEY, ecodes.BTN_SOUTH, 1), hold=True)
+
+        controller = Controller(robot, first)
+        controller.led = MagicMock()
+        controller.power = MagicMock()
+
+        with patch.object(controller, "_find_controller_dev", side_effect=[second, third]):
+            await self.run_until_drained(controller, third)
+
+        # the half-bound device is let go of, and supervision carries on to the next one
+        self.assertTrue(second.closed)
+        self.assertIs(controller.dev, third)
+        self.assertEqual(controller.cross, 1)
+        self.assertEqual(controller.reconnects, 2)
+        self.assertTrue(controller.is_ready.is_set())
+
+    async def test_disabled_robot_left_alone(self, mock_print):
+        robot = make_robot(enabled=False)
+        second = FakeDevice([], disconnect=False)
+
+        controller = Controller(robot, FakeDevice([]))
+        with patch.object(controller, "_find_controller_dev", return_value=second):
+            await asyncio.wait_for(controller.events(), 1)
+
+        robot.set_enabled.assert_not_awaited()
+
+    async def test_waits_on_input_uevents(self, mock_print):
+        robot = make_robot(uevents_running=True)
+        second = FakeDevice([], disconnect=False)
+
+        controller = Controller(robot, FakeDevice([]))
+        with patch.object(controller, "_find_controller_dev", side_effect=[None, second]):
+            await asyncio.wait_for(controller.events(), 1)
+
+        robot.uevents.wait_for.assert_awaited_once()
+        predicate, timeout, subsystem = robot.uevents.wait_for.await_args.args
+        self.assertEqual(subsystem, "input")
+        self.assertEqual(timeout, Controller.RESCAN_INTERVAL)
+        self.assertTrue(predicate({"ACTION": "add", "DEVNAME": "input/event7"}))
+        self.assertFalse(predicate({"ACTION": "remove", "DEVNAME": "input/event7"}))
+
+    async def test_inaccessible_devices_skipped(self, mock_print):
+        with patch.object(Controller, "_find_controller_node", return_value=Path("/sys/class/input/event3")), \
+                patch("robot.controller.InputDevice", side_effect=PermissionError(13, "Permission denied")):
+            controller = Controller(make_robot())
+
+        self.assertIsNone(controller.dev)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from robot.controller import ControllerLED, LEDAnimation
+from robot.scheduler import Rate
+
+
+def make_leds(base_path: Path, channels=("red", "green", "blue")):
+    for channel in channels:
+        path = base_path.joinpath(f"0005:054C:09CC.0001:{channel}")
+        path.mkdir()
+        path.joinpath("brightness").write_text("0")
+
+
+class TestControllerLED(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.dir.name)
+        make_leds(self.base_path)
+
+        self.led = ControllerLED(self.base_path)
+
+    def tearDown(self):
+        self.led.close()
+        self.dir.cleanup()
+
+    def brightness(self, channel):
+        return self.base_path.joinpath(f"0005:054C:09CC.0001:{channel}/brightness").read_text()
+
+    def test_write(self):
+        self.led.write((50, 0, 7))
+
+        self.assertEqual([self.brightness(c) for c in ("red", "green", "blue")], ["50", "0", "7"])
+
+    def test_files_kept_open(self):
+        fds = list(self.led.fds)
+
+        with patch("os.open") as mock_open:
+            self.led.write((1, 2, 3))
+            self.led.write((4, 5, 6))
+
+        mock_open.assert_not_called()
+        self.assertEqual(self.led.fds, fds)
+
+    def test_only_changed_channels_written(self):
+        self.led.write((50, 0, 0))
+
+        with patch("os.pwrite") as mock_pwrite:
+            self.led.write((50, 0, 0))
+            mock_pwrite.assert_not_called()
+
+            self.led.write((0, 0, 0))
+            mock_pwrite.assert_called_once_with(self.led.fds[0], b"0", 0)
+
+    def test_one_fd_per_channel(self):
+        # a second controller's LEDs match the same channel names
+        second = self.base_path.joinpath("0005:054C:09CC.0002:red")
+        second.mkdir()
+        second.joinpath("brightness").write_text("0")
+
+        with patch("os.open", wraps=os.open) as mock_open:
+            self.led.open(self.base_path)
+
+        self.assertEqual(mock_open.call_count, 3)
+
+        self.led.write((9, 0, 0))
+        self.assertEqual(self.brightness("red"), "9")
+        self.assertEqual(second.joinpath("brightness").read_text(), "0")
+
+    @patch("builtins.print")
+    def test_write_failure_closes(self, mock_print):
+        with patch("os.pwrite", side_effect=OSError(19, "No such device")):
+            self.led.write((1, 1, 1))
+
+        self.assertFalse(self.led.available)
+
+        # further writes are dropped until reopened
+        self.led.write((2, 2, 2))
+
+        self.led.open(self.base_path)
+        self.led.write((3, 3, 3))
+        self.assertEqual(self.brightness("blue"), "3")
+
+    @patch("builtins.print")
+    def test_missing_leds(self, mock_print):
+        led = ControllerLED(self.base_path.joinpath("missing"))
+
+        self.assertFalse(led.available)
+        led.write((1, 2, 3))
+
+        mock_print.assert_called_once_with("Could not find LEDs")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLEDAnimation(unittest.IsolatedAsyncioTestCase):
+    async def test_pattern_steps(self):
+        clock = FakeClock()
+        rate = Rate(10, clock=clock)
+        written = []
+
+        class Recorder:
+            def write(self, color):
+                written.append((clock.now, color))
+
+        async def sleep(delay):
+            clock.now += delay
+            if len(written) >= 5:
+                raise StopAsyncIteration
+
+        animation = LEDAnimation(Recorder(), rate)
+        animation.play([((0, 0, 0), 0.1), ((0, 50, 0), 1.9)])
+
+        with patch("robot.scheduler.asyncio.sleep", sleep):
+            with self.assertRaises(StopAsyncIteration):
+                await animation.run()
+
+        self.assertEqual([color for _, color in written],
+                         [(0, 0, 0), (0, 50, 0), (0, 0, 0), (0, 50, 0), (0, 0, 0)])
+        self.assertEqual([round(t, 6) for t, _ in written], [0.0, 0.1, 2.0, 2.1, 4.0])
+
+    async def test_play_restarts_pattern(self):
+        animation = LEDAnimation(None, None)
+        animation.play([((0, 0, 0), 0.1), ((0, 50, 0), 1.9)])
+        animation._step = 1
+
+        animation.play([((50, 0, 0), 0.4)])
+
+        self.assertEqual(animation._step, 0)
+        self.assertEqual(animation.pattern, (((50, 0, 0), 0.4),))
+
+
+if __name__ == "__main__":
+    unittest.main()
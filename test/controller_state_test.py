@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from evdev import InputEvent, ecodes
+
+from robot.controller import ControllerState
+
+
+def event(type, code, value):
+    return InputEvent(0, 0, type, code, value)
+
+
+class TestControllerState(unittest.TestCase):
+    def setUp(self):
+        self.state = ControllerState()
+
+    def test_defaults(self):
+        self.assertEqual(self.state.left_stick_x, 128)
+        self.assertEqual(self.state.right_stick_y, 128)
+        self.assertEqual(self.state.cross, 0)
+        self.assertEqual(self.state.r2_analog, 0)
+
+    def test_every_mapped_event_sets_its_field(self):
+        for (type, code), name in ControllerState.EVENTS.items():
+            with self.subTest(name=name):
+                self.state.update_event(event(type, code, 1))
+                self.assertEqual(getattr(self.state, name), 1)
+
+                self.state.update_event(event(type, code, 0))
+                self.assertEqual(getattr(self.state, name), 0)
+
+    def test_analog_values(self):
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_RY, 255))
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_Z, 17))
+
+        self.assertEqual(self.state.right_stick_y, 255)
+        self.assertEqual(self.state.l2_analog, 17)
+
+    def test_hat_axes(self):
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_HAT0X, -1))
+        self.assertEqual((self.state.dpad_left, self.state.dpad_right), (1, 0))
+
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_HAT0X, 1))
+        self.assertEqual((self.state.dpad_left, self.state.dpad_right), (0, 1))
+
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_HAT0Y, -1))
+        self.assertEqual((self.state.dpad_up, self.state.dpad_down), (1, 0))
+
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_HAT0Y, 0))
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_HAT0X, 0))
+        self.assertEqual((self.state.dpad_up, self.state.dpad_down, self.state.dpad_left, self.state.dpad_right),
+                         (0, 0, 0, 0))
+
+    def test_sync_events_ignored(self):
+        before = self.state.snapshot()
+
+        self.state.update_event(event(ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+        self.state.update_event(event(ecodes.EV_MSC, ecodes.MSC_SCAN, 5))
+
+        self.assertEqual(self.state.snapshot(), before)
+
+    @patch("builtins.print")
+    def test_unhandled_events_reported(self, mock_print):
+        self.state.update_event(event(ecodes.EV_KEY, ecodes.BTN_MODE, 1))
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_MT_SLOT, 1))
+
+        self.assertEqual(mock_print.call_count, 2)
+        self.assertIn("UNHANDLED EV_KEY", mock_print.call_args_list[0].args[0])
+        self.assertIn("UNHANDLED EV_ABS", mock_print.call_args_list[1].args[0])
+
+    def test_snapshot_is_a_copy(self):
+        snapshot = self.state.snapshot()
+        self.state.update_event(event(ecodes.EV_KEY, ecodes.BTN_SOUTH, 1))
+
+        self.assertEqual(snapshot[ControllerState.FIELDS.index("cross")], 0)
+        self.assertEqual(self.state.snapshot()[ControllerState.FIELDS.index("cross")], 1)
+
+    def test_fields_are_writable(self):
+        self.state.square = 1
+        self.state.left_stick_y = 3
+
+        self.assertEqual(self.state.square, 1)
+        self.assertEqual(self.state.snapshot()[ControllerState.FIELDS.index("left_stick_y")], 3)
+
+
+class TestControllerSubscription(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.state = ControllerState()
+
+    def report(self, *events):
+        for type, code, value in events:
+            self.state.update_event(event(type, code, value))
+        self.state.update_event(event(ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    async def test_current_state_first(self):
+        self.state.update_event(event(ecodes.EV_ABS, ecodes.ABS_X, 40))
+
+        updates = self.state.subscribe()
+        snapshot = await asyncio.wait_for(anext(updates), 1)
+
+        self.assertEqual(snapshot.left_stick_x, 40)
+
+    async def test_published_on_report(self):
+        updates = self.state.subscribe()
+        await anext(updates)
+
+        self.report((ecodes.EV_KEY, ecodes.BTN_SOUTH, 1))
+        self.report((ecodes.EV_KEY, ecodes.BTN_SOUTH, 0))
+
+        press = await asyncio.wait_for(anext(updates), 1)
+        release = await asyncio.wait_for(anext(updates), 1)
+
+        # a tap shorter than any polling interval still shows up as a press and a release
+        self.assertEqual((press.cross, release.cross), (1, 0))
+        self.assertLessEqual(press.stamp, release.stamp)
+
+    async def test_nothing_published_without_changes(self):
+        updates = self.state.subscribe()
+        await anext(updates)
+
+        self.state.update_event(event(ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(anext(updates), 0.05)
+
+    async def test_published_from_another_thread(self):
+        updates = self.state.subscribe()
+        await anext(updates)
+
+        thread = threading.Thread(target=self.report, args=((ecodes.EV_ABS, ecodes.ABS_RY, 7),))
+        thread.start()
+
+        snapshot = await asyncio.wait_for(anext(updates), 1)
+        thread.join()
+
+        self.assertEqual(snapshot.right_stick_y, 7)
+
+    async def test_coalesce(self):
+        updates = self.state.subscribe(coalesce=0.02)
+
+        for value in range(5):
+            self.report((ecodes.EV_ABS, ecodes.ABS_Y, value))
+
+        snapshot = await asyncio.wait_for(anext(updates), 1)
+        self.assertEqual(snapshot.left_stick_y, 4)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(anext(updates), 0.05)
+
+    async def test_bounded_queue_keeps_newest(self):
+        updates = self.state.subscribe(maxlen=3)
+
+        for value in range(10):
+            self.report((ecodes.EV_ABS, ecodes.ABS_X, value))
+
+        values = [(await anext(updates)).left_stick_x for _ in range(3)]
+        self.assertEqual(values, [7, 8, 9])
+
+    async def test_close_ends_iteration(self):
+        updates = self.state.subscribe()
+        await anext(updates)
+
+        updates.close()
+
+        with self.assertRaises(StopAsyncIteration):
+            await asyncio.wait_for(anext(updates), 1)
+        self.assertEqual(self.state._subscriptions, [])
+
+    def test_stopped_loop_unsubscribes(self):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._subscribe())
+        finally:
+            loop.close()
+
+        self.assertEqual(len(self.state._subscriptions), 1)
+
+        self.report((ecodes.EV_KEY, ecodes.BTN_EAST, 1))
+
+        self.assertEqual(self.state._subscriptions, [])
+
+    async def _subscribe(self):
+        return self.state.subscribe()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,32 +1,40 @@
+import tempfile
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 from evdev import InputEvent, ecodes
-from controller import Controller, ControllerLED  # Assuming your file is named controller.py
+from robot.calibration import Calibration
+from robot.controller import Controller, ControllerLED
 
 
-class TestControllerLED(unittest.IsolatedAsyncioTestCase):
+class TestControllerLED(unittest.TestCase):
     def setUp(self):
-        self.base_path = MagicMock(spec=Path)
-        self.base_path.exists.return_value = True
-        self.base_path.glob.side_effect = lambda pattern: [self.base_path / "dummy"]
+        self.dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.dir.name)
+        for channel in ("red", "green", "blue"):
+            self.base_path.joinpath(f"0005:054C:09CC.0001:{channel}").mkdir()
+            self.base_path.joinpath(f"0005:054C:09CC.0001:{channel}/brightness").write_text("0")
 
         self.led = ControllerLED(self.base_path)
 
-    @patch("aiofiles.open", new_callable=AsyncMock)
-    async def test_set_color(self, mock_open):
-        await self.led.set_color((255, 128, 64))
-        
-        self.assertEqual(mock_open.call_count, 3)
-        mock_open.assert_any_call(self.led.red, mode="w")
-        mock_open.assert_any_call(self.led.green, mode="w")
-        mock_open.assert_any_call(self.led.blue, mode="w")
+    def tearDown(self):
+        self.led.close()
+        self.dir.cleanup()
+
+    @patch("os.pwrite")
+    def test_set_color(self, mock_pwrite):
+        self.led.write((255, 128, 64))
+
+        self.assertEqual(mock_pwrite.call_count, 3)
+        mock_pwrite.assert_any_call(self.led.fds[0], b"255", 0)
+        mock_pwrite.assert_any_call(self.led.fds[1], b"128", 0)
+        mock_pwrite.assert_any_call(self.led.fds[2], b"64", 0)
 
 
 class TestController(unittest.TestCase):
-    @patch("controller.list_devices", return_value=["/dev/input/event0"])
-    @patch("controller.InputDevice")
-    def setUp(self, mock_input_device, mock_list_devices):
+    @patch("robot.controller.Controller._find_controller_node", return_value=Path("/sys/class/input/event0"))
+    @patch("robot.controller.InputDevice")
+    def setUp(self, mock_input_device, mock_find_node):
         self.mock_device = MagicMock()
         self.mock_device.name = "Sony PlayStation Controller"
         self.mock_device.path = "/dev/input/event0"
@@ -47,7 +55,7 @@ class TestController(unittest.TestCase):
     def test_update_event_abs(self):
         event = InputEvent(0, 0, ecodes.EV_ABS, ecodes.ABS_X, 150)
         self.controller.update_event(event)
-        self.assertEqual(self.controller.left_stick_x, 150)
+        self.assertEqual(self.controller.left_stick_x, Calibration().axes["left_stick_x"].value(150))
 
 
 if __name__ == "__main__":
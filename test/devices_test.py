@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from robot.devices import DeviceRegistry
+
+from .fakes import fake_port
+
+
+TEENSY = fake_port("/dev/ttyACM0", DeviceRegistry.MOTION, "1234")
+LIDAR = fake_port("/dev/ttyUSB0", DeviceRegistry.LIDAR, "0001", vid=0x10C4, pid=0xEA60)
+ESP = fake_port("/dev/ttyACM1", DeviceRegistry.FACE, "abcd", vid=0x303A, pid=0x1001)
+
+
+class FakeUevents:
+    def __init__(self):
+        self.callbacks = []
+
+    def subscribe(self, callback, subsystem=None):
+        self.callbacks.append(callback)
+        return lambda: self.callbacks.remove(callback)
+
+    def emit(self, **event):
+        for callback in list(self.callbacks):
+            callback(event)
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    @patch("robot.devices.list_ports.comports", return_value=[TEENSY, LIDAR, ESP])
+    def test_single_enumeration(self, comports):
+        devices = DeviceRegistry()
+
+        self.assertEqual(devices.require(DeviceRegistry.MOTION), "/dev/ttyACM0")
+        self.assertEqual(devices.require(DeviceRegistry.LIDAR), "/dev/ttyUSB0")
+        self.assertEqual(devices.require(DeviceRegistry.FACE), "/dev/ttyACM1")
+        comports.assert_called_once()
+
+    @patch("robot.devices.list_ports.comports", return_value=[])
+    def test_missing_device(self, comports):
+        with self.assertRaisesRegex(Exception, "Could not connect to motion controller"):
+            DeviceRegistry().require(DeviceRegistry.MOTION, name="motion controller")
+
+    def test_pinned_serial_number(self):
+        second = fake_port("/dev/ttyACM2", DeviceRegistry.MOTION, "5678")
+
+        with patch("robot.devices.list_ports.comports", return_value=[TEENSY, second]):
+            devices = DeviceRegistry()
+            devices.scan()
+
+        self.assertEqual(devices.require(DeviceRegistry.MOTION, "5678"), "/dev/ttyACM2")
+        self.assertEqual(devices.require(DeviceRegistry.MOTION, "1234"), "/dev/ttyACM0")
+        self.assertIsNone(devices.find(DeviceRegistry.MOTION, "9999"))
+
+    def test_scan_publishes_changes(self):
+        devices = DeviceRegistry()
+        events = []
+        devices.subscribe(lambda action, port: events.append((action, port.device)))
+
+        with patch("robot.devices.list_ports.comports", return_value=[TEENSY, LIDAR]):
+            devices.scan()
+
+        moved = fake_port("/dev/ttyACM3", DeviceRegistry.MOTION, "1234")
+        with patch("robot.devices.list_ports.comports", return_value=[moved]):
+            devices.scan()
+
+        self.assertEqual(events, [
+            ("add", "/dev/ttyACM0"),
+            ("add", "/dev/ttyUSB0"),
+            ("remove", "/dev/ttyUSB0"),
+            ("add", "/dev/ttyACM3"),
+        ])
+
+    def test_hotplug_without_rescan(self):
+        uevents = FakeUevents()
+
+        with patch("robot.devices.list_ports.comports", return_value=[TEENSY]) as comports:
+            devices = DeviceRegistry()
+            devices.scan()
+            devices.attach(uevents)
+
+            uevents.emit(ACTION="remove", SUBSYSTEM="tty", DEVNAME="ttyACM0")
+            self.assertIsNone(devices.find(DeviceRegistry.MOTION))
+
+            replugged = fake_port("/dev/ttyACM4", DeviceRegistry.MOTION, "1234")
+            with patch.object(DeviceRegistry, "_describe", return_value=replugged) as describe:
+                uevents.emit(ACTION="add", SUBSYSTEM="tty", DEVNAME="ttyACM4")
+
+            describe.assert_called_once_with("/dev/ttyACM4")
+            self.assertEqual(devices.require(DeviceRegistry.MOTION), "/dev/ttyACM4")
+            comports.assert_called_once()
+
+    def test_wait_for(self):
+        uevents = FakeUevents()
+        devices = DeviceRegistry()
+        devices.scans = 1
+        devices.attach(uevents)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            with patch.object(DeviceRegistry, "_describe", side_effect=[LIDAR, TEENSY]):
+                loop.call_later(0.01, lambda: uevents.emit(ACTION="add", DEVNAME="ttyUSB0"))
+                loop.call_later(0.02, lambda: uevents.emit(ACTION="add", DEVNAME="ttyACM0"))
+                return await devices.wait_for(DeviceRegistry.MOTION, 1.0)
+
+        self.assertIs(asyncio.run(main()), TEENSY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,12 @@
+from unittest.mock import MagicMock
+
+
+def fake_port(device, manufacturer, serial_number=None, vid=0x16C0, pid=0x0483):
+    """A serial.tools.list_ports entry, as DeviceRegistry sees it."""
+    port = MagicMock()
+    port.device = device
+    port.manufacturer = manufacturer
+    port.serial_number = serial_number
+    port.vid = vid
+    port.pid = pid
+    return port
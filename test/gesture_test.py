@@ -1,5 +1,48 @@
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 import asyncio
-from robot.sparky import Sparky
-from robot.ui import MainWindow
\ No newline at end of file
+from robot.scheduler import Scheduler
+
+
+def make_robot():
+    robot = MagicMock()
+    robot.scheduler = Scheduler()
+    robot.move = AsyncMock()
+    robot.isolated_modes = set()
+    return robot
+
+
+@patch('builtins.print')
+class TestGestureMode(unittest.IsolatedAsyncioTestCase):
+    async def test_engine_built_on_first_run(self, mock_print):
+        from robot.modes import gesture
+
+        with patch.object(gesture, 'GestureEngine') as mock_engine:
+            mode = await gesture.setup(make_robot())
+
+            # setting the mode up at boot neither loads the model nor opens the camera
+            mock_engine.assert_not_called()
+
+            task = await mode.launch()
+            await asyncio.sleep(0.05)
+            await mode.shutdown()
+
+            mock_engine.assert_called_once()
+            engine = mock_engine.return_value
+            engine.close.assert_called_once()
+
+            # the next run reuses it and only reopens the camera
+            await mode.launch()
+            await asyncio.sleep(0.05)
+            await mode.shutdown()
+
+        mock_engine.assert_called_once()
+        engine.open.assert_called_once()
+        self.assertEqual(engine.close.call_count, 2)
+        self.assertTrue(task.done())
+        self.assertFalse(any("GestureMode error" in str(c.args[0]) for c in mock_print.call_args_list))
+        mode.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import os
+import math
+import asyncio
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from evdev import AbsInfo, InputEvent, ecodes
+
+from robot.imu import ComplementaryFilter, MotionSensors, RingBuffer, find_motion_sensors
+
+
+class FakeSensors:
+    """Motion Sensors node reporting raw DS4 units."""
+
+    def __init__(self) -> None:
+        self.pending = []
+        self.closed = False
+        self.r, self.w = os.pipe()
+
+    @property
+    def fd(self):
+        return self.r
+
+    def capabilities(self, absinfo=True):
+        accel = AbsInfo(0, -32768, 32767, 4, 0, 8192)
+        gyro = AbsInfo(0, -32768, 32767, 16, 0, 1024)
+        return {ecodes.EV_ABS: [(ecodes.ABS_X, accel), (ecodes.ABS_Y, accel), (ecodes.ABS_Z, accel),
+                                (ecodes.ABS_RX, gyro), (ecodes.ABS_RY, gyro), (ecodes.ABS_RZ, gyro)]}
+
+    def report(self, stamp, accel=(0, 8192, 0), gyro=(0, 0, 0), sensor_time=None):
+        sec, usec = int(stamp), round((stamp % 1) * 1e6)
+        for code, value in zip(MotionSensors.ACCEL + MotionSensors.GYRO, accel + gyro):
+            self.pending.append(InputEvent(sec, usec, ecodes.EV_ABS, code, value))
+        if sensor_time is not None:
+            self.pending.append(InputEvent(sec, usec, ecodes.EV_MSC, ecodes.MSC_TIMESTAMP, sensor_time))
+        self.pending.append(InputEvent(sec, usec, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+    def read(self):
+        if not self.pending:
+            raise BlockingIOError()
+
+        events, self.pending = self.pending, []
+        return iter(events)
+
+    def close(self):
+        self.closed = True
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wraps(self):
+        buffer = RingBuffer(3, 2)
+
+        for i in range(5):
+            buffer.append(array("d", [i, i * 10]))
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.count, 5)
+        self.assertEqual([list(s) for s in buffer.latest(3)], [[2, 20], [3, 30], [4, 40]])
+        self.assertEqual([list(s) for s in buffer.latest(10)], [[2, 20], [3, 30], [4, 40]])
+
+    def test_latest_is_a_copy(self):
+        buffer = RingBuffer(2, 1)
+        buffer.append(array("d", [1]))
+
+        latest = buffer.latest()[0]
+        buffer.append(array("d", [2]))
+        buffer.append(array("d", [3]))
+
+        self.assertEqual(latest[0], 1)
+
+
+class TestComplementaryFilter(unittest.TestCase):
+    def test_starts_from_gravity(self):
+        filter = ComplementaryFilter()
+
+        pitch, roll = filter.update((0.5, math.sqrt(0.75), 0.0), (0, 0, 0), 0.0)
+
+        self.assertAlmostEqual(pitch, 0.0)
+        self.assertAlmostEqual(roll, 30.0)
+
+    def test_gyro_integrated(self):
+        filter = ComplementaryFilter(tau=1e9)  # gyro only
+        filter.update((0, 1, 0), (0, 0, 0), 0.0)
+
+        for _ in range(100):
+            pitch, roll = filter.update((0, 1, 0), (10.0, 0, -5.0), 0.01)
+
+        self.assertAlmostEqual(pitch, 10.0, places=3)
+        self.assertAlmostEqual(roll, -5.0, places=3)
+
+    def test_drift_cancelled(self):
+        filter = ComplementaryFilter(tau=0.5)
+        filter.update((0, 1, 0), (0, 0, 0), 0.0)
+
+        # a constant gyro bias settles at bias * tau instead of growing without bound
+        for _ in range(2500):
+            pitch, _ = filter.update((0, 1, 0), (2.0, 0, 0), 0.004)
+
+        self.assertAlmostEqual(pitch, 1.0, delta=0.05)
+
+
+class TestMotionSensors(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dev = FakeSensors()
+        self.imu = MotionSensors(self.dev, capacity=8)
+
+    def tearDown(self):
+        os.close(self.dev.r)
+        os.close(self.dev.w)
+
+    def test_reports_scaled_and_buffered(self):
+        self.dev.report(10.0, accel=(4096, 8192, -8192), gyro=(1024, 0, -2048))
+        self.imu._on_readable()
+
+        time, ax, ay, az, gx, gy, gz = self.imu.buffer.latest()[0]
+        self.assertEqual((time, ax, ay, az), (10.0, 0.5, 1.0, -1.0))
+        self.assertEqual((gx, gy, gz), (1.0, 0.0, -2.0))
+        self.assertEqual(self.imu.reports, 1)
+
+    def test_batch_drained(self):
+        for i in range(20):
+            self.dev.report(10 + i * 0.004)
+
+        self.imu._on_readable()
+
+        self.assertEqual(self.imu.reports, 20)
+        self.assertEqual(len(self.imu.buffer), 8)
+        self.assertAlmostEqual(self.imu.buffer.latest()[0][0], 10.076)
+
+    def test_sensor_clock_used_for_dt(self):
+        self.imu.filter = MagicMock()
+        self.imu.filter.update.return_value = (0.0, 0.0)
+
+        self.dev.report(10.0, sensor_time=2 ** 32 - 1000)
+        self.dev.report(10.1, sensor_time=3000)  # wrapped, 4 ms later by the sensor's clock
+        self.imu._on_readable()
+
+        dts = [c.args[2] for c in self.imu.filter.update.call_args_list]
+        self.assertEqual(dts[0], 0.0)
+        self.assertAlmostEqual(dts[1], 0.004)
+
+    def test_orientation(self):
+        # tilted sideways by 30 degrees
+        self.dev.report(10.0, accel=(4096, round(8192 * math.sqrt(0.75)), 0))
+        self.imu._on_readable()
+
+        pitch, roll = self.imu.orientation
+        self.assertAlmostEqual(pitch, 0.0)
+        self.assertAlmostEqual(roll, 30.0, places=2)
+
+    async def test_reader_on_loop(self):
+        self.imu.start(asyncio.get_running_loop())
+
+        self.dev.report(10.0)
+        os.write(self.dev.w, b"x")
+        for _ in range(10):
+            await asyncio.sleep(0)
+            if self.imu.reports:
+                break
+
+        self.assertEqual(self.imu.reports, 1)
+        self.imu.close()
+        self.assertFalse(self.imu.running)
+        self.assertTrue(self.dev.closed)
+
+    @patch("builtins.print")
+    def test_disconnect_closes(self, mock_print):
+        self.dev.read = MagicMock(side_effect=OSError(19, "No such device"))
+
+        self.imu._on_readable()
+
+        self.assertTrue(self.dev.closed)
+
+
+class TestFindMotionSensors(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.sysfs = Path(self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def add_node(self, event, name, hid):
+        hid_device = self.sysfs.joinpath("devices", hid)
+        hid_device.mkdir(parents=True, exist_ok=True)
+
+        input_device = self.sysfs.joinpath("devices", f"input-{event}")
+        input_device.mkdir()
+        input_device.joinpath("name").write_text(name + "\n")
+        input_device.joinpath("device").symlink_to(hid_device)
+
+        self.sysfs.joinpath(event).mkdir()
+        self.sysfs.joinpath(event, "device").symlink_to(input_device)
+        return self.sysfs.joinpath(event)
+
+    def test_prefers_sensors_of_the_controller(self):
+        self.add_node("event3", "Sony Interactive Entertainment Wireless Controller Motion Sensors", "hid-1")
+        gamepad = self.add_node("event6", "Sony Interactive Entertainment Wireless Controller", "hid-2")
+        self.add_node("event7", "Sony Interactive Entertainment Wireless Controller Motion Sensors", "hid-2")
+
+        self.assertEqual(find_motion_sensors(self.sysfs, gamepad), self.sysfs.joinpath("event7"))
+        self.assertEqual(find_motion_sensors(self.sysfs), self.sysfs.joinpath("event3"))
+
+    def test_none(self):
+        self.add_node("event0", "gpio-keys", "hid-1")
+
+        self.assertIsNone(find_motion_sensors(self.sysfs))
+
+
+class TestTiltMode(unittest.IsolatedAsyncioTestCase):
+    def test_axis(self):
+        from robot.modes.tilt import TiltMode
+
+        self.assertEqual(TiltMode.axis(0), 0)
+        self.assertEqual(TiltMode.axis(TiltMode.DEADZONE), 0)
+        self.assertEqual(TiltMode.axis(TiltMode.MAX_TILT), 127)
+        self.assertEqual(TiltMode.axis(-90), -127)
+        self.assertEqual(TiltMode.axis((TiltMode.DEADZONE + TiltMode.MAX_TILT) / 2), 64)
+
+    async def test_steers_from_orientation(self):
+        from robot.modes.tilt import TiltMode
+
+        robot = MagicMock()
+        robot.move = AsyncMock()
+        robot.controller.left_stick_x = robot.controller.left_stick_y = 128
+        robot.controller.r2_analog = 200
+
+        mode = TiltMode(robot)
+        mode.rate = MagicMock()
+        mode.rate.sleep = AsyncMock(side_effect=asyncio.CancelledError)
+        mode.imu = MagicMock(running=True, orientation=(TiltMode.MAX_TILT, -TiltMode.MAX_TILT))
+
+        with self.assertRaises(asyncio.CancelledError):
+            await mode.start()
+
+        args = robot.move.await_args.args
+        self.assertEqual(args[:5], (-127, -127, 0, 0, 200))
+        mode.imu.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from evdev import InputEvent, ecodes
+
+from robot.calibration import Calibration
+from robot.controller import Controller, ControllerState
+from robot.input_log import InputRecorder, InputReplay, read_log
+
+
+def events():
+    return [
+        InputEvent(100, 0, ecodes.EV_ABS, ecodes.ABS_X, 30),
+        InputEvent(100, 0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+        InputEvent(100, 50000, ecodes.EV_KEY, ecodes.BTN_SOUTH, 1),
+        InputEvent(100, 50000, ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+        InputEvent(100, 100000, ecodes.EV_ABS, ecodes.ABS_HAT0Y, -1),
+        InputEvent(100, 100000, ecodes.EV_SYN, ecodes.SYN_REPORT, 0),
+    ]
+
+
+def fields(event):
+    return (event.sec, event.usec, event.type, event.code, event.value)
+
+
+class TestInputLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "input.evlog")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        with InputRecorder(self.path) as recorder:
+            for event in events():
+                recorder.record(event)
+
+        self.assertEqual(recorder.count, 6)
+        self.assertEqual(os.path.getsize(self.path), len(InputRecorder.MAGIC) + 6 * InputRecorder.RECORD.size)
+        self.assertEqual([fields(e) for e in read_log(self.path)], [fields(e) for e in events()])
+
+    def test_truncated_record_dropped(self):
+        with InputRecorder(self.path) as recorder:
+            for event in events():
+                recorder.record(event)
+
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        self.assertEqual(len(list(read_log(self.path))), 6)
+
+    def test_not_a_log(self):
+        with open(self.path, "wb") as f:
+            f.write(b"something else entirely")
+
+        with self.assertRaises(ValueError):
+            list(read_log(self.path))
+
+    def test_record_state(self):
+        with InputRecorder(self.path) as recorder:
+            recorder.record_state([(ecodes.EV_ABS, ecodes.ABS_Y, 12)])
+
+        logged = list(read_log(self.path))
+        self.assertEqual([(e.type, e.code, e.value) for e in logged],
+                         [(ecodes.EV_ABS, ecodes.ABS_Y, 12), (ecodes.EV_SYN, ecodes.SYN_REPORT, 0)])
+        self.assertAlmostEqual(logged[0].sec + logged[0].usec / 1e6, time.time(), delta=5)
+
+
+class TestInputReplay(unittest.IsolatedAsyncioTestCase):
+    async def replay(self, speed):
+        replay = InputReplay(events(), speed)
+
+        started = time.monotonic()
+        replayed = [event async for event in replay.async_read_loop()]
+        return replayed, time.monotonic() - started
+
+    async def test_original_timing(self):
+        replayed, elapsed = await self.replay(1.0)
+
+        self.assertEqual([fields(e) for e in replayed], [fields(e) for e in events()])
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    async def test_accelerated(self):
+        replayed, elapsed = await self.replay(10.0)
+
+        self.assertEqual(len(replayed), 6)
+        self.assertGreaterEqual(elapsed, 0.009)
+        self.assertLess(elapsed, 0.09)
+
+    async def test_as_fast_as_possible(self):
+        replayed, elapsed = await self.replay(0)
+
+        self.assertEqual(len(replayed), 6)
+        self.assertLess(elapsed, 0.05)
+
+    async def replayed_states(self, controller: Controller) -> list:
+        """Every state the controller published while replaying, up to the reset at the end."""
+        updates = controller.subscribe()
+        await controller.events()
+        updates.close()
+
+        states = [update async for update in updates]
+        self.assertEqual(states[-1].state, ControllerState().state)
+        return states[:-1]
+
+    async def test_controller_from_replay(self):
+        controller = Controller(MagicMock(enabled=False), InputReplay(events(), 0))
+        last = (await self.replayed_states(controller))[-1]
+
+        self.assertEqual(last.left_stick_x, Calibration().axes["left_stick_x"].value(30))
+        self.assertEqual(last.cross, 1)
+        self.assertEqual((last.dpad_up, last.dpad_down), (1, 0))
+
+    async def test_controller_record_and_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.evlog")
+
+            controller = Controller(MagicMock(enabled=False), InputReplay(events(), 0))
+            controller.record(path)
+            recorded = await self.replayed_states(controller)
+            controller.stop()
+
+            replayed = await self.replayed_states(Controller(MagicMock(enabled=False), InputReplay(path, 0)))
+
+        self.assertEqual(replayed[-1].state, recorded[-1].state)
+
+    async def test_replay_end_lets_go(self):
+        robot = MagicMock(enabled=True)
+        robot.set_enabled = AsyncMock()
+
+        controller = Controller(robot, InputReplay(events(), 0))
+        await controller.events()
+
+        self.assertEqual(controller.snapshot(), ControllerState().snapshot())
+        robot.set_enabled.assert_awaited_once_with(False)
+
+
+if __name__ == "__main__":
+    unittest.main()
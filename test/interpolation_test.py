@@ -0,0 +1,71 @@
+import unittest
+
+from robot.interpolation import CriticallyDamped, JerkLimited, LinearRamp
+
+
+def step_response(filter, target, dt=0.01, steps=100):
+    return [filter.update(target, dt) for _ in range(steps)]
+
+
+class TestLinearRamp(unittest.TestCase):
+    def test_rate_limited(self):
+        values = step_response(LinearRamp(rate=500), 100, steps=30)
+
+        self.assertAlmostEqual(values[0], 5)
+        self.assertAlmostEqual(values[9], 50)
+        self.assertEqual(values[-1], 100)
+
+    def test_reverses(self):
+        ramp = LinearRamp(rate=1000)
+        step_response(ramp, 100)
+        values = step_response(ramp, -100, steps=10)
+
+        self.assertAlmostEqual(values[0], 90)
+        self.assertAlmostEqual(values[-1], 0)
+
+
+class TestCriticallyDamped(unittest.TestCase):
+    def test_no_overshoot(self):
+        filter = CriticallyDamped(omega=20)
+        values = step_response(filter, 100)
+
+        self.assertLessEqual(max(values), 100)
+        self.assertTrue(all(b >= a for a, b in zip(values, values[1:])))
+        self.assertTrue(filter.settled())
+
+    def test_stable_with_large_steps(self):
+        filter = CriticallyDamped(omega=50)
+        values = step_response(filter, -80, dt=0.5, steps=5)
+
+        self.assertGreaterEqual(min(values), -80)
+        self.assertAlmostEqual(values[-1], -80, places=3)
+
+
+class TestJerkLimited(unittest.TestCase):
+    def test_limits(self):
+        filter = JerkLimited(max_velocity=600, max_acceleration=3000, max_jerk=30000)
+        dt = 0.005
+
+        last_velocity = last_acceleration = 0.0
+        for _ in range(200):
+            filter.update(100, dt)
+            self.assertLessEqual(abs(filter.velocity), 600 + 1e-9)
+            self.assertLessEqual(abs(filter.acceleration), 3000 + 1e-9)
+            self.assertLessEqual(abs(filter.acceleration - last_acceleration), 30000 * dt + 1e-9)
+            last_velocity, last_acceleration = filter.velocity, filter.acceleration
+
+        self.assertTrue(filter.settled())
+        self.assertEqual(filter.value, 100)
+
+    def test_no_overshoot(self):
+        filter = JerkLimited(max_velocity=600, max_acceleration=3000, max_jerk=30000)
+        up = step_response(filter, 100)
+        down = step_response(filter, -50)
+
+        self.assertLessEqual(max(up), 100.5)
+        self.assertGreaterEqual(min(down), -50.5)
+        self.assertEqual(down[-1], -50)
+
+
+if __name__ == "__main__":
+    unittest.main()
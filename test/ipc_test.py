@@ -0,0 +1,102 @@
+import time
+import struct
+import unittest
+import multiprocessing
+from unittest.mock import patch
+
+from robot.ipc import CommandChannel, SeqlockSlot
+
+
+def write_pairs(name, owner_pid, count):
+    """Child process: keep writing commands whose values all equal their number."""
+    channel = CommandChannel(name, owner_pid)
+    for i in range(1, count + 1):
+        channel.send([i % 30000] * 14)
+        channel.beat()
+    channel.close()
+
+
+class TestSeqlockSlot(unittest.TestCase):
+    def test_round_trip(self):
+        record = struct.Struct("<Id")
+        buffer = memoryview(bytearray(SeqlockSlot.size_of(record)))
+        slot = SeqlockSlot(buffer, 0, record)
+
+        self.assertIsNone(slot.read())
+
+        slot.write(7, 1.5)
+        slot.write(8, 2.5)
+
+        self.assertEqual(slot.read(), (8, 2.5))
+
+    def test_write_in_progress_not_read(self):
+        record = struct.Struct("<I")
+        buffer = memoryview(bytearray(SeqlockSlot.size_of(record)))
+        slot = SeqlockSlot(buffer, 0, record)
+        slot.write(1)
+
+        # writer stopped halfway through the next write
+        SeqlockSlot.SEQ.pack_into(buffer, 0, 3)
+
+        self.assertIsNone(slot.read(retries=10))
+
+
+class TestCommandChannel(unittest.TestCase):
+    def setUp(self):
+        self.channel = CommandChannel()
+        self.addCleanup(self.channel.close)
+
+    def test_send_and_receive(self):
+        self.assertIsNone(self.channel.receive())
+        self.assertIsNone(self.channel.last_beat())
+
+        self.channel.send(range(14))
+        self.channel.beat()
+
+        number, stamp, values = self.channel.receive()
+        self.assertEqual((number, values), (1, tuple(range(14))))
+        self.assertAlmostEqual(stamp, time.monotonic(), delta=1.0)
+        self.assertAlmostEqual(self.channel.last_beat(), time.monotonic(), delta=1.0)
+
+    def test_attached_sees_writes(self):
+        other = CommandChannel(self.channel.name, self.channel.owner_pid)
+
+        self.channel.send([-128] + [1] * 13)
+
+        self.assertEqual(other.receive()[2], (-128,) + (1,) * 13)
+        other.close()
+
+    def test_owners_tracker_keeps_it(self):
+        # this process is the owner, its resource tracker's registration stays for close() to remove
+        with patch("robot.ipc.resource_tracker.unregister") as unregister:
+            CommandChannel(self.channel.name, self.channel.owner_pid).close()
+
+        unregister.assert_not_called()
+
+    def test_unrelated_tracker_lets_go(self):
+        with patch("robot.ipc.resource_tracker.unregister") as unregister:
+            other = CommandChannel(self.channel.name, self.channel.owner_pid + 1)
+            other.close()
+
+        unregister.assert_called_once_with(other.shm._name, "shared_memory")
+
+    def test_no_torn_reads_across_processes(self):
+        context = multiprocessing.get_context("spawn")
+        writer = context.Process(target=write_pairs, args=(self.channel.name, self.channel.owner_pid, 20000))
+        writer.start()
+
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            command = self.channel.receive()
+            if command is not None:
+                number, _, values = command
+                # every value was written together with its number
+                self.assertEqual(set(values), {number % 30000})
+                reads += 1
+
+        writer.join()
+        self.assertEqual(self.channel.receive()[0], 20000)
+
+
+if __name__ == "__main__":
+    unittest.main()
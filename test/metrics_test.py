@@ -0,0 +1,60 @@
+import unittest
+
+from robot.metrics import Histogram, RateMeter
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        hist = Histogram()
+        for ms in range(1, 101):
+            hist.record(ms / 1000)
+
+        self.assertEqual(hist.count, 100)
+        self.assertAlmostEqual(hist.mean, 0.0505)
+        self.assertAlmostEqual(hist.max, 0.1)
+        # resolved to the bucket edge, within one bucket of the real value
+        self.assertTrue(0.050 <= hist.percentile(50) < 0.050 * 10 ** (1 / 8))
+        self.assertTrue(0.099 <= hist.percentile(99) <= 0.1)
+
+    def test_out_of_range(self):
+        hist = Histogram(low=1e-3, high=1.0)
+        hist.record(1e-6)
+        hist.record(30.0)
+
+        self.assertEqual(hist.counts[0], 1)
+        self.assertEqual(hist.counts[-1], 1)
+        self.assertEqual(hist.percentile(100), 30.0)
+
+    def test_fixed_size(self):
+        hist = Histogram()
+        size = len(hist.counts)
+        for i in range(10000):
+            hist.record(i * 1e-4)
+
+        self.assertEqual(len(hist.counts), size)
+        self.assertEqual(sum(hist.counts), 10000)
+
+    def test_empty(self):
+        hist = Histogram()
+        self.assertEqual(hist.percentile(50), 0.0)
+        self.assertEqual(str(hist), "no samples")
+
+
+class TestRateMeter(unittest.TestCase):
+    def test_steady_rate(self):
+        meter = RateMeter(tau=1.0)
+        for i in range(1000):
+            meter.add(80, i * 0.01)
+
+        self.assertAlmostEqual(meter.rate(9.99), 8000, delta=100)
+        self.assertEqual(meter.total, 80000)
+
+    def test_decays_when_idle(self):
+        meter = RateMeter(tau=1.0)
+        meter.add(100, 0.0)
+
+        self.assertLess(meter.rate(5.0), meter.rate(0.0) / 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,82 +1,243 @@
+import os
+import time
+import asyncio
+import threading
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
-import asyncio
 
-from robot.mode import Mode
-from robot.sparky import Sparky
-
-class TestMode(unittest.TestCase):
-    @patch('robot.mode.asyncio.new_event_loop')
-    @patch('robot.mode.asyncio.set_event_loop')
-    @patch('robot.mode.asyncio.all_tasks')
-    def test_run(self, mock_all_tasks, mock_set_event_loop, mock_new_event_loop):
-        
-        # Creating mock Sparky
-        mock_robot = MagicMock() 
-        mock_mode = Mode(mock_robot)
-        mock_loop = MagicMock()
-        
-        # Mocking event loop creation and set_event_loop to use our mock loop
-        mock_new_event_loop.return_value = mock_loop
-        mock_set_event_loop.return_value = None
-        
-        # Run
-        mock_mode.run()
-
-        # Assert
-        mock_new_event_loop.assert_called_once()  # Ensure a new event loop is created
-        mock_set_event_loop.assert_called_once_with(mock_loop)  # Ensure set_event_loop was called with the mock loop
-        mock_mode.loop.run_forever.assert_called_once()  # Ensure the loop was run
-
-    @patch('robot.mode.asyncio.all_tasks')
-    @patch('robot.mode.asyncio.CancelledError')
-    @patch('robot.mode.Mode.start', new_callable=AsyncMock)
-    def test_stop(self, mock_start, mock_CancelledError, mock_all_tasks):
-        # Arrange
-        mock_robot = MagicMock()  # Mock Sparky robot
-        mock_mode = Mode(mock_robot)
-        mock_task = MagicMock()  # Create a mock task
-        mock_mode.loop = MagicMock()  # Mock the loop
-
-        # Mock the task to be returned by all_tasks
-        mock_all_tasks.return_value = [mock_task]
-
-        # Act
-        mock_mode.stop()
-
-        # Assert
-        mock_all_tasks.assert_called_once_with(mock_mode.loop)  # Ensure all tasks are retrieved from the loop
-        mock_task.cancel.assert_called_once()  # Ensure the cancel method was called on the task
-        mock_mode.loop.stop.assert_called_once()  # Ensure the event loop was stopped
-
-    @patch('robot.mode.Mode.start', new_callable=AsyncMock)
-    def test_start(self, mock_start):
-        # Arrange
-        mock_robot = MagicMock()  # Mock Sparky robot
-        mock_mode = Mode(mock_robot)
-
-        # Act
-        asyncio.run(mock_mode.start())
-
-        # Assert
-        mock_start.assert_awaited_once()  # Ensure the start method was awaited
-
-    @patch('robot.mode.asyncio.CancelledError')
-    def test_run_with_cancel(self, mock_CancelledError):
-        # Arrange
-        mock_robot = MagicMock()  # Mock Sparky robot
-        mock_mode = Mode(mock_robot)
-        mock_mode.start = AsyncMock()
-        
-        # Simulate the cancellation of the task
-        mock_mode.start.side_effect = asyncio.CancelledError
-
-        # Act & Assert
-        with self.assertRaises(asyncio.CancelledError):
-            asyncio.run(mock_mode._run())  # Test the _run() method which should handle cancellation
-            mock_mode.start.assert_awaited_once()  # Ensure start was called
-            mock_mode.start.side_effect = mock_CancelledError  # Handle cancellation properly
-        
+from robot.face import Face
+from robot.mode import Mode, ModeRegistry, ProcessMode
+from robot.scheduler import Scheduler
+
+
+def steady_worker(channel, stop, value):
+    """Child process: send ``value`` as rfb every 10 ms until stopped."""
+    while not stop.is_set():
+        channel.beat()
+        channel.send([value] + [0] * 13)
+        stop.wait(0.01)
+
+
+def stalling_worker(channel, stop):
+    """Child process: send one command, then hang without beating or checking ``stop``."""
+    channel.beat()
+    channel.send([5] + [0] * 13)
+    time.sleep(60)
+
+
+class SteadyMode(ProcessMode):
+    worker = staticmethod(steady_worker)
+
+    def worker_args(self):
+        return (42,)
+
+
+class StallingMode(ProcessMode):
+    HEARTBEAT_TIMEOUT = 0.2
+    JOIN_TIMEOUT = 0.2
+
+    worker = staticmethod(stalling_worker)
+
+
+def make_robot():
+    robot = MagicMock()
+    robot.move = AsyncMock()
+    robot.scheduler = Scheduler()
+    return robot
+
+
+class TestMode(unittest.IsolatedAsyncioTestCase):
+    async def test_launch(self):
+        mock_robot = MagicMock()
+        mode = Mode(mock_robot)
+        mode.start = AsyncMock()
+
+        task = await mode.launch()
+
+        # started on this loop and already past its first step
+        mode.start.assert_awaited_once()
+        self.assertIs(mode.task, task)
+        await task
+        self.assertFalse(mode.running)
+
+    @patch('builtins.print')
+    async def test_relaunch_on_fresh_deadline(self, mock_print):
+        mode = Mode(make_robot())
+
+        async def start():
+            while True:
+                await mode.rate.sleep()
+
+        mode.start = start
+
+        # the last run left its deadline behind, a second ago
+        mode.rate.deadline = mode.rate.clock() - 1.0
+
+        await mode.launch()
+        await asyncio.sleep(0.25)
+        await mode.shutdown()
+
+        self.assertEqual(mode.rate.stats.overruns, 0)
+        self.assertEqual(mode.rate.stats.skipped, 0)
+
+    @patch('builtins.print')
+    async def test_shutdown(self, mock_print):
+        mode = Mode(MagicMock())
+        started = asyncio.Event()
+
+        async def start():
+            started.set()
+            await asyncio.sleep(3600)
+
+        mode.start = start
+        await mode.launch()
+        await started.wait()
+        self.assertTrue(mode.running)
+
+        self.assertTrue(await mode.shutdown())
+        self.assertFalse(mode.running)
+
+    @patch('builtins.print')
+    async def test_shutdown_bounded(self, mock_print):
+        mode = Mode(MagicMock())
+        release = asyncio.Event()
+
+        async def start():
+            # ignores being cancelled until released
+            while not release.is_set():
+                try:
+                    await release.wait()
+                except asyncio.CancelledError:
+                    pass
+
+        mode.start = start
+        await mode.launch()
+
+        started = asyncio.get_running_loop().time()
+        self.assertFalse(await mode.shutdown(timeout=0.05))
+        self.assertLess(asyncio.get_running_loop().time() - started, 0.5)
+        self.assertTrue(mode.running)
+
+        release.set()
+        await mode.task
+
+    async def test_shutdown_before_launch(self):
+        self.assertTrue(await Mode(MagicMock()).shutdown())
+
+    @patch('builtins.print')
+    async def test_crash_ends_task(self, mock_print):
+        mode = Mode(MagicMock())
+        mode.start = AsyncMock(side_effect=RuntimeError("boom"))
+
+        task = await mode.launch()
+        await asyncio.wait({task}, timeout=1)
+
+        self.assertTrue(task.done())
+        self.assertIsNone(task.exception())
+
+    async def test_offload(self):
+        mode = Mode(MagicMock())
+        loop_thread = threading.get_ident()
+
+        thread = await mode.offload(threading.get_ident)
+
+        self.assertNotEqual(thread, loop_thread)
+        self.assertEqual(await mode.offload(threading.get_ident), thread)
+        mode.close()
+
+    async def test_offloaded_calls_in_order(self):
+        mode = Mode(MagicMock())
+        calls = []
+
+        def call(i):
+            time.sleep(0.01 * (3 - i))
+            calls.append(i)
+
+        # the first call is cancelled while running, the next still waits for it
+        first = asyncio.ensure_future(mode.offload(call, 0))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(mode.offload(call, 1), mode.offload(call, 2))
+
+        self.assertEqual(calls, [0, 1, 2])
+        mode.close()
+
+    async def test_offload_process(self):
+        mode = Mode(MagicMock())
+
+        self.assertNotEqual(await mode.offload(os.getpid, process=True), os.getpid())
+        mode.close()
+
+
+@patch('builtins.print')
+class TestProcessMode(unittest.IsolatedAsyncioTestCase):
+    async def wait_for_move(self, robot, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while not robot.move.await_count and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+
+    async def test_commands_forwarded(self, mock_print):
+        robot = make_robot()
+        mode = SteadyMode(robot)
+
+        await mode.launch()
+        await self.wait_for_move(robot)
+
+        self.assertEqual(robot.move.await_args.args, (42,) + (0,) * 13)
+        self.assertTrue(await mode.shutdown())
+        mode.close()
+
+    async def test_stalled_child_ends_mode(self, mock_print):
+        robot = make_robot()
+        mode = StallingMode(robot)
+
+        task = await mode.launch()
+        await self.wait_for_move(robot)
+        await asyncio.wait({task}, timeout=5)
+
+        # the one command went through, then the stall ended the mode and the child was killed
+        self.assertTrue(task.done())
+        self.assertEqual(robot.move.await_count, 1)
+        self.assertTrue(any("stalled" in str(c.args[0]) for c in mock_print.call_args_list))
+        mode.close()
+
+
+@patch('builtins.print')
+class TestModeRegistry(unittest.IsolatedAsyncioTestCase):
+    def test_discover(self, mock_print):
+        names = ModeRegistry.discover()
+
+        for name in ("manual", "pushup", "dance", "leg_testing", "leg_control", "gesture", "tilt"):
+            self.assertIn(name, names)
+
+    async def test_modes_set_up_once(self, mock_print):
+        registry = ModeRegistry(MagicMock())
+
+        with patch.object(ModeRegistry, 'discover', return_value=["manual", "dance"]):
+            await registry.load()
+
+        manual = await registry.get("manual")
+        self.assertIs(await registry.get("manual"), manual)
+        self.assertEqual((manual.MODE_ID, manual.FACE, manual.SOUND), (6, Face.OVAL, 0))
+        self.assertEqual((await registry.get("dance")).FACE, Face.HAPPY)
+
+    async def test_failed_setup_retried(self, mock_print):
+        registry = ModeRegistry(MagicMock())
+
+        import robot.modes.manual
+
+        with patch.object(robot.modes.manual.ManualMode, '__init__', side_effect=RuntimeError("no camera")):
+            self.assertIsNone(await registry.create("manual"))
+
+        self.assertNotIn("manual", registry)
+        self.assertIsNotNone(await registry.get("manual"))
+        self.assertIn("manual", registry)
+
+    async def test_unknown_mode(self, mock_print):
+        registry = ModeRegistry(MagicMock())
+
+        self.assertIsNone(await registry.get("moonwalk"))
+
 
 if __name__ == '__main__':
     unittest.main()
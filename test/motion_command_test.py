@@ -0,0 +1,298 @@
+import socket
+import asyncio
+import unittest
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from MotionProtocol import Message
+
+from robot.motion import Motion
+from robot.scheduler import Scheduler
+from robot.interpolation import LinearRamp
+from robot.uevent import UeventMonitor
+from robot.devices import DeviceRegistry
+
+from .fakes import fake_port
+
+
+class FakeTransport:
+    def __init__(self):
+        self.frames = []
+
+    def send(self, frame):
+        remote = Message.Message.GetRootAs(bytes(frame), 0).Remote()
+        self.frames.append((remote.Enabled(), remote.Rfb(), remote.Rlr()))
+
+
+def make_motion(filtered: bool = False) -> Motion:
+    robot = MagicMock()
+    robot.scheduler = Scheduler()
+    robot.enabled = True
+    robot.mode = None
+
+    # the default filters are left off unless asked for, so frames carry exactly what was moved
+    with patch.object(Motion, "_connect"), patch.object(Motion, "FILTER_OMEGA", Motion.FILTER_OMEGA if filtered else None):
+        motion = Motion(robot)
+
+    motion.transport = FakeTransport()
+    return motion
+
+
+class TestCommandLoop(unittest.IsolatedAsyncioTestCase):
+    async def run_loop(self, motion, body):
+        task = asyncio.create_task(motion._command_loop())
+        await asyncio.sleep(0)
+        try:
+            await body()
+        finally:
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+    async def test_periodic(self):
+        motion = make_motion()
+        motion.rate = motion.robot.scheduler.rate("motion", 100)
+
+        await self.run_loop(motion, lambda: asyncio.sleep(0.055))
+
+        # one frame per tick even though nothing changed
+        self.assertGreaterEqual(len(motion.transport.frames), 5)
+        self.assertEqual(set(motion.transport.frames), {(True, 0, 0)})
+
+    async def test_fresh_deadline_after_reconnect(self):
+        motion = make_motion()
+        motion.send_on_change = False
+
+        # the loop that ran before the reconnect left its deadline behind
+        motion.rate.deadline = motion.rate.clock() - 1.0
+
+        await self.run_loop(motion, lambda: asyncio.sleep(0.25))
+
+        self.assertEqual(motion.rate.stats.overruns, 0)
+        self.assertEqual(motion.rate.stats.skipped, 0)
+        # no burst of catch-up frames either
+        self.assertLessEqual(len(motion.transport.frames), 0.25 * Motion.RATE_HZ + 2)
+
+    async def test_send_on_change(self):
+        motion = make_motion()
+        motion.send_on_change = True
+        motion.keepalive = 10
+
+        async def body():
+            await asyncio.sleep(0.01)
+            motion.move(10, -5, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+            await asyncio.sleep(0.01)
+            motion.move(10, -5, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+            await asyncio.sleep(0.01)
+            motion.stop()
+            await asyncio.sleep(0.01)
+
+        await self.run_loop(motion, body)
+
+        self.assertEqual(motion.transport.frames, [(True, 0, 0), (True, 10, -5), (True, 0, 0)])
+
+    async def test_change_from_other_thread(self):
+        motion = make_motion()
+        motion.send_on_change = True
+        motion.keepalive = 10
+
+        async def body():
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, motion.move, 42, 0, 0, 0, 0, 0, False, False, False, False, False, False, False, False
+            )
+            await asyncio.sleep(0.01)
+
+        await self.run_loop(motion, body)
+
+        self.assertEqual(motion.transport.frames[-1], (True, 42, 0))
+
+    async def test_keepalive(self):
+        motion = make_motion()
+        motion.send_on_change = True
+        motion.keepalive = 0.02
+
+        await self.run_loop(motion, lambda: asyncio.sleep(0.07))
+
+        self.assertGreaterEqual(len(motion.transport.frames), 3)
+        self.assertLessEqual(len(motion.transport.frames), 5)
+
+    async def test_filtered_axis(self):
+        motion = make_motion()
+        motion.rate = motion.robot.scheduler.rate("motion", 100)
+        motion.set_filter("rfb", LinearRamp(rate=1000))
+
+        async def body():
+            await asyncio.sleep(0.005)
+            motion.move(100, -7, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+            await asyncio.sleep(0.2)
+
+        await self.run_loop(motion, body)
+
+        rfb = [frame[1] for frame in motion.transport.frames]
+        # ramps up over several ticks while the unfiltered axis steps
+        self.assertEqual(rfb[-1], 100)
+        self.assertGreater(len([v for v in rfb if 0 < v < 100]), 3)
+        self.assertEqual(motion.transport.frames[-1][2], -7)
+
+    async def test_filters_keep_ticking_on_change(self):
+        motion = make_motion()
+        motion.send_on_change = True
+        motion.keepalive = 10
+        motion.rate = motion.robot.scheduler.rate("motion", 100)
+        motion.set_filter("rfb", LinearRamp(rate=2000))
+
+        async def body():
+            await asyncio.sleep(0.01)
+            motion.move(100, 0, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+            await asyncio.sleep(0.15)
+
+        await self.run_loop(motion, body)
+
+        rfb = [frame[1] for frame in motion.transport.frames]
+        self.assertEqual(rfb[0], 0)
+        self.assertEqual(rfb[-1], 100)
+        self.assertEqual(rfb, sorted(rfb))
+        self.assertTrue(motion.filters_settled())
+
+    async def test_default_filters_interpolate(self):
+        motion = make_motion(filtered=True)
+        self.assertEqual(set(motion.filters), set(Motion.AXIS_LIMITS))
+
+        async def body():
+            # a mode at 10 Hz, stepping the stick once
+            await asyncio.sleep(0.01)
+            motion.move(100, 0, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+            await asyncio.sleep(0.1)
+
+        await self.run_loop(motion, body)
+
+        rfb = [frame[1] for frame in motion.transport.frames]
+        # several frames in between the mode's two values, rising smoothly
+        self.assertGreater(len([v for v in rfb if 0 < v < 100]), 2)
+        self.assertEqual(rfb, sorted(rfb))
+
+    def test_unknown_axis(self):
+        with self.assertRaises(ValueError):
+            make_motion().set_filter("dpad_u", LinearRamp(rate=1))
+
+    async def test_snapshot_never_torn(self):
+        motion = make_motion()
+        motion.rate = motion.robot.scheduler.rate("motion", 1000)
+        stop = threading.Event()
+
+        def publish():
+            i = 0
+            while not stop.is_set():
+                i = (i + 1) % 100
+                motion.move(i, i, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+
+        async def body():
+            thread = threading.Thread(target=publish)
+            thread.start()
+            try:
+                await asyncio.sleep(0.1)
+            finally:
+                stop.set()
+                thread.join()
+
+        await self.run_loop(motion, body)
+
+        self.assertGreater(len(motion.transport.frames), 10)
+        for _, rfb, rlr in motion.transport.frames:
+            self.assertEqual(rfb, rlr)
+
+    async def test_command_age(self):
+        motion = make_motion()
+        motion.rate = motion.robot.scheduler.rate("motion", 100)
+        motion.move(1, 0, 0, 0, 0, 0, False, False, False, False, False, False, False, False)
+
+        await self.run_loop(motion, lambda: asyncio.sleep(0.05))
+
+        self.assertGreater(motion.command_age.count, 3)
+        # the same command is resent, so it keeps ageing
+        self.assertGreater(motion.command_age.max, 0.03)
+
+
+class TestCommand(unittest.TestCase):
+    def test_move_publishes_snapshot(self):
+        motion = make_motion()
+        before = motion.command
+
+        motion.move(1, 2, 3, 4, 5, 6, True, False, True, False, True, False, True, False)
+        after = motion.command
+
+        self.assertIsNot(before, after)
+        self.assertEqual(after.seq, before.seq + 1)
+        self.assertGreaterEqual(after.stamp, before.stamp)
+        self.assertEqual(after[:14], (1, 2, 3, 4, 5, 6, True, False, True, False, True, False, True, False))
+        self.assertEqual((motion.rfb, motion.lt, motion.dpad_l), (1, 6, True))
+
+    def test_stop(self):
+        motion = make_motion()
+        motion.move(1, 2, 3, 4, 5, 6, True, True, True, True, True, True, True, True)
+        motion.stop()
+
+        self.assertEqual(motion.command[:14], (0,) * 6 + (False,) * 8)
+        self.assertEqual(motion.command.seq, 2)
+
+
+class TestReconnect(unittest.IsolatedAsyncioTestCase):
+    async def test_reconnect_on_hotplug(self):
+        motion = make_motion()
+        motion.RECONNECT_MIN = 5  # only a hotplug event can make this fast
+
+        kernel, sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(kernel.close)
+        motion.robot.uevents = UeventMonitor()
+        motion.robot.uevents.start(asyncio.get_running_loop(), sock=sock)
+        self.addCleanup(motion.robot.uevents.close)
+
+        motion.robot.devices = DeviceRegistry()
+        motion.robot.devices.scans = 1
+        motion.robot.devices.attach(motion.robot.uevents)
+
+        teensy = fake_port("/dev/ttyACM1", DeviceRegistry.MOTION)
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            motion._find_serial_dev()
+
+        motion._connect = connect
+        asyncio.get_running_loop().call_later(
+            0.02, kernel.send, b"add@/devices/x\0ACTION=add\0SUBSYSTEM=tty\0DEVNAME=ttyACM1\0"
+        )
+
+        with patch.object(DeviceRegistry, "_describe", return_value=teensy):
+            await asyncio.wait_for(motion.reconnect(), 1.0)
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(motion.reconnects, 1)
+        self.assertLess(motion.reconnect_time, 1.0)
+
+    async def test_backoff_without_hotplug(self):
+        motion = make_motion()
+        motion.robot.uevents = UeventMonitor()  # never started
+        motion.RECONNECT_MIN = 0.01
+        motion.RECONNECT_MAX = 0.04
+
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) < 5:
+                raise Exception("Could not connect to motion controller")
+
+        motion._connect = connect
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep, patch("builtins.print"):
+            await motion.reconnect()
+
+        # the delay doubles after every failed attempt, up to RECONNECT_MAX
+        self.assertEqual([c.args[0] for c in mock_sleep.await_args_list], [0.01, 0.02, 0.04, 0.04])
+        self.assertEqual(len(attempts), 5)
+        # without hotplug the registry has to be rescanned before each retry
+        self.assertEqual(motion.robot.devices.scan.call_count, 4)
+
+if __name__ == "__main__":
+    unittest.main()
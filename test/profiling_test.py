@@ -0,0 +1,116 @@
+import sys
+import tempfile
+import unittest
+import subprocess
+
+from pathlib import Path
+
+from robot.profiling import ImportProfiler
+
+
+class TestImportProfiler(unittest.TestCase):
+    def setUp(self):
+        # outer imports inner, which sleeps on import
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        path = Path(directory.name)
+        (path / "profiled_outer.py").write_text("import profiled_inner\n")
+        (path / "profiled_inner.py").write_text("import time\ntime.sleep(0.02)\nVALUE = 7\n")
+
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+        self.addCleanup(sys.modules.pop, "profiled_outer", None)
+        self.addCleanup(sys.modules.pop, "profiled_inner", None)
+
+        self.profiler = ImportProfiler.install()
+        self.addCleanup(self.profiler.uninstall)
+
+    def test_tree(self):
+        import profiled_outer
+
+        self.profiler.uninstall()
+
+        outer, = [node for node in self.profiler.roots if node.name == "profiled_outer"]
+        inner, = outer.children
+
+        self.assertEqual(inner.name, "profiled_inner")
+        self.assertGreaterEqual(inner.duration, 0.02)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+        self.assertLess(outer.own, 0.02)
+
+        report = self.profiler.report()
+        self.assertIn("  profiled_outer", report)
+        self.assertIn("    profiled_inner", report)
+
+    def test_modules_keep_their_loader(self):
+        import profiled_inner
+
+        self.assertEqual(profiled_inner.VALUE, 7)
+        self.assertNotIn("Timed", type(profiled_inner.__loader__).__name__)
+        self.assertIs(profiled_inner.__spec__.loader, profiled_inner.__loader__)
+
+    def test_uninstalled(self):
+        self.profiler.uninstall()
+
+        import profiled_outer
+
+        self.assertEqual(self.profiler.roots, [])
+
+
+class TestLazyImports(unittest.TestCase):
+    def imported_by(self, statement: str) -> set:
+        """Modules a fresh interpreter has loaded after running ``statement``."""
+        result = subprocess.run([sys.executable, "-c", f"{statement}\nimport sys\nprint(' '.join(sys.modules))"],
+                                capture_output=True, text=True, check=True, cwd=Path(__file__).parent.parent)
+        return set(result.stdout.split())
+
+    def test_package_import_is_light(self):
+        modules = self.imported_by("import robot.calibration")
+
+        for heavy in ("robot.sparky", "PyQt6", "pygame", "aioserial", "flatbuffers"):
+            self.assertNotIn(heavy, modules)
+
+    def test_sparky_defers_ui_and_sound(self):
+        modules = self.imported_by("import robot.sparky")
+
+        for heavy in ("robot.ui", "PyQt6", "qasync", "pygame", "odrive", "adafruit_rplidar"):
+            self.assertNotIn(heavy, modules)
+
+    def test_modes_load_without_vision(self):
+        # attempts are recorded too, so this holds whether or not OpenCV and pycoral are installed
+        statement = """
+import sys, asyncio
+from unittest.mock import MagicMock
+
+class Watch:
+    def find_spec(self, name, path, target=None):
+        if name.split(".")[0] in ("cv2", "pycoral"):
+            print("attempted:" + name)
+
+sys.meta_path.insert(0, Watch())
+
+from robot.mode import ModeRegistry
+
+robot = MagicMock()
+robot.isolated_modes = set()
+registry = ModeRegistry(robot)
+asyncio.run(registry.load())
+print("gesture-loaded" if "gesture" in registry else "gesture-missing")
+"""
+        modules = self.imported_by(statement)
+
+        self.assertIn("gesture-loaded", modules)
+        self.assertEqual([m for m in modules if m.startswith("attempted:")], [])
+        for heavy in ("cv2", "pycoral"):
+            self.assertNotIn(heavy, modules)
+
+    def test_package_attributes(self):
+        modules = self.imported_by("import robot\nrobot.Controller")
+
+        self.assertIn("robot.controller", modules)
+        self.assertNotIn("robot.sparky", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
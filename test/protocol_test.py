@@ -0,0 +1,129 @@
+import random
+import unittest
+
+import flatbuffers
+
+from MotionProtocol import Message, MessageType, ODriveStatus
+
+from robot.protocol import RemoteFrame, StatusDecoder
+
+
+def random_values(rng: random.Random):
+    values = []
+    for _, _, fmt in RemoteFrame.FIELDS:
+        if rng.random() < 0.4:
+            values.append(0)
+        elif fmt == "?":
+            values.append(rng.choice((True, False, 1)))
+        elif fmt == "b":
+            values.append(rng.randint(-128, 127))
+        else:
+            values.append(rng.randint(0, 255))
+
+    return values
+
+
+class TestRemoteFrame(unittest.TestCase):
+    def setUp(self):
+        self.frame = RemoteFrame()
+
+    def test_matches_generated_builder(self):
+        rng = random.Random(1234)
+        for _ in range(2000):
+            values = random_values(rng)
+            self.assertEqual(bytes(self.frame.encode(*values)), RemoteFrame.build(*values), values)
+
+    def test_all_default(self):
+        values = [0] * len(RemoteFrame.FIELDS)
+        self.assertEqual(bytes(self.frame.encode(*values)), RemoteFrame.build(*values))
+
+    def test_round_trip(self):
+        buf = self.frame.encode(True, 6, -12, 127, 200, 0, -128, 3, True, False, False, True, False, True, False, False)
+
+        msg = Message.Message.GetRootAs(bytes(buf), 0)
+        self.assertEqual(msg.Type(), MessageType.MessageType.REMOTE)
+
+        remote = msg.Remote()
+        self.assertTrue(remote.Enabled())
+        self.assertEqual(remote.Mode(), 6)
+        self.assertEqual(remote.Rlr(), -12)
+        self.assertEqual(remote.Rfb(), 127)
+        self.assertEqual(remote.Rt(), 200)
+        self.assertEqual(remote.Llr(), 0)
+        self.assertEqual(remote.Lfb(), -128)
+        self.assertEqual(remote.Lt(), 3)
+        self.assertTrue(remote.DpadU())
+        self.assertTrue(remote.DpadR())
+        self.assertTrue(remote.Cross())
+        self.assertFalse(remote.Circle())
+
+    def test_template_reused(self):
+        first = self.frame.encode(True, 6, 1, 2, 3, 4, 5, 6, 0, 0, 0, 0, 0, 0, 0, 0)
+        second = self.frame.encode(True, 6, 9, 8, 7, 6, 5, 4, 0, 0, 0, 0, 0, 0, 0, 0)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.frame._templates), 1)
+
+    def test_out_of_range(self):
+        with self.assertRaises(Exception):
+            self.frame.encode(True, 7, 128, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+STATUS_ADDERS = [getattr(ODriveStatus, f"ODriveStatusAddConnected{i}") for i in range(6)] + [
+    getattr(ODriveStatus, f"ODriveStatusAddError{axis}{n}") for axis in range(6) for n in range(2)
+]
+ERROR_ACCESSORS = [f"Error{axis}{n}" for axis in range(6) for n in range(2)]
+
+
+def build_status(values, order=None):
+    builder = flatbuffers.Builder(256)
+    ODriveStatus.ODriveStatusStart(builder)
+    for i in order or range(len(values)):
+        STATUS_ADDERS[i](builder, values[i])
+    builder.Finish(ODriveStatus.ODriveStatusEnd(builder))
+    return builder.Output()
+
+
+class TestStatusDecoder(unittest.TestCase):
+    def setUp(self):
+        self.decoder = StatusDecoder()
+
+    def assertConforms(self, buf):
+        status = self.decoder.decode(buf)
+        generated = ODriveStatus.ODriveStatus.GetRootAs(buf, 0)
+
+        self.assertEqual(status.connected, tuple(getattr(generated, f"Connected{i}")() for i in range(6)))
+        self.assertEqual(status.errors, tuple(getattr(generated, name)() for name in ERROR_ACCESSORS))
+
+    def test_matches_generated_accessors(self):
+        rng = random.Random(4321)
+        for _ in range(1000):
+            values = [rng.random() < 0.5 for _ in range(6)]
+            values += [0 if rng.random() < 0.5 else rng.randint(-2**31, 2**31 - 1) for _ in range(12)]
+
+            order = list(range(len(values)))
+            rng.shuffle(order)
+
+            self.assertConforms(build_status(values, order))
+
+    def test_empty_status(self):
+        buf = build_status([False] * 6 + [0] * 12)
+        self.assertConforms(buf)
+        self.assertFalse(self.decoder.decode(buf).any_connected())
+
+    def test_layout_cached(self):
+        values = [True] * 6 + list(range(1, 13))
+        self.decoder.decode(build_status(values))
+        status = self.decoder.decode(build_status([True] * 6 + list(range(13, 25))))
+
+        self.assertEqual(len(self.decoder._layouts), 1)
+        self.assertEqual(status.errors, tuple(range(13, 25)))
+
+    def test_truncated_buffer(self):
+        buf = build_status([True] * 6 + [7] * 12)
+        with self.assertRaises(Exception):
+            self.decoder.decode(buf[:len(buf) // 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from robot.scheduler import Rate, Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += max(0.0, delay)
+
+
+class TestRate(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("robot.scheduler.asyncio.sleep", side_effect=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_absorbs_work_time(self):
+        rate = Rate(10, clock=self.clock)
+        wakeups = []
+        for _ in range(5):
+            self.clock.now += 0.03  # work
+            await rate.sleep()
+            wakeups.append(round(self.clock.now, 6))
+
+        # the grid is anchored at the first call, after the first batch of work
+        self.assertEqual(wakeups, [100.13, 100.23, 100.33, 100.43, 100.53])
+        self.assertEqual(rate.stats.overruns, 0)
+        self.assertEqual(rate.stats.ticks, 5)
+
+    async def test_skip_policy(self):
+        rate = Rate(10, policy=Rate.SKIP, clock=self.clock)
+        await rate.sleep()  # 100.1
+
+        self.clock.now += 0.35  # overrun by 2.5 periods
+        await rate.sleep()
+
+        self.assertAlmostEqual(self.clock.now, 100.5)
+        self.assertEqual(rate.stats.overruns, 1)
+        self.assertEqual(rate.stats.skipped, 3)
+
+    async def test_catch_up_policy(self):
+        rate = Rate(10, policy=Rate.CATCH_UP, clock=self.clock)
+        await rate.sleep()  # 100.1
+
+        self.clock.now += 0.25  # 100.35, ticks at 100.2 and 100.3 missed
+        await rate.sleep()
+        self.assertAlmostEqual(self.clock.now, 100.35)
+        await rate.sleep()
+        self.assertAlmostEqual(self.clock.now, 100.35)
+        await rate.sleep()
+        self.assertAlmostEqual(self.clock.now, 100.4)
+
+        self.assertEqual(rate.stats.overruns, 2)
+        self.assertEqual(rate.stats.skipped, 0)
+
+    async def test_catch_up_limit(self):
+        rate = Rate(10, policy=Rate.CATCH_UP, max_catch_up=2, clock=self.clock)
+        await rate.sleep()
+
+        self.clock.now += 1.0
+        await rate.sleep()
+
+        self.assertAlmostEqual(self.clock.now, 101.2)
+        self.assertEqual(rate.stats.skipped, 10)
+
+    async def test_variable_period(self):
+        rate = Rate(10, clock=self.clock)
+        await rate.sleep(0.1)
+        await rate.sleep(0.4)
+        await rate.sleep(1.9)
+
+        self.assertAlmostEqual(self.clock.now, 102.4)
+
+    async def test_run(self):
+        rate = Rate(10, clock=self.clock)
+        calls = []
+
+        async def work():
+            calls.append(self.clock.now)
+            if len(calls) == 3:
+                raise asyncio.CancelledError
+
+        with self.assertRaises(asyncio.CancelledError):
+            await rate.run(work)
+
+        self.assertEqual([round(c, 6) for c in calls], [100.0, 100.1, 100.2])
+
+
+class TestScheduler(unittest.TestCase):
+    def test_registry(self):
+        scheduler = Scheduler()
+        motion = scheduler.rate("motion", 50)
+        scheduler.rate("heartbeat", 10)
+
+        self.assertAlmostEqual(motion.period, 0.02)
+        self.assertEqual(set(scheduler.stats()), {"motion", "heartbeat"})
+        self.assertIn("motion @ 50 Hz", scheduler.report())
+
+        replaced = scheduler.rate("motion", 100)
+        self.assertIs(scheduler.loops["motion"], replaced)
+
+
+if __name__ == "__main__":
+    unittest.main()
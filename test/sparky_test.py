@@ -1,24 +1,20 @@
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 import asyncio
+from robot.mode import Mode
 from robot.sparky import Sparky
 
 class TestSparky(unittest.TestCase):
 
-    @patch('robot.sparky.ThreadPoolExecutor')
     @patch('robot.sparky.Motion')
     @patch('robot.sparky.Controller')
-    @patch('robot.sparky.MainWindow')
-    @patch('robot.sparky.importlib.util.find_spec')
-    @patch('robot.sparky.importlib.util.module_from_spec')
-    def test_set_enabled_on(self, mock_module_from_spec, mock_find_spec, mock_MainWindow, mock_Controller, mock_Motion, mock_ThreadPoolExecutor):
+    @patch('robot.ui.MainWindow')
+    @patch('robot.sparky.ModeRegistry')
+    def test_set_enabled_on(self, mock_ModeRegistry, mock_MainWindow, mock_Controller, mock_Motion):
         # Setup Mocks
-        mock_find_spec.return_value = MagicMock()
-        mock_module = MagicMock()
-        mock_module_from_spec.return_value = mock_module
-        mock_mode_setup = MagicMock()
-        mock_module.setup = mock_mode_setup
-        mock_mode_setup.return_value = MagicMock()
+        mock_mode = MagicMock(running=False)
+        mock_mode.launch = AsyncMock(return_value=MagicMock())
+        mock_ModeRegistry.return_value.get = AsyncMock(return_value=mock_mode)
         
         # Mock constructor of other classes
         mock_Motion.return_value = MagicMock()
@@ -26,21 +22,76 @@ class TestSparky(unittest.TestCase):
         mock_MainWindow.return_value = MagicMock()
         
         sparky = Sparky()
-        
+        sparky.selected_mode_name = "manual"
+        sparky.motion = MagicMock()
+        sparky.ready = True
+
         # Enable sparky
-        loop = asyncio.get_event_loop()
-        asyncio.set_event_loop(loop)
-        sparky.set_enabled(True)
-        
-        # Check that the mode is set and run method is called
-        mock_mode_setup.assert_called_once_with(sparky)
-        sparky.mode.run.assert_called_once()
+        asyncio.run(sparky.set_enabled(True))
+
+        # Check that the warm mode is started
+        mock_ModeRegistry.return_value.get.assert_awaited_once_with(sparky.selected_mode_name)
+        mock_mode.launch.assert_awaited_once()
+        self.assertTrue(sparky.enabled)
+
+        # the robot finds out when the mode's task ends
+        mock_mode.launch.return_value.add_done_callback.assert_called_once_with(sparky._on_mode_done)
+
+    @patch('builtins.print')
+    def test_mode_ending_disables(self, mock_print):
+        class FinishedMode(Mode):
+            async def start(self):
+                return
+
+        sparky = Sparky()
+        sparky.selected_mode_name = "finished"
+        sparky.motion = MagicMock()
+        sparky.ready = True
+
+        mode = FinishedMode(sparky)
+        sparky.modes.get = AsyncMock(return_value=mode)
+
+        async def run():
+            await sparky.set_enabled(True)
+            self.assertTrue(sparky.enabled)
+
+            # the mode returns straight away, and the robot disables itself after it
+            await mode.task
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        self.assertFalse(sparky.enabled)
+        self.assertIsNone(sparky.mode)
+        sparky.motion.stop.assert_called_once()
+
+    @patch('builtins.print')
+    def test_enable_before_ready(self, mock_print):
+        sparky = Sparky()
+        sparky.selected_mode_name = "manual"
+        sparky.modes.get = AsyncMock()
+
+        # the window is up while startup is still going
+        asyncio.run(sparky.set_enabled(True))
+
+        sparky.modes.get.assert_not_awaited()
+        self.assertFalse(sparky.enabled)
+
+    def test_disable_without_motion(self):
+        sparky = Sparky()
+        mode = sparky.mode = MagicMock()
+        mode.shutdown = AsyncMock(return_value=True)
+
+        # motion failed to come up, the mode is still stopped
+        asyncio.run(sparky.set_enabled(False))
+
+        mode.shutdown.assert_awaited_once()
 
-    @patch('robot.sparky.ThreadPoolExecutor')
     @patch('robot.sparky.Motion')
     @patch('robot.sparky.Controller')
-    @patch('robot.sparky.MainWindow')
-    def test_set_enabled_off(self, mock_MainWindow, mock_Controller, mock_Motion, mock_ThreadPoolExecutor):
+    @patch('robot.ui.MainWindow')
+    def test_set_enabled_off(self, mock_MainWindow, mock_Controller, mock_Motion):
         # Mock constructor of other classes
         mock_Motion.return_value = MagicMock()
         mock_Controller.return_value = MagicMock()
@@ -49,81 +100,89 @@ class TestSparky(unittest.TestCase):
         sparky = Sparky()
 
         # Mock method calls
-        sparky.motion.stop = MagicMock()
-        sparky.mode.stop = MagicMock()
-        
+        sparky.motion = MagicMock()
+        mode = sparky.mode = MagicMock()
+        mode.shutdown = AsyncMock(return_value=True)
+
         # Disable sparky
-        sparky.set_enabled(False)
-        
-        # Check that stop was called for motion and mode
+        asyncio.run(sparky.set_enabled(False))
+
+        # Check that motion was stopped and the mode shut down
         sparky.motion.stop.assert_called_once()
-        sparky.mode.stop.assert_called_once()
+        mode.shutdown.assert_awaited_once()
+        self.assertIsNone(sparky.mode)
 
+    @patch('robot.sparky.UeventMonitor')
+    @patch('robot.sparky.Face')
+    @patch('robot.audio_manager.AudioManager')
+    @patch('robot.sparky.ModeRegistry')
     @patch('robot.sparky.Controller')
     @patch('robot.sparky.Motion')
-    @patch('robot.sparky.MainWindow')
-    def test_run_method(self, mock_MainWindow, mock_Motion, mock_Controller):
-        # Mock constructor of other classes
-        mock_Motion.return_value = MagicMock()
-        mock_Controller.return_value = MagicMock()
-        mock_MainWindow.return_value = MagicMock()
-        
+    @patch('builtins.print')
+    def test_start_method(self, mock_print, mock_Motion, mock_Controller, mock_ModeRegistry, mock_AudioManager,
+                          mock_Face, mock_UeventMonitor):
+        mock_ModeRegistry.return_value.load = AsyncMock()
+        mock_Motion.return_value.run = AsyncMock()
+        mock_Controller.return_value.events = AsyncMock()
+        mock_Controller.return_value.polling = AsyncMock()
+        mock_UeventMonitor.return_value.start.return_value = False
+
         sparky = Sparky()
-        
-        # Create asyncio tasks
-        sparky.loop = asyncio.new_event_loop()
-        sparky.controller = MagicMock()
-        sparky.motion = MagicMock()
-        
-        # Start the run method
-        loop = asyncio.get_event_loop()
-        asyncio.set_event_loop(loop)
-        sparky.run()
+        sparky.ui = MagicMock()
+        sparky.loop = loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        try:
+            loop.run_until_complete(sparky.start())
+        finally:
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.run_until_complete(asyncio.sleep(0))
 
-        # Check that the run methods of motion and controller are called
+        # Check that the run methods of motion and controller are started, and the modes set up after them
         sparky.motion.run.assert_called_once()
         sparky.controller.events.assert_called_once()
         sparky.controller.polling.assert_called_once()
+        mock_ModeRegistry.return_value.load.assert_awaited_once()
+        sparky.audio_manager.play_sound.assert_called_once_with("startup1")
+        self.assertIs(sparky.face, mock_Face.return_value)
 
-    @patch('robot.sparky.Controller')
-    @patch('robot.sparky.Motion')
-    def test_stop_method(self, mock_Motion, mock_Controller):
-        # Mock constructor of other classes
-        mock_Motion.return_value = MagicMock()
-        mock_Controller.return_value = MagicMock()
-        
+        # optional hardware that isn't attached doesn't hold the rest up
+        self.assertTrue(sparky.startup.steps["modes"].ok)
+        self.assertIsNone(sparky.lidar)
+        self.assertTrue(sparky.ready)
+
+    def test_stop_method(self):
         sparky = Sparky()
-        
-        # Setup mock methods for stop behavior
-        sparky.motion.stop = MagicMock()
-        sparky.controller.led.set_color = MagicMock()
-        
+        sparky.loop = asyncio.new_event_loop()
+        self.addCleanup(sparky.loop.close)
+
+        # Setup mock subsystems for stop behavior
+        sparky.motion = MagicMock()
+        sparky.controller = MagicMock()
+
         # Call stop method
         sparky.stop()
-        
+
         # Check stop calls
         sparky.motion.stop.assert_called_once()
-        sparky.controller.led.set_color.assert_called_once_with((0, 0, 50))
+        sparky.controller.led.write.assert_called_once_with((0, 0, 50))
 
-    @patch('robot.sparky.Controller')
-    @patch('robot.sparky.Motion')
-    def test_heartbeat(self, mock_Motion, mock_Controller):
-        # Mock constructor of other classes
-        mock_Motion.return_value = MagicMock()
-        mock_Controller.return_value = MagicMock()
-        
+    def test_heartbeat(self):
         sparky = Sparky()
-        
+
         # Mock the controller's led object
-        sparky.controller.led = MagicMock()
-        
-        # Run heartbeat
-        heartbeat_task = asyncio.create_task(sparky.heartbeat())
-        asyncio.run(heartbeat_task)  # Run it asynchronously
-        
+        sparky.controller = MagicMock()
+
+        # Run heartbeat for a little while
+        async def run_heartbeat():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(sparky.heartbeat(), 0.3)
+
+        asyncio.run(run_heartbeat())
+
         # Test that the led color was set (not precise timing)
-        sparky.controller.led.set_color.assert_called()
-        heartbeat_task.cancel()  # Cancel the heartbeat task after test
+        sparky.controller.led.write.assert_called()
 
 if __name__ == '__main__':
     unittest.main()
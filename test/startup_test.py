@@ -0,0 +1,93 @@
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from robot.startup import Startup
+
+
+@patch("builtins.print")
+class TestStartup(unittest.IsolatedAsyncioTestCase):
+    async def test_independent_steps_run_concurrently(self, mock_print):
+        startup = Startup()
+        startup.add("face", lambda: time.sleep(0.2), blocking=True)
+        startup.add("lidar", lambda: time.sleep(0.2), blocking=True)
+        startup.add("audio", lambda: time.sleep(0.2), blocking=True)
+
+        started = time.monotonic()
+        self.assertTrue(await startup.run())
+
+        # about as long as the slowest step, not the sum of them
+        self.assertLess(time.monotonic() - started, 0.45)
+        for step in startup.steps.values():
+            self.assertAlmostEqual(step.duration, 0.2, delta=0.1)
+
+    async def test_dependencies_run_first(self, mock_print):
+        order = []
+
+        async def devices():
+            await asyncio.sleep(0.05)
+            order.append("devices")
+
+        startup = Startup()
+        startup.add("devices", devices)
+        startup.add("motion", lambda: order.append("motion"), after=("devices",))
+        startup.add("controller", lambda: order.append("controller"))
+        startup.add("modes", lambda: order.append("modes"), after=("motion", "controller"))
+
+        await startup.run()
+
+        self.assertEqual(order, ["controller", "devices", "motion", "modes"])
+        self.assertGreaterEqual(startup.steps["motion"].started, startup.steps["devices"].finished)
+
+    async def test_blocking_step_keeps_loop_free(self, mock_print):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        startup = Startup()
+        startup.add("face", lambda: time.sleep(0.2), blocking=True)
+
+        task = asyncio.create_task(ticker())
+        await startup.run()
+        task.cancel()
+
+        self.assertGreater(ticks, 10)
+
+    async def test_failure_skips_dependents_only(self, mock_print):
+        def lidar():
+            raise Exception("Could not connect to LiDAR")
+
+        startup = Startup()
+        startup.add("devices", lambda: None)
+        startup.add("lidar", lidar, after=("devices",), blocking=True)
+        startup.add("mapping", lambda: None, after=("lidar",))
+        startup.add("motion", lambda: None, after=("devices",))
+
+        self.assertFalse(await startup.run())
+
+        self.assertIsNotNone(startup.steps["lidar"].error)
+        self.assertTrue(startup.steps["mapping"].skipped)
+        self.assertTrue(startup.steps["motion"].ok)
+
+        report = startup.report()
+        self.assertIn("failed: Could not connect to LiDAR", report)
+        self.assertIn("skipped", report)
+
+    async def test_bad_dependencies_rejected(self, mock_print):
+        startup = Startup()
+        startup.add("devices", lambda: None)
+
+        with self.assertRaises(ValueError):
+            startup.add("devices", lambda: None)
+
+        with self.assertRaises(ValueError):
+            startup.add("modes", lambda: None, after=("motion",))
+
+
+if __name__ == "__main__":
+    unittest.main()
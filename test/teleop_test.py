@@ -0,0 +1,192 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from evdev import InputEvent, ecodes
+
+from robot.controller import ControllerState
+from robot.teleop import TeleopPacket, TeleopReceiver, TeleopSender
+
+
+def state(**fields):
+    values = ControllerState().snapshot()
+    for name, value in fields.items():
+        values[ControllerState.FIELDS.index(name)] = value
+    return list(values)
+
+
+PEER = ("127.0.0.1", 40000)
+OTHER = ("127.0.0.1", 40001)
+
+
+class TestTeleopPacket(unittest.TestCase):
+    def test_round_trip(self):
+        values = state(cross=1, r3=1, dpad_left=1, left_stick_x=3, right_stick_y=250, r2_analog=77)
+
+        data = TeleopPacket.pack(7, 12.5, values)
+        self.assertEqual(len(data), TeleopPacket.SIZE)
+
+        seq, stamp, unpacked = TeleopPacket.unpack(data)
+        self.assertEqual((seq, stamp, unpacked), (7, 12.5, values))
+
+    def test_rejects_other_datagrams(self):
+        data = TeleopPacket.pack(1, 0.0, state())
+
+        self.assertIsNone(TeleopPacket.unpack(data[:-1]))
+        self.assertIsNone(TeleopPacket.unpack(b"XXXX" + data[4:]))
+
+
+@patch("builtins.print")
+class TestTeleopReceiver(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.target = ControllerState()
+        self.receiver = TeleopReceiver(self.target, jitter=0.02, max_delay=0.1, timeout=0.2)
+        self.receiver.connection_made(MagicMock())
+
+    async def asyncTearDown(self):
+        self.receiver.close()
+
+    def deliver(self, seq, values, transit=0.0, peer=PEER):
+        """Packet ``seq`` from ``peer`` arriving now after ``transit`` seconds on the wire."""
+        stamp = self.receiver.loop.time() - transit
+        self.receiver.datagram_received(TeleopPacket.pack(seq, stamp, values), peer)
+
+    async def test_played_after_jitter_delay(self, mock_print):
+        self.deliver(1, state(cross=1))
+
+        self.assertEqual(self.target.cross, 0)
+        self.assertEqual(self.receiver.pending, 1)
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.cross, 1)
+        self.assertEqual(self.receiver.played, 1)
+        self.assertGreaterEqual(self.receiver.delay.percentile(0), 0.015)
+
+    async def test_reordered_within_buffer(self, mock_print):
+        # 2 overtook 1 on the way, both still in the buffer
+        self.deliver(2, state(left_stick_x=20), transit=0.0)
+        self.deliver(1, state(left_stick_x=10), transit=0.0)
+        self.deliver(3, state(left_stick_x=30), transit=0.0)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.left_stick_x, 30)
+        self.assertEqual(self.receiver.reordered, 1)
+        self.assertEqual(self.receiver.last_seq, 3)
+
+    async def test_late_packet_played_at_once(self, mock_print):
+        self.deliver(1, state(), transit=0.0)
+        await asyncio.sleep(0.05)
+
+        self.deliver(2, state(square=1), transit=0.05)
+
+        self.assertEqual(self.target.square, 1)
+        self.assertEqual(self.receiver.late, 1)
+
+    async def test_stale_dropped(self, mock_print):
+        self.deliver(1, state(), transit=0.0)
+        self.deliver(2, state(circle=1), transit=0.5)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.circle, 0)
+        self.assertEqual(self.receiver.stale, 1)
+
+    async def test_duplicates_and_old_packets_dropped(self, mock_print):
+        self.deliver(5, state())
+        await asyncio.sleep(0.05)
+
+        self.deliver(5, state(triangle=1))
+        self.deliver(4, state(triangle=1))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.triangle, 0)
+        self.assertEqual(self.receiver.reordered, 2)
+
+    async def test_sequence_wraps(self, mock_print):
+        self.deliver(0xFFFFFFFF, state())
+        await asyncio.sleep(0.05)
+
+        self.deliver(0, state(r1=1))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.r1, 1)
+
+    async def test_neutral_when_link_lost(self, mock_print):
+        self.deliver(1, state(right_stick_y=0, cross=1))
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.target.right_stick_y, 0)
+
+        await asyncio.sleep(0.3)
+
+        self.assertEqual(self.target.right_stick_y, 128)
+        self.assertEqual(self.target.cross, 0)
+
+    async def test_buffered_not_played_after_close(self, mock_print):
+        self.deliver(1, state(cross=1))
+        self.assertEqual(self.receiver.pending, 1)
+
+        self.receiver.close()
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.target.cross, 0)
+        self.assertEqual(self.receiver.pending, 0)
+        self.assertEqual(self.receiver.played, 0)
+
+    async def test_peer_pinned_until_link_lost(self, mock_print):
+        self.deliver(1, state(cross=1))
+        self.deliver(500, state(circle=1), peer=OTHER)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual((self.target.cross, self.target.circle), (1, 0))
+        self.assertEqual(self.receiver.rejected, 1)
+
+        # once the first peer has gone quiet, another one may take over
+        await asyncio.sleep(0.25)
+        self.deliver(1, state(circle=1), peer=OTHER)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual((self.target.cross, self.target.circle), (0, 1))
+        self.assertEqual(self.receiver.peer, OTHER)
+
+    async def test_malformed_counted(self, mock_print):
+        self.receiver.datagram_received(b"hello", PEER)
+
+        self.assertEqual(self.receiver.malformed, 1)
+        self.assertEqual(self.receiver.received, 0)
+
+
+@patch("builtins.print")
+class TestTeleopLocalhost(unittest.IsolatedAsyncioTestCase):
+    async def test_sender_to_receiver(self, mock_print):
+        target = ControllerState()
+        receiver = TeleopReceiver(target, jitter=0.005)
+        await receiver.start("127.0.0.1", 0)
+
+        source = ControllerState()
+        sender = TeleopSender(*receiver.address, interval=0.01)
+        task = asyncio.create_task(sender.run(source))
+
+        updates = target.subscribe()
+        await updates.__anext__()
+
+        source.update_event(InputEvent(0, 0, ecodes.EV_ABS, ecodes.ABS_RY, 10))
+        source.update_event(InputEvent(0, 0, ecodes.EV_KEY, ecodes.BTN_SOUTH, 1))
+        source.update_event(InputEvent(0, 0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0))
+
+        try:
+            async with asyncio.timeout(1):
+                async for snapshot in updates:
+                    if snapshot.cross:
+                        break
+        finally:
+            task.cancel()
+            updates.close()
+            sender.close()
+            receiver.close()
+
+        self.assertEqual(snapshot.right_stick_y, 10)
+        self.assertEqual(receiver.reordered + receiver.stale + receiver.malformed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import struct
+import asyncio
+import unittest
+
+from robot.transport import FrameParser, MotionTransport
+
+
+def framed(payload: bytes) -> bytes:
+    return struct.pack("<I", len(payload)) + payload
+
+
+class FakeSerial:
+    """In-memory stand-in for AioSerial; replies are pushed by the test."""
+
+    def __init__(self):
+        self.written = []
+        self.incoming = asyncio.Queue()
+
+    @property
+    def in_waiting(self):
+        return 0
+
+    async def write_async(self, data):
+        self.written.append(data)
+        return len(data)
+
+    async def read_async(self, size=1):
+        try:
+            return await asyncio.wait_for(self.incoming.get(), 0.05)
+        except asyncio.TimeoutError:
+            return b""
+
+
+class TestFrameParser(unittest.TestCase):
+    def test_partial_reads(self):
+        parser = FrameParser()
+        data = framed(b"hello") + framed(b"") + framed(b"world!")
+
+        frames = []
+        for i in range(len(data)):
+            frames += parser.feed(data[i:i + 1])
+
+        self.assertEqual(frames, [b"hello", b"", b"world!"])
+
+    def test_multiple_frames_in_one_chunk(self):
+        parser = FrameParser()
+        frames = parser.feed(framed(b"a") + framed(b"bc") + framed(b"def")[:5])
+
+        self.assertEqual(frames, [b"a", b"bc"])
+        self.assertEqual(parser.feed(b"ef"), [b"def"])
+
+    def test_resync_on_garbage(self):
+        parser = FrameParser(max_size=64)
+        frames = parser.feed(b"\xff\xff\xff\xff" + framed(b"ok"))
+
+        self.assertEqual(frames, [b"ok"])
+        self.assertEqual(parser.resyncs, 4)
+
+
+class TestMotionTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.serial = FakeSerial()
+        self.replies = []
+        self.timeouts = []
+        self.transport = MotionTransport(
+            self.serial,
+            lambda seq, payload, rtt: self.replies.append((seq, payload)),
+            self.timeouts.append,
+            reply_timeout=0.1,
+            max_in_flight=4,
+        )
+        self.task = asyncio.create_task(self.transport.run())
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await self.task
+
+    async def test_replies_matched_in_order(self):
+        self.transport.send(b"one")
+        await asyncio.sleep(0)
+        self.transport.send(b"two")
+        await asyncio.sleep(0)
+
+        await self.serial.incoming.put(framed(b"r1") + framed(b"r2")[:3])
+        await self.serial.incoming.put(framed(b"r2")[3:])
+        await asyncio.sleep(0.02)
+
+        self.assertEqual(self.serial.written, [b"one", b"two"])
+        self.assertEqual(self.replies, [(1, b"r1"), (2, b"r2")])
+
+    async def test_latest_frame_wins(self):
+        self.transport.send(b"old")
+        self.transport.send(b"new")
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.serial.written, [b"new"])
+
+    async def test_commands_flow_without_replies(self):
+        for i in range(10):
+            self.transport.send(bytes([i]))
+            await asyncio.sleep(0.001)
+
+        self.assertEqual(len(self.serial.written), 10)
+        # only the in-flight window is kept, the rest time out
+        self.assertEqual(self.timeouts, [1, 2, 3, 4, 5, 6])
+
+    async def test_reply_timeout(self):
+        self.transport.send(b"lost")
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(self.timeouts, [1])
+        self.assertEqual(self.transport.stats.timeouts, 1)
+
+    async def test_link_stats(self):
+        self.transport.parser.max_size = 64
+        self.transport.send(b"frame")
+        await asyncio.sleep(0.01)
+        await self.serial.incoming.put(b"\xff\xff\xff\xff" + framed(b"r1") + framed(b"r2")[:3])
+        await asyncio.sleep(0.1)
+
+        stats = self.transport.stats
+        self.assertEqual(stats.frames_sent, 1)
+        self.assertEqual(stats.replies, 1)
+        self.assertEqual(stats.rtt.count, 1)
+        self.assertEqual(stats.parse_failures, 1)
+        self.assertGreaterEqual(stats.short_reads, 1)
+        self.assertEqual(stats.tx.total, 5)
+        self.assertEqual(stats.rx.total, 4 + 6 + 3)
+
+
+    async def test_short_read_discards_partial_reply(self):
+        self.transport.send(b"one")
+        await asyncio.sleep(0.01)
+
+        # the rest of the first reply never arrives
+        await self.serial.incoming.put(framed(b"lost")[:5])
+        await asyncio.sleep(0.08)
+        self.assertEqual(self.transport.parser.pending, 0)
+
+        self.transport.send(b"two")
+        await asyncio.sleep(0.01)
+        await self.serial.incoming.put(framed(b"r2"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual([payload for _, payload in self.replies], [b"r2"])
+        self.assertEqual(self.transport.stats.short_reads, 1)
+        self.assertEqual(self.transport.stats.parse_failures, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
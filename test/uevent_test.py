@@ -0,0 +1,66 @@
+import socket
+import asyncio
+import unittest
+
+from robot.uevent import UeventMonitor
+
+
+def uevent(action, devpath, **props):
+    fields = [f"{action}@{devpath}", f"ACTION={action}", f"DEVPATH={devpath}"]
+    fields += [f"{key}={value}" for key, value in props.items()]
+    return "\0".join(fields).encode() + b"\0"
+
+
+class TestParse(unittest.TestCase):
+    def test_kernel_event(self):
+        event = UeventMonitor.parse(uevent("add", "/devices/usb1/1-1/tty/ttyACM0", SUBSYSTEM="tty", DEVNAME="ttyACM0"))
+
+        self.assertEqual(event["ACTION"], "add")
+        self.assertEqual(event["SUBSYSTEM"], "tty")
+        self.assertEqual(event["DEVNAME"], "ttyACM0")
+
+    def test_udev_broadcast_ignored(self):
+        self.assertIsNone(UeventMonitor.parse(b"libudev\0\xfe\xed\xca\xfe"))
+
+    def test_garbage_ignored(self):
+        self.assertIsNone(UeventMonitor.parse(b"hello"))
+
+
+class TestMonitor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.kernel, sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.monitor = UeventMonitor()
+        self.assertTrue(self.monitor.start(asyncio.get_running_loop(), sock=sock))
+
+    async def asyncTearDown(self):
+        self.monitor.close()
+        self.kernel.close()
+
+    async def test_subscribers_filtered_by_subsystem(self):
+        tty, everything = [], []
+        self.monitor.subscribe(tty.append, "tty")
+        unsubscribe = self.monitor.subscribe(everything.append)
+
+        self.kernel.send(uevent("add", "/devices/a", SUBSYSTEM="tty"))
+        self.kernel.send(uevent("change", "/devices/b", SUBSYSTEM="power_supply"))
+        await asyncio.sleep(0.01)
+
+        unsubscribe()
+        self.kernel.send(uevent("remove", "/devices/a", SUBSYSTEM="tty"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual([e["ACTION"] for e in tty], ["add", "remove"])
+        self.assertEqual([e["ACTION"] for e in everything], ["add", "change"])
+
+    async def test_wait_for(self):
+        asyncio.get_running_loop().call_later(
+            0.01, self.kernel.send, uevent("add", "/devices/a", SUBSYSTEM="tty", DEVNAME="ttyACM0")
+        )
+        event = await self.monitor.wait_for(lambda e: e["ACTION"] == "add", 1.0, subsystem="tty")
+
+        self.assertEqual(event["DEVNAME"], "ttyACM0")
+        self.assertIsNone(await self.monitor.wait_for(lambda e: True, 0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()